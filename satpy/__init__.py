@@ -33,3 +33,4 @@ from satpy.version import __version__
 from satpy.dataset import Dataset, DatasetID, DATASET_KEYS
 from satpy.readers import DatasetDict, find_files_and_readers
 from satpy.scene import Scene
+from satpy.pipeline import Pipeline
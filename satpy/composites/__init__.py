@@ -30,13 +30,13 @@ import time
 
 import numpy as np
 import six
-import yaml
 
-from satpy.config import (CONFIG_PATH, config_search_paths,
-                          recursive_dict_update)
+from satpy.config import (CONFIG_PATH, config_search_paths, get_float_dtype,
+                          load_yaml_config, recursive_dict_update)
 from satpy.dataset import (DATASET_KEYS, Dataset, DatasetID, InfoObject,
                            combine_info)
 from satpy.readers import DatasetDict
+from satpy.resample import AREA_REGISTRY
 from satpy.tools import sunzen_corr_cos
 from satpy.tools import atmospheric_path_length_correction
 from satpy.writers import get_enhanced_image
@@ -171,8 +171,8 @@ class CompositorLoader(object):
 
         conf = {}
         for composite_config in composite_configs:
-            with open(composite_config) as conf_file:
-                conf = recursive_dict_update(conf, yaml.load(conf_file))
+            conf = recursive_dict_update(conf,
+                                         load_yaml_config(composite_config))
         try:
             sensor_name = conf['sensor_name']
         except KeyError:
@@ -265,8 +265,9 @@ class SunZenithCorrectorBase(CompositeBase):
             if key not in self.coszen:
                 from pyorbital.astronomy import cos_zen
                 LOG.debug("Computing sun zenith angles.")
+                lons, lats = AREA_REGISTRY.get_lonlats(vis.info["area"])
                 self.coszen[key] = np.ma.masked_outside(cos_zen(vis.info["start_time"],
-                                                                *vis.info["area"].get_lonlats()),
+                                                                lons, lats),
                                                         # about 88 degrees.
                                                         0.035,
                                                         1,
@@ -345,7 +346,7 @@ class PSPRayleighReflectance(CompositeBase):
         except ValueError:
             from pyorbital.astronomy import get_alt_az, sun_zenith_angle
             from pyorbital.orbital import get_observer_look
-            lons, lats = vis.info['area'].get_lonlats()
+            lons, lats = AREA_REGISTRY.get_lonlats(vis.info['area'])
             sunalt, suna = get_alt_az(vis.info['start_time'], lons, lats)
             suna = np.rad2deg(suna)
             sunz = sun_zenith_angle(vis.info['start_time'], lons, lats)
@@ -433,7 +434,7 @@ class NIRReflectance(CompositeBase):
         # Check if the sun-zenith angle was provided:
         if sun_zenith is None:
             from pyorbital.astronomy import sun_zenith_angle as sza
-            lons, lats = _nir.info["area"].get_lonlats()
+            lons, lats = AREA_REGISTRY.get_lonlats(_nir.info["area"])
             sun_zenith = sza(_nir.info['start_time'], lons, lats)
 
         return self._refl3x.reflectance_from_tbs(sun_zenith, _nir, _tb11, tb_ir_co2=tb13_4)
@@ -473,7 +474,7 @@ class PSPAtmosphericalCorrection(CompositeBase):
             satz = optional_datasets[0]
         else:
             from pyorbital.orbital import get_observer_look
-            lons, lats = band.info['area'].get_lonlats()
+            lons, lats = AREA_REGISTRY.get_lonlats(band.info['area'])
 
             try:
                 dummy, satel = get_observer_look(band.info['satellite_longitude'],
@@ -564,6 +565,11 @@ class RGBCompositor(CompositeBase):
             if areas and areas.count(areas[0]) != len(areas):
                 raise IncompatibleAreas
 
+        info = self._combine_rgb_info(projectables)
+        return Dataset(data=the_data, **info)
+
+    def _combine_rgb_info(self, projectables):
+        """Build the metadata of the RGB composite from its *projectables*."""
         info = combine_info(*projectables)
         info.update(self.info)
         # FIXME: should this be done here ?
@@ -583,7 +589,7 @@ class RGBCompositor(CompositeBase):
             sensor = list(sensor)[0]
         info["sensor"] = sensor
         info["mode"] = "RGB"
-        return Dataset(data=the_data, **info)
+        return info
 
 
 class BWCompositor(CompositeBase):
@@ -691,52 +697,48 @@ class DayNightCompositor(RGBCompositor):
             raise ValueError("Expected 3 datasets, got %d" %
                              (len(projectables), ))
         try:
-            day_data = projectables[0].copy()
-            night_data = projectables[1].copy()
-            coszen = np.cos(np.deg2rad(projectables[2]))
-
-            coszen -= min(np.cos(np.deg2rad(lim_high)),
-                          np.cos(np.deg2rad(lim_low)))
-            coszen /= np.abs(np.cos(np.deg2rad(lim_low)) -
-                             np.cos(np.deg2rad(lim_high)))
-            coszen = np.clip(coszen, 0, 1)
-
-            full_data = []
-
-            # Apply enhancements
-            day_data = enhance2dataset(day_data)
-            night_data = enhance2dataset(night_data)
-
-            # Match dimensions to the data with more channels
-            # There are only 1-channel and 3-channel composites
-            if day_data.shape[0] > night_data.shape[0]:
-                night_data = np.ma.repeat(night_data, 3, 0)
-            elif day_data.shape[0] < night_data.shape[0]:
-                day_data = np.ma.repeat(day_data, 3, 0)
-
-            for i in range(day_data.shape[0]):
-                day = day_data[i, :, :]
-                night = night_data[i, :, :]
-
-                data = (1 - coszen) * np.ma.masked_invalid(night).filled(0) + \
-                    coszen * np.ma.masked_invalid(day).filled(0)
-                data = np.ma.array(data, mask=np.logical_and(night.mask,
-                                                             day.mask),
-                                   copy=False)
-                data = Dataset(np.ma.masked_invalid(data),
-                               copy=True,
-                               **projectables[0].info)
-                full_data.append(data)
-
-            res = RGBCompositor.__call__(self, (full_data[0],
-                                                full_data[1],
-                                                full_data[2]),
-                                         *args, **kwargs)
-
+            # Apply enhancements, get plain (bands, rows, cols) arrays
+            day_data, day_mask = _enhanced_channels(projectables[0])
+            night_data, night_mask = _enhanced_channels(projectables[1])
+            weight, weight_mask = self._day_weight(projectables[2],
+                                                   lim_low, lim_high)
+
+            # 1-channel composites are broadcast against 3-channel ones
+            shape = np.broadcast(day_data, night_data, weight).shape
         except ValueError:
             raise IncompatibleAreas
+        if len(shape) != 3 or shape[0] != 3:
+            raise IncompatibleAreas
 
-        return res
+        # data = weight * day + (1 - weight) * night, in a single buffer
+        data = np.empty(shape, dtype=get_float_dtype())
+        np.subtract(day_data, night_data, out=data)
+        data *= weight
+        data += night_data
+
+        mask = np.logical_and(day_mask, night_mask)
+        mask = np.logical_or(mask, weight_mask, out=np.empty(shape, bool))
+
+        info = self._combine_rgb_info(projectables[:1])
+        return Dataset(data, mask=mask, copy=False, **info)
+
+    @staticmethod
+    def _day_weight(sza, lim_low, lim_high):
+        """Get the day side blending weight from the solar zenith angles.
+
+        The weight is 1 for zenith angles below *lim_low*, 0 above *lim_high*
+        and linear in cos(sza) in between.
+        """
+        cos_low = np.cos(np.deg2rad(lim_low))
+        cos_high = np.cos(np.deg2rad(lim_high))
+        weight = np.ma.getdata(sza).astype(get_float_dtype())
+        np.cos(np.deg2rad(weight, out=weight), out=weight)
+        weight -= min(cos_high, cos_low)
+        weight /= np.abs(cos_low - cos_high)
+        mask = np.ma.getmaskarray(sza) | ~np.isfinite(weight)
+        np.clip(weight, 0, 1, out=weight)
+        weight[mask] = 0
+        return weight, mask
 
 
 class Airmass(RGBCompositor):
@@ -877,3 +879,23 @@ def enhance2dataset(dset):
                    copy=False,
                    **dset.info)
     return data
+
+
+def _enhanced_channels(dset):
+    """Apply enhancements to *dset* and get the image data and mask.
+
+    Contrary to :func:`enhance2dataset`, no intermediate Dataset is created:
+    the image channels are returned as a (bands, rows, cols) array where
+    masked and invalid pixels are set to 0, along with the matching mask.
+    """
+    img = get_enhanced_image(dset)
+
+    data = np.array([np.ma.getdata(chn) for chn in img.channels])
+    mask = np.ma.getmaskarray(dset)
+    if mask.ndim < data.ndim:
+        mask = mask[np.newaxis]
+    elif mask.ndim > data.ndim:
+        mask = mask[0]
+    invalid = mask | ~np.isfinite(data)
+    data[invalid] = 0
+    return data, mask
@@ -29,6 +29,9 @@ import os
 import sys
 
 import numpy as np
+
+from satpy.config import get_float_dtype
+
 # from memory_profiler import profile
 
 LOG = logging.getLogger(__name__)
@@ -367,7 +370,7 @@ def run_crefl(refl, coeffs,
     else:
         row = np.int32((90.0 - lat) * avg_elevation.shape[0] / 180.0)
         col = np.int32((lon + 180.0) * avg_elevation.shape[1] / 360.0)
-        height = np.float64(avg_elevation[row, col])
+        height = avg_elevation[row, col].astype(get_float_dtype())
         height[height < 0.] = 0.0
         del lat, lon, row, col
 
@@ -431,6 +431,40 @@ class AdaptiveDNB(HistogramDNB):
         return output_dataset
 
 
+def get_saturation_factor(radiance, max_val, max_fraction=0.005, step=1.1):
+    """Get the factor to raise *max_val* by so that few pixels saturate.
+
+    The factor is the lowest power of *step* for which at most
+    *max_fraction* of the *radiance* pixels are above *max_val* times the
+    factor, as found by the IDL code of `ERFDNB` multiplying *max_val* by
+    *step* until then. Instead of counting the saturated pixels again for
+    each step, the factor is computed in one pass from the ratio of radiance
+    to *max_val* of the first pixel that has to be below the limit.
+
+    The factor is the one of the iterative search, except when this ratio
+    is within floating point rounding (about 1e-15 relative) of a power of
+    *step*, where it can be one step off. Masked pixels (in *radiance* or
+    *max_val*) are not counted as saturated, but they count in the total.
+    """
+    allowed = int(np.floor(max_fraction * radiance.size))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = np.ma.masked_invalid(radiance / max_val).compressed()
+    if ratios.size <= allowed:
+        return 1.
+    # the ratio of the pixel with *allowed* pixels above it
+    limit = ratios.size - allowed - 1
+    threshold = np.partition(ratios, limit)[limit]
+    if threshold <= 1:
+        return 1.
+    power = int(np.ceil(np.log(threshold) / np.log(step)))
+    if step ** power < threshold:
+        power += 1
+    elif power > 0 and step ** (power - 1) >= threshold:
+        power -= 1
+    LOG.debug("Dynamic DNB saturation factor: %f", step ** power)
+    return step ** power
+
+
 class ERFDNB(CompositeBase):
     """Equalized DNB composite using the error function (erf).
 
@@ -499,15 +533,7 @@ class ERFDNB(CompositeBase):
         # Update from Curtis Seaman, increase max radiance curve until less
         # than 0.5% is saturated
         if self.saturation_correction:
-            saturation_pct = float(np.count_nonzero(dnb_data >
-                                                    max_val)) / dnb_data.size
-            LOG.debug("Dynamic DNB saturation percentage: %f", saturation_pct)
-            while saturation_pct > 0.005:
-                max_val *= 1.1 * unit_factor
-                saturation_pct = float(np.count_nonzero(
-                    dnb_data > max_val)) / dnb_data.size
-                LOG.debug("Dynamic DNB saturation percentage: %f",
-                          saturation_pct)
+            max_val *= get_saturation_factor(dnb_data, max_val)
 
         inner_sqrt = (dnb_data - min_val) / (max_val - min_val)
         # clip negative values to 0 before the sqrt
@@ -29,7 +29,10 @@ import glob
 import logging
 import os
 from collections import Mapping
+from copy import deepcopy
 
+import numpy as np
+import yaml
 from six.moves import configparser
 
 LOG = logging.getLogger(__name__)
@@ -51,6 +54,45 @@ def get_environ_ancpath(default='.'):
 CONFIG_PATH = get_environ_config_dir()
 
 
+def check_precision(precision):
+    """Check that *precision* is the name of a floating point dtype."""
+    try:
+        kind = np.dtype(precision).kind
+    except TypeError:
+        kind = None
+    if kind != 'f':
+        raise ValueError("Precision must be a floating point dtype like "
+                         "'float32' or 'float64', not {}".format(precision))
+    return precision
+
+
+#: Precision of the floating point data arrays produced by the readers,
+#: compositors and resamplers, 'float32' or 'float64'. Geolocation keeps the
+#: precision it is read or computed with.
+PRECISION = check_precision(os.environ.get('SATPY_PRECISION', 'float32'))
+
+
+def get_float_dtype():
+    """Get the floating point dtype of the data arrays."""
+    return np.dtype(PRECISION)
+
+
+def apply_precision(data):
+    """Cast the floating point *data* to the `PRECISION` dtype.
+
+    The data is returned as is when it already has the right dtype or isn't
+    a floating point array. Masks and metadata are kept.
+    """
+    dtype = get_float_dtype()
+    if (not isinstance(data, np.ndarray) or data.dtype == dtype or
+            not np.issubdtype(data.dtype, np.floating)):
+        return data
+    res = data.astype(dtype)
+    if hasattr(data, 'info'):
+        res.info = data.info.copy()
+    return res
+
+
 def runtime_import(object_path):
     """Import at runtime
     """
@@ -130,3 +172,38 @@ def recursive_dict_update(d, u):
         else:
             d[k] = u[k]
     return d
+
+
+# filename -> ((mtime, size), parsed content)
+_YAML_CACHE = {}
+
+
+def _file_signature(filename):
+    stat = os.stat(filename)
+    return stat.st_mtime, stat.st_size
+
+
+def load_yaml_config(filename):
+    """Load the YAML file *filename*, parsing it only once per process.
+
+    The parsed content is kept in a process-wide cache which is invalidated
+    when the modification time or the size of the file changes. Callers get
+    their own deep copy, so they can modify it freely.
+    """
+    filename = os.path.abspath(filename)
+    signature = _file_signature(filename)
+    try:
+        cached_signature, content = _YAML_CACHE[filename]
+    except KeyError:
+        cached_signature = None
+    if cached_signature != signature:
+        LOG.debug("Parsing YAML config %s", filename)
+        with open(filename) as fd:
+            content = yaml.load(fd)
+        _YAML_CACHE[filename] = signature, content
+    return deepcopy(content)
+
+
+def clear_yaml_cache():
+    """Forget all the parsed YAML configuration files."""
+    _YAML_CACHE.clear()
@@ -26,6 +26,7 @@
 
 import logging
 import numbers
+import weakref
 from collections import namedtuple
 
 import numpy as np
@@ -60,6 +61,9 @@ def combine_info(*info_objects):
     for info_object in info_objects:
         if isinstance(info_object, dict):
             info_dict = info_object
+        elif isinstance(info_object, Dataset):
+            # only read, no need to copy a shared dictionary
+            info_dict = info_object._peek_info()
         elif hasattr(info_object, "info"):
             info_dict = info_object.info
         else:
@@ -71,20 +75,66 @@ def combine_info(*info_objects):
         else:
             shared_keys &= set(info_dict.keys())
 
+    if not shared_keys:
+        return {}
+    if all(info_dict is info_dicts[0] for info_dict in info_dicts[1:]):
+        return info_dicts[0].copy()
+
     # combine all of the dictionaries
     shared_info = {}
     for k in shared_keys:
         values = [nfo[k] for nfo in info_dicts]
+        first = values[0]
+        # identical objects are equal, whatever their type
+        if all(val is first for val in values[1:]):
+            shared_info[k] = first
+            continue
         any_arrays = any([isinstance(val, np.ndarray) for val in values])
         if any_arrays:
-            if all(np.all(val == values[0]) for val in values[1:]):
-                shared_info[k] = values[0]
-        elif all(val == values[0] for val in values[1:]):
-            shared_info[k] = values[0]
+            if all(np.all(val == first) for val in values[1:]):
+                shared_info[k] = first
+        elif k == 'area':
+            if all(_areas_equal(first, val) for val in values[1:]):
+                shared_info[k] = first
+        elif all(val == first for val in values[1:]):
+            shared_info[k] = first
 
     return shared_info
 
 
+# (id(area1), id(area2)) -> (weakref to area1, weakref to area2, equality)
+_AREA_EQUALITY = {}
+
+
+def _areas_equal(area1, area2):
+    """Compare two areas, caching the result while both areas are alive.
+
+    Area definitions are compared by value (projection, extent and size),
+    which is expensive enough to matter when done on every operation between
+    datasets.
+    """
+    key = (id(area1), id(area2))
+    try:
+        ref1, ref2, equal = _AREA_EQUALITY[key]
+        if ref1() is area1 and ref2() is area2:
+            return equal
+    except KeyError:
+        pass
+
+    equal = area1 == area2
+
+    def _forget(ref):
+        _AREA_EQUALITY.pop(key, None)
+    try:
+        _AREA_EQUALITY[key] = (weakref.ref(area1, _forget),
+                               weakref.ref(area2, _forget),
+                               equal)
+    except TypeError:
+        # not weak referenceable, like area names
+        pass
+    return equal
+
+
 def copy_info(func):
     """Decorator function for combining the infos of two Datasets
 
@@ -97,7 +147,13 @@ def copy_info(func):
 
     def wrapper(self, other, *args, **kwargs):
         res = func(self, other, *args, **kwargs)
-        res.info = combine_info(self, other)
+        if not isinstance(res, Dataset):
+            res.info = combine_info(self, other)
+        elif isinstance(other, dict) or hasattr(other, "info"):
+            res._set_info(combine_info(self, other))
+        elif res is not self:
+            # nothing to combine with
+            res._share_info(self)
         return res
     return wrapper
 
@@ -114,7 +170,10 @@ def copy_info1(func):
 
     def wrapper(self, *args, **kwargs):
         res = func(self, *args, **kwargs)
-        res.info = self.info.copy()
+        if isinstance(res, Dataset):
+            res._share_info(self)
+        else:
+            res.info = self.info.copy()
         return res
     return wrapper
 
@@ -251,11 +310,77 @@ class DatasetID(DatasetID):
                 if getattr(self, key) is not None}
 
 
+class _InfoHolder(object):
+
+    """Metadata dictionary shared by several datasets until modified.
+
+    *shares* is the number of datasets sharing the dictionary besides the
+    first one. The dictionary is *exposed* once it has been handed out, and
+    can't be shared anymore as it may then be modified at any time.
+    """
+
+    def __init__(self, info, exposed=False):
+        self.info = info
+        self.shares = 0
+        self.exposed = exposed
+
+
 class Dataset(np.ma.MaskedArray):
     _array_kwargs = ["mask", "dtype", "copy", "subok",
                      "ndmin", "keep_mask", "hard_mask", "shrink"]
     _shared_kwargs = ["fill_value"]
 
+    @property
+    def info(self):
+        """The metadata of the dataset.
+
+        Metadata dictionaries are copied on write: datasets can share the
+        dictionary of another dataset (see `_share_info`), and get their own
+        copy when it is accessed, as it may then be modified.
+        """
+        holder = self.__dict__.get('_info_holder')
+        if holder is None:
+            holder = self._info_holder = _InfoHolder({})
+        elif holder.shares:
+            holder.shares -= 1
+            holder = self._info_holder = _InfoHolder(holder.info.copy())
+        holder.exposed = True
+        return holder.info
+
+    @info.setter
+    def info(self, info):
+        self._info_holder = _InfoHolder(info, exposed=True)
+
+    def _set_info(self, info):
+        """Set a new metadata dictionary that nothing else refers to."""
+        self._info_holder = _InfoHolder(info)
+
+    def _peek_info(self):
+        """Get the metadata for reading only, without copying it."""
+        holder = self.__dict__.get('_info_holder')
+        if holder is None:
+            return {}
+        return holder.info
+
+    def _share_info(self, other):
+        """Share the metadata of the *other* dataset until it's accessed.
+
+        Metadata that has already been handed out is copied right away.
+        """
+        holder = other.__dict__.get('_info_holder')
+        if holder is None:
+            holder = other._info_holder = _InfoHolder({})
+        if holder.exposed:
+            self._info_holder = _InfoHolder(holder.info.copy())
+            return
+        holder.shares += 1
+        self._info_holder = holder
+
+    def _has_info(self):
+        """Check if the dataset has some metadata, without copying it."""
+        holder = self.__dict__.get('_info_holder')
+        return holder is not None and bool(holder.info)
+
     def __new__(cls, data, **info):
         # Input array is an already formed ndarray instance
         # We first cast to be our class type
@@ -265,8 +390,12 @@ class Dataset(np.ma.MaskedArray):
                              for k in cls._shared_kwargs if k in info})
         obj = np.ma.MaskedArray(data, **array_kwargs).view(cls)
         # add the new attribute to the created instance
-        obj.info = getattr(data, "info", {})
-        obj.info.update(info)
+        data_info = getattr(data, "info", None)
+        if data_info is None:
+            obj._set_info(info)
+        else:
+            data_info.update(info)
+            obj.info = data_info
         # Finally, we must return the newly created object:
         return obj
 
@@ -276,21 +405,21 @@ class Dataset(np.ma.MaskedArray):
         Args:
             obj: another dataset
         """
-        self.info = combine_info(self, obj)
+        # the shared metadata of anything with empty metadata is empty, which
+        # is the case of the views and ufunc results made by numpy
+        if self._has_info():
+            self._set_info(combine_info(self, obj))
 
     def _update_from(self, obj):
         """Copies some attributes of obj to self.
         """
         super(Dataset, self)._update_from(obj)
-        if self.info is None:
-            self.info = {}
         self._update_info(obj)
 
     def __array_finalize__(self, obj):
         # see InfoArray.__array_finalize__ for comments
         if obj is None:
             return
-        self.info = getattr(self, 'info', {})
         super(Dataset, self).__array_finalize__(obj)
         self._update_info(obj)
 
@@ -491,7 +620,7 @@ class Dataset(np.ma.MaskedArray):
             A copy of self.
         """
         res = np.ma.MaskedArray.copy(self)
-        res.info = self.info.copy()
+        res._share_info(self)
         return res
 
     def is_loaded(self):
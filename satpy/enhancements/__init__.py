@@ -27,6 +27,9 @@ import logging
 
 LOG = logging.getLogger(__name__)
 
+#: Number of entries of the lookup tables built by `compile_operations`
+LUT_SIZE = 2 ** 16
+
 
 def stretch(img, **kwargs):
     """Perform stretch."""
@@ -140,3 +143,103 @@ def three_d_effect(img, **kwargs):
         img.channels[i] = np.ma.masked_where(mask,
                                              convolve2d(img.channels[i],
                                                         kernel, mode='same'))
+
+
+class CompiledEnhancement(object):
+
+    """A chain of pointwise enhancement operations fused into lookup tables.
+
+    Each channel *x* is enhanced as ``lut[(x - min_stretch) * scale]``, where
+    the lookup table holds the result of the whole chain sampled on the
+    [*min_stretch*, *max_stretch*] range of the leading crude stretch.
+    """
+
+    def __init__(self, min_stretch, max_stretch, luts):
+        self.min_stretch = min_stretch
+        self.max_stretch = max_stretch
+        self.luts = luts
+
+    def __call__(self, img):
+        """Enhance the channels of *img* in a single lookup pass each."""
+        for idx, chn in enumerate(img.channels):
+            lut = self.luts[idx]
+            scale = (lut.size - 1.0) / (self.max_stretch[idx] -
+                                        self.min_stretch[idx])
+            index = np.multiply(np.ma.getdata(chn), scale, dtype=np.float32)
+            index += 0.5 - self.min_stretch[idx] * scale
+            np.clip(index, 0, lut.size - 1, out=index)
+            img.channels[idx] = np.ma.array(lut.take(index.astype(np.uint16)),
+                                            mask=np.ma.getmask(chn),
+                                            copy=False)
+
+
+def _is_known_crude_stretch(operation):
+    """Check if *operation* is a crude stretch with fixed limits."""
+    kwargs = operation.get('kwargs', {})
+    return (operation['method'] is stretch and
+            kwargs.get('stretch') in ('crude', 'crude-stretch') and
+            kwargs.get('min_stretch') is not None and
+            kwargs.get('max_stretch') is not None)
+
+
+def _per_channel(value, num_channels):
+    if isinstance(value, (list, tuple)):
+        return [float(val) for val in value]
+    return [float(value)] * num_channels
+
+
+def compile_operations(operations, mode, lut_size=LUT_SIZE):
+    """Fuse the enhancement *operations* into per-channel lookup tables.
+
+    This is possible when the chain starts with a crude stretch with known
+    limits, followed only by pointwise monotonic operations (crude stretches
+    with known limits, gamma, invert and cira_stretch), and when the chain
+    saturates to 0 or 1 on both ends of the stretched range so that values
+    outside of it are handled by clipping the lookup index.
+
+    The result differs from the sequential operations only by the sampling of
+    the stretched range with *lut_size* points, that is at most one level
+    once the image is finalized to 8 bits.
+
+    Returns:
+        A `CompiledEnhancement` or None if the chain can't be compiled.
+    """
+    if mode not in ('L', 'RGB') or not operations:
+        return None
+    if not _is_known_crude_stretch(operations[0]):
+        return None
+    for operation in operations[1:]:
+        if not (operation['method'] in (gamma, invert, cira_stretch) or
+                _is_known_crude_stretch(operation)):
+            return None
+
+    num_channels = len(mode)
+    kwargs = operations[0]['kwargs']
+    min_stretch = _per_channel(kwargs['min_stretch'], num_channels)
+    max_stretch = _per_channel(kwargs['max_stretch'], num_channels)
+    if any(mn == mx for mn, mx in zip(min_stretch, max_stretch)):
+        return None
+
+    # run the rest of the chain on a ramp covering the stretched range
+    from trollimage.image import Image
+    ramp = np.linspace(0, 1, lut_size)
+    samples = Image([ramp] * num_channels, mode=mode)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for operation in operations[1:]:
+            operation['method'](samples, *operation.get('args', []),
+                                **operation.get('kwargs', {}))
+
+    luts = []
+    for chn in samples.channels:
+        lut = np.ma.getdata(chn)
+        steps = np.diff(lut)
+        if not (np.all(steps >= 0) or np.all(steps <= 0)):
+            LOG.debug("Enhancement chain is not monotonic, not compiling it")
+            return None
+        lut = np.clip(lut, 0, 1).astype(np.float32)
+        if lut[0] not in (0, 1) or lut[-1] not in (0, 1):
+            LOG.debug("Enhancement chain doesn't saturate, not compiling it")
+            return None
+        luts.append(lut)
+
+    return CompiledEnhancement(min_stretch, max_stretch, luts)
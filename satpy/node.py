@@ -217,7 +217,7 @@ class DependencyTree(Node):
         for c in self.children:
             c = c.copy()
             new_tree.add_child(new_tree, c)
-        new_tree._all_nodes = new_tree.flatten(d=self._all_nodes)
+        new_tree._all_nodes = new_tree.flatten(d=DatasetDict())
         return new_tree
 
     def __contains__(self, item):
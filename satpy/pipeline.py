@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 PyTroll developers
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Pipelines processing the same products for a series of time slots.
+
+A `Pipeline` is set up once with the reader, the products, the target areas
+and the writer, and is then run on the files of each time slot::
+
+    pipeline = Pipeline('ahi_hsd', ['true_color', 'B13'],
+                        areas=['australia'], writer='geotiff',
+                        writer_kwargs={'base_dir': '/data/products'})
+    for filenames in time_slots:
+        pipeline(filenames)
+
+The reader configuration, the compositors, the dependency tree of the
+products, the target area definitions and the writer (with its enhancements)
+are only set up for the first slot and reused afterwards.
+"""
+
+import copy
+import logging
+
+import numpy as np
+import six
+
+from pyresample.geometry import AreaDefinition, SwathDefinition
+from satpy.config import get_environ_config_dir
+from satpy.resample import KDTreeResampler, get_area_def
+from satpy.scene import Scene
+
+LOG = logging.getLogger(__name__)
+
+
+class Pipeline(object):
+
+    """Process *products* for a series of time slots.
+
+    Args:
+        reader (str or list): The name of the reader(s) to use.
+        products (iterable): The names or DatasetIDs of the datasets and
+            composites to generate.
+        areas (iterable): The areas (names or definitions) to resample the
+            products to. If not given, the products are kept in the
+            projection of the data.
+        writer (str): The writer to save the products with, if any.
+        reader_kwargs (dict): Keyword arguments for the readers.
+        resample_kwargs (dict): Keyword arguments for `Scene.resample`, eg.
+            `cache_dir` to keep the resampling parameters on disk.
+        writer_kwargs (dict): Keyword arguments for the writer.
+        calibration, resolution, polarization: Preferences used to find the
+            products, as in `Scene.load`.
+    """
+
+    def __init__(self, reader, products, areas=None, writer=None,
+                 ppp_config_dir=get_environ_config_dir(),
+                 reader_kwargs=None, resample_kwargs=None,
+                 writer_kwargs=None, calibration=None, resolution=None,
+                 polarization=None):
+        self.reader = reader
+        self.products = set(products)
+        self.areas = [get_area_def(area)
+                      if isinstance(area, six.string_types) else area
+                      for area in areas or []]
+        self.writer_name = writer
+        self.ppp_config_dir = ppp_config_dir
+        self.reader_kwargs = reader_kwargs
+        self.resample_kwargs = resample_kwargs or {}
+        self.writer_kwargs = writer_kwargs or {}
+        self.dep_kwargs = {'calibration': calibration,
+                           'resolution': resolution,
+                           'polarization': polarization}
+
+        self.readers = None
+        self.cpl = None
+        self.dep_tree = None
+        self.wishlist = None
+        self.writer = None
+
+    def _create_template(self, filenames):
+        """Create the scene of the first slot, and keep what can be reused."""
+        scn = Scene(filenames=filenames, reader=self.reader,
+                    reader_kwargs=self.reader_kwargs,
+                    ppp_config_dir=self.ppp_config_dir)
+        wishlist = set(self.products)
+        unknown = scn.dep_tree.find_dependencies(wishlist, **self.dep_kwargs)
+        if unknown:
+            unknown_str = ", ".join(map(str, unknown))
+            raise KeyError("Unknown datasets: {}".format(unknown_str))
+        scn.wishlist = wishlist
+
+        self.readers = scn.readers
+        self.cpl = scn.cpl
+        # the copy keeps the dataset ids as found, before generation
+        self.dep_tree = scn.dep_tree.copy()
+        self.wishlist = set(wishlist)
+        return scn
+
+    def _create_readers(self, filenames):
+        """Create reader instances like the template ones for *filenames*."""
+        readers = {}
+        for name, template in self.readers.items():
+            reader_instance = copy.copy(template)
+            reader_instance.info = template.info.copy()
+            reader_instance.info.pop('filenames', None)
+            reader_instance.ids = template.ids.copy()
+            reader_instance.file_handlers = {}
+            loadables = reader_instance.select_files_from_pathnames(filenames)
+            if loadables:
+                reader_instance.create_filehandlers(loadables)
+                readers[name] = reader_instance
+        return readers
+
+    def create_scene(self, filenames):
+        """Create the scene of a time slot, ready to be computed."""
+        if self.readers is None:
+            return self._create_template(filenames)
+
+        scn = Scene(ppp_config_dir=self.ppp_config_dir)
+        scn.readers = self._create_readers(filenames)
+        scn.info.update(scn._compute_metadata_from_readers())
+        scn.cpl = self.cpl
+        scn.dep_tree = self.dep_tree.copy()
+        scn.dep_tree.readers = scn.readers
+        scn.wishlist = set(self.wishlist)
+        return scn
+
+    def get_writer(self, scn):
+        """Get the writer, created once for all the slots."""
+        if self.writer is None:
+            self.writer = scn.get_writer(self.writer_name,
+                                         **self.writer_kwargs)
+        return self.writer
+
+    def precompute(self, scn):
+        """Precompute the kd-tree resampling of *scn* to all the areas.
+
+        The kd-tree of each source area is then built once for all the
+        target areas instead of once per area.
+        """
+        kwargs = self.resample_kwargs.copy()
+        if kwargs.pop('resampler', 'kd_tree') not in ('kd_tree', 'nearest'):
+            return
+        mask_area = kwargs.pop('mask_area', True)
+        for dataset in scn:
+            area = dataset.info.get('area')
+            if not isinstance(area, (AreaDefinition, SwathDefinition)):
+                continue
+            mask = None
+            if mask_area:
+                # the same mask as the one used when resampling
+                data = np.rollaxis(dataset, 0, 3) if dataset.ndim == 3 \
+                    else dataset
+                mask = getattr(data, 'mask', None)
+            KDTreeResampler.precompute_targets(area, self.areas, mask=mask,
+                                               **kwargs)
+
+    def __call__(self, filenames, **save_kwargs):
+        """Process the time slot of *filenames*.
+
+        Returns:
+            The list of scenes of the products, one for each area (or just
+            the scene of the data if no areas were given).
+        """
+        scn = self.create_scene(filenames)
+        scn.read()
+        keepables = scn.compute()
+        if scn.missing_datasets:
+            missing = scn.missing_datasets.copy()
+            scn._remove_failed_datasets(keepables)
+            LOG.warning("The following datasets were not created: %s",
+                        ", ".join(str(x) for x in missing))
+        scn.unload(keepables=keepables)
+
+        if len(self.areas) > 1:
+            self.precompute(scn)
+        if self.areas:
+            scenes = [scn.resample(area, **self.resample_kwargs)
+                      for area in self.areas]
+        else:
+            scenes = [scn]
+
+        if self.writer_name is not None:
+            writer = self.get_writer(scn)
+            for local_scn in scenes:
+                writer.save_datasets(list(local_scn.datasets.values()),
+                                     **save_kwargs)
+        return scenes
@@ -24,9 +24,9 @@
 
 import logging
 import os
-import yaml
 
-from satpy.config import config_search_paths, get_environ_config_dir, recursive_dict_update
+from satpy.config import (config_search_paths, get_environ_config_dir,
+                          load_yaml_config, recursive_dict_update)
 
 try:
     import configparser
@@ -64,5 +64,5 @@ class Plugin(object):
                 self.load_yaml_config(config_file)
 
     def load_yaml_config(self, conf):
-        with open(conf) as fd:
-            self.config = recursive_dict_update(self.config, yaml.load(fd))
+        self.config = recursive_dict_update(self.config,
+                                            load_yaml_config(conf))
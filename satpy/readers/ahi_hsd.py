@@ -34,9 +34,11 @@ from datetime import datetime, timedelta
 import numpy as np
 
 from pyresample import geometry
+from satpy.config import get_float_dtype
 from satpy.dataset import Dataset
 from satpy.readers.file_handlers import BaseFileHandler
-from satpy.readers.helper_functions import (get_geostationary_angle_extent,
+from satpy.readers.helper_functions import (calibrate_counts,
+                                            get_geostationary_mask,
                                             np2str)
 
 AHI_CHANNEL_NAMES = ("1", "2", "3", "4", "5",
@@ -190,6 +192,12 @@ _NAVIGATION_CORRECTION_INFO_TYPE = np.dtype([
     ("numof_correction_info_data", "<u2"),
 ])
 
+_NAVIGATION_CORRECTION_TYPE = np.dtype([
+    ("line_number_after_rotation", "<u2"),
+    ("shift_amount_for_column_direction", "f4"),
+    ("shift_amount_for_line_direction", "f4"),
+])
+
 # 9 Observation time information block
 _OBS_TIME_INFO_TYPE = np.dtype([
     ("hblock_number", "u1"),
@@ -197,6 +205,11 @@ _OBS_TIME_INFO_TYPE = np.dtype([
     ("number_of_observation_times", "<u2"),
 ])
 
+_OBS_TIME_TYPE = np.dtype([
+    ("line_number", "<u2"),
+    ("observation_time", "f8"),
+])
+
 # 10 Error information block
 _ERROR_INFO_TYPE = np.dtype([
     ("hblock_number", "u1"),
@@ -204,6 +217,11 @@ _ERROR_INFO_TYPE = np.dtype([
     ("number_of_error_info_data", "<u2"),
 ])
 
+_ERROR_LINE_TYPE = np.dtype([
+    ("line_number", "<u2"),
+    ("numof_error_pixels_per_line", "<u2"),
+])
+
 # 11 Spare block
 _SPARE_TYPE = np.dtype([
     ("hblock_number", "u1"),
@@ -226,28 +244,87 @@ class AHIHSDFileHandler(BaseFileHandler):
         self.units = dict([(i, 'counts') for i in AHI_CHANNEL_NAMES])
 
         self._data = dict([(i, None) for i in AHI_CHANNEL_NAMES])
-        self._header = dict([(i, None) for i in AHI_CHANNEL_NAMES])
+        self._memmap = None
         self.lons = None
         self.lats = None
         self.segment_number = filename_info['segment_number']
         self.total_segments = filename_info['total_segments']
 
-        with open(self.filename) as fd:
-            self.basic_info = np.fromfile(fd,
-                                          dtype=_BASIC_INFO_TYPE,
-                                          count=1)
-            self.data_info = np.fromfile(fd,
-                                         dtype=_DATA_INFO_TYPE,
-                                         count=1)
-            self.proj_info = np.fromfile(fd,
-                                         dtype=_PROJ_INFO_TYPE,
-                                         count=1)[0]
-            self.nav_info = np.fromfile(fd,
-                                        dtype=_NAV_INFO_TYPE,
-                                        count=1)[0]
+        self._header = self._read_header()
+        self.basic_info = self._header['block1']
+        self.data_info = self._header['block2']
+        self.proj_info = self._header['block3'][0]
+        self.nav_info = self._header['block4'][0]
         self.platform_name = np2str(self.basic_info['satellite'])
         self.sensor = 'ahi'
 
+    def _read_header(self):
+        """Read all the header blocks of the file at once.
+
+        Each block starts with its number and length, the variable length
+        blocks being followed by their records and 40 spare bytes.
+        """
+        with open(self.filename, "rb") as fp_:
+            basic_info = np.fromfile(fp_, dtype=_BASIC_INFO_TYPE, count=1)
+            fp_.seek(0)
+            buf = fp_.read(int(basic_info['total_header_length'][0]))
+
+        header = {}
+        offset = [0]
+
+        def read_block(dtype, records_dtype=None, records_key=None):
+            block = np.frombuffer(buf, dtype=dtype, count=1, offset=offset[0])
+            if records_dtype is not None:
+                header[records_key] = np.frombuffer(
+                    buf, dtype=records_dtype, count=int(block[records_key][0]),
+                    offset=offset[0] + dtype.itemsize)
+            offset[0] += int(block['blocklength'][0])
+            return block
+
+        header['block1'] = read_block(_BASIC_INFO_TYPE)
+        header['block2'] = read_block(_DATA_INFO_TYPE)
+        header['block3'] = read_block(_PROJ_INFO_TYPE)
+        header['block4'] = read_block(_NAV_INFO_TYPE)
+        block5_offset = offset[0]
+        header['block5'] = read_block(_CAL_INFO_TYPE)
+        if header['block5']['band_number'][0] < 7:
+            cal_dtype = _VISCAL_INFO_TYPE
+        else:
+            cal_dtype = _IRCAL_INFO_TYPE
+        header['calibration'] = np.frombuffer(
+            buf, dtype=cal_dtype, count=1,
+            offset=block5_offset + _CAL_INFO_TYPE.itemsize)
+        header['block6'] = read_block(_INTER_CALIBRATION_INFO_TYPE)
+        header['block7'] = read_block(_SEGMENT_INFO_TYPE)
+        header['block8'] = read_block(_NAVIGATION_CORRECTION_INFO_TYPE,
+                                      _NAVIGATION_CORRECTION_TYPE,
+                                      'numof_correction_info_data')
+        header['navigation_corrections'] = header.pop(
+            'numof_correction_info_data')
+        header['block9'] = read_block(_OBS_TIME_INFO_TYPE,
+                                      _OBS_TIME_TYPE,
+                                      'number_of_observation_times')
+        header['observation_time_information'] = header.pop(
+            'number_of_observation_times')
+        header['block10'] = read_block(_ERROR_INFO_TYPE,
+                                       _ERROR_LINE_TYPE,
+                                       'number_of_error_info_data')
+        header['error_information_data'] = header.pop(
+            'number_of_error_info_data')
+        return header
+
+    @property
+    def memmap(self):
+        """Memory map of the image counts of the segment."""
+        if self._memmap is None:
+            nlines = int(self.data_info['number_of_lines'][0])
+            ncols = int(self.data_info['number_of_columns'][0])
+            self._memmap = np.memmap(
+                self.filename, dtype='<u2', mode='r',
+                offset=int(self.basic_info['total_header_length'][0]),
+                shape=(nlines, ncols))
+        return self._memmap
+
     def get_shape(self, dsid, ds_info):
         return int(self.data_info['number_of_lines']), int(self.data_info['number_of_columns'])
 
@@ -264,15 +341,14 @@ class AHIHSDFileHandler(BaseFileHandler):
     def get_dataset(self, key, info, out=None, xslice=slice(None), yslice=slice(None)):
         to_return = out is None
         if out is None:
-            nlines = int(self.data_info['number_of_lines'])
-            ncols = int(self.data_info['number_of_columns'])
-            out = Dataset(np.ma.empty((nlines, ncols), dtype=np.float32))
+            shape = self.memmap[yslice, xslice].shape
+            out = Dataset(np.empty(shape, dtype=get_float_dtype()),
+                          mask=np.zeros(shape, dtype=bool))
 
         self.read_band(key, info, out, xslice, yslice)
 
         if to_return:
-            from satpy.yaml_reader import Shuttle
-            return Shuttle(out.data, out.mask, out.info)
+            return out
 
     def get_area_def(self, dsid):
         del dsid
@@ -326,132 +402,32 @@ class AHIHSDFileHandler(BaseFileHandler):
 
     def geo_mask(self, lineslice=None, colslice=None):
         """Masking the space pixels from geometry info."""
-        cfac = np.uint32(self.proj_info['CFAC'])
-        lfac = np.uint32(self.proj_info['LFAC'])
-        coff = np.float32(self.proj_info['COFF'])
-        loff = np.float32(self.proj_info['LOFF'])
-        nlines = int(self.data_info['number_of_lines'])
-        ncols = int(self.data_info['number_of_columns'])
-
-        # count starts at 1
-        local_coff = 1
-        local_loff = (self.total_segments - self.segment_number) * nlines + 1
-
-        xmax, ymax = get_geostationary_angle_extent(self.area)
-
-        pixel_cmax = np.rad2deg(xmax) * cfac * 1.0 / 2**16
-        pixel_lmax = np.rad2deg(ymax) * lfac * 1.0 / 2**16
-
-        def ellipse(line, col):
-            line /= pixel_lmax
-            line *= line
-            col /= pixel_cmax
-            col *= col
-            return (line + col) > 1
-
-        cols_idx = np.arange(-(coff - local_coff),
-                             ncols - (coff - local_coff),
-                             dtype=np.float)[colslice]
-        lines_idx = np.arange(nlines - (loff - local_loff),
-                              -(loff - local_loff),
-                              -1,
-                              dtype=np.float)[lineslice]
-
-        return ellipse(lines_idx[:, None], cols_idx[None, :])
+        if lineslice is None:
+            lineslice = slice(None)
+        if colslice is None:
+            colslice = slice(None)
+        return get_geostationary_mask(self.area, lineslice, colslice)
 
     def read_band(self, key, info, out=None, xslice=slice(None), yslice=slice(None)):
         """Read the data"""
         tic = datetime.now()
-        header = {}
-        with open(self.filename, "rb") as fp_:
-
-            header['block1'] = np.fromfile(
-                fp_, dtype=_BASIC_INFO_TYPE, count=1)
-            header["block2"] = np.fromfile(fp_, dtype=_DATA_INFO_TYPE, count=1)
-            header["block3"] = np.fromfile(fp_, dtype=_PROJ_INFO_TYPE, count=1)
-            header["block4"] = np.fromfile(fp_, dtype=_NAV_INFO_TYPE, count=1)
-            header["block5"] = np.fromfile(fp_, dtype=_CAL_INFO_TYPE, count=1)
-            logger.debug("Band number = " +
-                         str(header["block5"]['band_number'][0]))
-            logger.debug('Time_interval: %s - %s',
-                         str(self.start_time), str(self.end_time))
-            band_number = header["block5"]['band_number'][0]
-            if band_number < 7:
-                cal = np.fromfile(fp_, dtype=_VISCAL_INFO_TYPE, count=1)
-            else:
-                cal = np.fromfile(fp_, dtype=_IRCAL_INFO_TYPE, count=1)
-
-            header['calibration'] = cal
-
-            header["block6"] = np.fromfile(
-                fp_, dtype=_INTER_CALIBRATION_INFO_TYPE, count=1)
-            header["block7"] = np.fromfile(
-                fp_, dtype=_SEGMENT_INFO_TYPE, count=1)
-            header["block8"] = np.fromfile(
-                fp_, dtype=_NAVIGATION_CORRECTION_INFO_TYPE, count=1)
-            # 8 The navigation corrections:
-            ncorrs = header["block8"]['numof_correction_info_data'][0]
-            dtype = np.dtype([
-                ("line_number_after_rotation", "<u2"),
-                ("shift_amount_for_column_direction", "f4"),
-                ("shift_amount_for_line_direction", "f4"),
-            ])
-            corrections = []
-            for i in range(ncorrs):
-                corrections.append(np.fromfile(fp_, dtype=dtype, count=1))
-            fp_.seek(40, 1)
-            header['navigation_corrections'] = corrections
-            header["block9"] = np.fromfile(fp_,
-                                           dtype=_OBS_TIME_INFO_TYPE,
-                                           count=1)
-            numobstimes = header["block9"]['number_of_observation_times'][0]
-
-            dtype = np.dtype([
-                ("line_number", "<u2"),
-                ("observation_time", "f8"),
-            ])
-            lines_and_times = []
-            for i in range(numobstimes):
-                lines_and_times.append(np.fromfile(fp_,
-                                                   dtype=dtype,
-                                                   count=1))
-            header['observation_time_information'] = lines_and_times
-            fp_.seek(40, 1)
-
-            header["block10"] = np.fromfile(fp_,
-                                            dtype=_ERROR_INFO_TYPE,
-                                            count=1)
-            dtype = np.dtype([
-                ("line_number", "<u2"),
-                ("numof_error_pixels_per_line", "<u2"),
-            ])
-            num_err_info_data = header["block10"][
-                'number_of_error_info_data'][0]
-            err_info_data = []
-            for i in range(num_err_info_data):
-                err_info_data.append(np.fromfile(fp_, dtype=dtype, count=1))
-            header['error_information_data'] = err_info_data
-            fp_.seek(40, 1)
-
-            dummy = np.fromfile(fp_, dtype=_SPARE_TYPE, count=1)
-
-            nlines = int(header["block2"]['number_of_lines'][0])
-            ncols = int(header["block2"]['number_of_columns'][0])
-            out.data[:] = np.fromfile(
-                fp_, dtype='<u2', count=nlines * ncols).reshape((nlines, ncols)).astype(np.float32)[yslice, xslice]
-
-        self._header = header
-
-        out.mask[header['block5']["count_value_outside_scan_pixels"]
-                 [0] == out.data] = True
-        out.mask[header['block5']["count_value_error_pixels"]
-                 [0] == out.data] = True
-
-        out.mask[self.geo_mask(yslice, xslice)] = True
+        header = self._header
+        logger.debug("Band number = " +
+                     str(header["block5"]['band_number'][0]))
+        logger.debug('Time_interval: %s - %s',
+                     str(self.start_time), str(self.end_time))
+
+        # the requested counts are read once from the file, and both the
+        # mask and the calibrated values are derived from them
+        counts = np.array(self.memmap[yslice, xslice])
+        mask = counts == header['block5']["count_value_outside_scan_pixels"][0]
+        mask |= counts == header['block5']["count_value_error_pixels"][0]
+        mask |= self.geo_mask(yslice, xslice)
+        out.mask[:] = mask
 
         logger.debug("Reading time " + str(datetime.now() - tic))
 
-        self.calibrate(out, key.calibration)
+        self.calibrate(out, key.calibration, counts)
 
         new_info = dict(units=info['units'],
                         standard_name=info['standard_name'],
@@ -469,22 +445,38 @@ class AHIHSDFileHandler(BaseFileHandler):
                                                  self.proj_info['earth_equatorial_radius']) * 1000)
         out.info.update(new_info)
 
-    def calibrate(self, data, calibration):
-        """Calibrate the data"""
+    def calibrate(self, data, calibration, counts=None):
+        """Calibrate the data.
+
+        The *counts* of *data* can be given instead of being read from it.
+        """
         tic = datetime.now()
 
+        if counts is not None and calibration not in ['radiance', 'reflectance',
+                                                      'brightness_temperature']:
+            data.data[:] = counts
         if calibration == 'counts':
             return
 
         if calibration in ['radiance', 'reflectance', 'brightness_temperature']:
-            self.convert_to_radiance(data)
+            # the calibration blocks hold all the coefficients
+            key = ('ahi_hsd', calibration,
+                   self._header['block5'].tobytes(),
+                   self._header['calibration'].tobytes())
+            calibrate_counts(data,
+                             lambda cnts: self._calibrate(cnts, calibration),
+                             key, counts)
+
+        logger.debug("Calibration time " + str(datetime.now() - tic))
+
+    def _calibrate(self, data, calibration):
+        """Calibrate the data pixel by pixel."""
+        self.convert_to_radiance(data)
         if calibration == 'reflectance':
             self._vis_calibrate(data)
         elif calibration == 'brightness_temperature':
             self._ir_calibrate(data)
 
-        logger.debug("Calibration time " + str(datetime.now() - tic))
-
     def convert_to_radiance(self, data):
         """Calibrate to radiance.
         """
@@ -171,8 +171,10 @@ class CLAVRXFileHandler(HDF4FileHandler):
 
 class CLAVRXYAMLReader(FileYAMLReader):
     def create_filehandlers(self, filenames):
-        super(CLAVRXYAMLReader, self).create_filehandlers(filenames)
+        new_filehandlers = super(CLAVRXYAMLReader, self).create_filehandlers(
+            filenames)
         self.load_ds_ids_from_files()
+        return new_filehandlers
 
     def load_ds_ids_from_files(self):
         for file_handlers in self.file_handlers.values():
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2018 PyTroll developers
+#
+# This file is part of satpy.
+#
+# satpy is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# satpy is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# satpy.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Persistent index of the footprints of granule files.
+
+The footprint of a file is the bounding box returned by the
+`get_bounding_box` method of its file handler. Once recorded, it allows
+rejecting the files that don't cover the `area` filter parameter without
+opening them again::
+
+    scn = Scene(filenames=filenames, reader='viirs_sdr',
+                filter_parameters={'area': 'euron1',
+                                   'footprint_index': '/data/footprints.json'})
+
+"""
+
+import json
+import logging
+import os
+
+import numpy as np
+import six
+
+LOG = logging.getLogger(__name__)
+
+_INDEXES = {}
+
+
+class FootprintIndex(object):
+
+    """Footprints of granule files, stored as json in *filename*.
+
+    The files are identified by their base name and size, so that the index
+    stays valid when the files are moved, but not when they are replaced by
+    a different file of the same name.
+    """
+
+    def __init__(self, filename=None):
+        self.filename = filename
+        self.footprints = {}
+        self.modified = False
+        if filename is not None and os.path.exists(filename):
+            self.footprints.update(self._read())
+
+    def _read(self):
+        try:
+            with open(self.filename) as fdes:
+                return json.load(fdes)
+        except (IOError, OSError, ValueError) as err:
+            LOG.warning("Can't read footprint index %s: %s",
+                        self.filename, str(err))
+            return {}
+
+    @staticmethod
+    def file_key(filename):
+        """Get the key of *filename* in the index."""
+        try:
+            size = os.path.getsize(filename)
+        except OSError:
+            size = None
+        return "{}:{}".format(os.path.basename(filename), size)
+
+    def get(self, filename):
+        """Get the footprint of *filename* as a (lons, lats) tuple.
+
+        Returns None if the footprint of the file isn't known.
+        """
+        footprint = self.footprints.get(self.file_key(filename))
+        if footprint is None:
+            return None
+        return tuple(np.array(coords) for coords in footprint)
+
+    def add(self, filename, lons, lats):
+        """Record the footprint of *filename*."""
+        self.footprints[self.file_key(filename)] = [
+            np.asarray(lons, dtype=np.float64).ravel().tolist(),
+            np.asarray(lats, dtype=np.float64).ravel().tolist()]
+        self.modified = True
+
+    def save(self):
+        """Write the index to disk if footprints were added.
+
+        The footprints recorded on disk in the meantime by other processes
+        are kept.
+        """
+        if self.filename is None or not self.modified:
+            return
+        footprints = {}
+        if os.path.exists(self.filename):
+            footprints.update(self._read())
+        footprints.update(self.footprints)
+        tmp_filename = "{}.{}.tmp".format(self.filename, os.getpid())
+        with open(tmp_filename, 'w') as fdes:
+            json.dump(footprints, fdes)
+        if os.path.exists(self.filename) and os.name == 'nt':
+            os.remove(self.filename)
+        os.rename(tmp_filename, self.filename)
+        self.footprints = footprints
+        self.modified = False
+
+
+def get_footprint_index(index):
+    """Get the `FootprintIndex` stored in the file *index*.
+
+    The indexes are shared in the process. *index* can also be a
+    `FootprintIndex` instance, which is then returned as is.
+    """
+    if not isinstance(index, six.string_types):
+        return index
+    filename = os.path.abspath(index)
+    if filename not in _INDEXES:
+        _INDEXES[filename] = FootprintIndex(filename)
+    return _INDEXES[filename]
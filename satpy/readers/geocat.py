@@ -245,8 +245,10 @@ class GEOCATFileHandler(NetCDF4FileHandler):
 
 class GEOCATYAMLReader(FileYAMLReader):
     def create_filehandlers(self, filenames):
-        super(GEOCATYAMLReader, self).create_filehandlers(filenames)
+        new_filehandlers = super(GEOCATYAMLReader, self).create_filehandlers(
+            filenames)
         self.load_ds_ids_from_files()
+        return new_filehandlers
 
     def load_ds_ids_from_files(self):
         for file_handlers in self.file_handlers.values():
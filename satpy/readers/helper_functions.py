@@ -25,12 +25,25 @@
 """Helper functions for area extent calculations."""
 
 import logging
+from collections import OrderedDict
 
 import numpy as np
-from pyresample.geometry import AreaDefinition
+from pyresample.geometry import (AreaDefinition, StackedAreaDefinition,
+                                 SwathDefinition)
 
 LOGGER = logging.getLogger(__name__)
 
+#: Count calibration lookup tables shared by the readers, most recent last
+_COUNT_LUTS = OrderedDict()
+#: Maximum number of lookup tables kept in `_COUNT_LUTS`
+COUNT_LUTS_SIZE = 64
+#: Number of entries of the count calibration lookup tables
+COUNT_LUT_SIZE = 2 ** 16
+#: Earth disk column ranges of geostationary areas, most recent last
+_DISK_RANGES = OrderedDict()
+#: Maximum number of areas kept in `_DISK_RANGES`
+DISK_RANGES_SIZE = 64
+
 
 def np2str(value):
     """Convert an np.string_ to str."""
@@ -108,6 +121,69 @@ def get_geostationary_bounding_box(geos_area, nb_points=50):
     return _lonlat_from_geos_angle(x, y, geos_area)
 
 
+def _compute_geostationary_disk_ranges(geos_area):
+    """Compute the earth disk column ranges of *geos_area* row by row.
+
+    A pixel is on the earth disk if its center is inside the ellipse of the
+    maximum viewing angles, so the valid pixels of each row are contiguous
+    and the range bounds can be computed analytically.
+    """
+    xmax, ymax = get_geostationary_angle_extent(geos_area)
+    ll_x, ll_y, ur_x, ur_y = (np.array(geos_area.area_extent) /
+                              geos_area.proj_dict['h'])
+    ncols, nlines = geos_area.x_size, geos_area.y_size
+    pixel_x = (ur_x - ll_x) / ncols
+    pixel_y = (ur_y - ll_y) / nlines
+
+    # viewing angles of the pixel centers of each row
+    y__ = ur_y - (np.arange(nlines) + 0.5) * pixel_y
+    half_widths = xmax * np.sqrt(np.clip(1 - (y__ / ymax) ** 2, 0, None))
+
+    # columns whose center is within [-half_width, half_width]
+    bounds = np.stack([(-half_widths - ll_x) / pixel_x - 0.5,
+                       (half_widths - ll_x) / pixel_x - 0.5])
+    bounds.sort(axis=0)
+    ranges = np.empty((nlines, 2), dtype=np.int32)
+    ranges[:, 0] = np.clip(np.ceil(bounds[0]), 0, ncols)
+    ranges[:, 1] = np.clip(np.floor(bounds[1]) + 1, 0, ncols)
+    ranges[np.abs(y__) > ymax] = 0
+    ranges[:, 1] = np.maximum(ranges[:, 0], ranges[:, 1])
+    return ranges
+
+
+def get_geostationary_disk_ranges(geos_area):
+    """Get the columns ranges covering the earth disk in *geos_area*.
+
+    The ranges are computed once per projection and geometry, and shared by
+    all the readers.
+
+    Returns:
+        An (nlines, 2) array with the start and stop columns of the valid
+        pixels of each row, equal for rows fully in space.
+    """
+    key = (tuple(sorted(geos_area.proj_dict.items())),
+           tuple(geos_area.area_extent), geos_area.shape)
+    try:
+        ranges = _DISK_RANGES.pop(key)
+    except KeyError:
+        ranges = _compute_geostationary_disk_ranges(geos_area)
+        ranges.setflags(write=False)
+        if len(_DISK_RANGES) >= DISK_RANGES_SIZE:
+            _DISK_RANGES.popitem(last=False)
+    _DISK_RANGES[key] = ranges
+    return ranges
+
+
+def get_geostationary_mask(geos_area, yslice=slice(None), xslice=slice(None)):
+    """Get the space pixel mask of the *yslice*, *xslice* part of *geos_area*.
+
+    The mask is True for the pixels outside the earth disk.
+    """
+    ranges = get_geostationary_disk_ranges(geos_area)[yslice]
+    cols = np.arange(geos_area.x_size)[xslice]
+    return ((cols < ranges[:, :1]) | (cols >= ranges[:, 1:]))
+
+
 def get_area_slices(data_area, area_to_cover):
     """Compute the slice to read from an *area* based on an *area_to_cover*."""
 
@@ -154,3 +230,159 @@ def get_sub_area(area, xslice, yslice):
                           xslice.stop - xslice.start,
                           yslice.stop - yslice.start,
                           new_area_extent)
+
+
+def get_area_rows(area, yslice):
+    """Get the area of the *yslice* rows of *area*.
+
+    *area* can be an `AreaDefinition` or a `StackedAreaDefinition`, as
+    returned for segmented data.
+    """
+    if isinstance(area, StackedAreaDefinition):
+        definitions = area.defs
+    else:
+        definitions = [area]
+    areas = []
+    offset = 0
+    for definition in definitions:
+        start = max(yslice.start - offset, 0)
+        stop = min(yslice.stop - offset, definition.y_size)
+        if start < stop:
+            areas.append(get_sub_area(definition,
+                                      slice(0, definition.x_size),
+                                      slice(start, stop)))
+        offset += definition.y_size
+    return StackedAreaDefinition(*areas).squeeze()
+
+
+def get_swath_slices(swath, area_to_cover, rows_per_scan=None, stride=16,
+                     columns=False):
+    """Compute the slices of a *swath* covering an *area_to_cover*.
+
+    The longitudes and latitudes of the swath are subsampled every *stride*
+    lines and columns, and the lines having a subsampled pixel inside the
+    area are kept, with a margin of *stride* lines. The lines are then
+    expanded to whole scans of *rows_per_scan* lines, so that the data can
+    still be resampled scan by scan (EWA). With *columns*, the columns are
+    restricted the same way.
+
+    Raises:
+        ValueError: if no subsampled pixel of the swath is inside the area.
+    """
+    from pyproj import Proj
+
+    nlines, ncols = swath.shape
+    lines = np.unique(np.r_[0:nlines:stride, nlines - 1])
+    cols = np.unique(np.r_[0:ncols:stride, ncols - 1])
+    lons = np.ma.getdata(swath.lons)[lines[:, np.newaxis], cols]
+    lats = np.ma.getdata(swath.lats)[lines[:, np.newaxis], cols]
+
+    valid = (np.isfinite(lons) & np.isfinite(lats) &
+             (np.abs(lons) <= 180) & (np.abs(lats) <= 90))
+    x__, y__ = Proj(area_to_cover.proj_dict)(np.where(valid, lons, 0),
+                                            np.where(valid, lats, 0))
+    ll_x, ll_y, ur_x, ur_y = area_to_cover.area_extent
+    with np.errstate(invalid='ignore'):
+        inside = (valid &
+                  (x__ >= min(ll_x, ur_x)) & (x__ <= max(ll_x, ur_x)) &
+                  (y__ >= min(ll_y, ur_y)) & (y__ <= max(ll_y, ur_y)))
+    if not inside.any():
+        raise ValueError("Swath doesn't overlap the area")
+
+    rows_per_scan = rows_per_scan or 1
+    covered = lines[inside.any(axis=1)]
+    start = max(covered[0] - stride, 0) // rows_per_scan * rows_per_scan
+    stop = min(covered[-1] + stride + 1, nlines)
+    stop = min(-(-stop // rows_per_scan) * rows_per_scan, nlines)
+    yslice = slice(int(start), int(stop))
+
+    xslice = slice(0, ncols)
+    if columns:
+        covered = cols[inside.any(axis=0)]
+        xslice = slice(int(max(covered[0] - stride, 0)),
+                       int(min(covered[-1] + stride + 1, ncols)))
+
+    return xslice, yslice
+
+
+def get_sub_swath(swath, xslice, yslice):
+    """Apply slices to the longitudes and latitudes of a *swath*."""
+    sub_swath = SwathDefinition(swath.lons[yslice, xslice],
+                                swath.lats[yslice, xslice])
+    if hasattr(swath, 'name'):
+        sub_swath.name = "{}_{}-{}_{}-{}".format(swath.name,
+                                                 yslice.start, yslice.stop,
+                                                 xslice.start, xslice.stop)
+    return sub_swath
+
+
+def _count_index(data):
+    """Get the counts of *data* as lookup table indices.
+
+    Returns None if *data* doesn't hold only integer counts fitting on 16
+    bits. For floats, casting is enough to check it: negative, too large and
+    non-integer values don't survive the round trip.
+    """
+    arr = data.data
+    if arr.size == 0 or arr.dtype.kind not in 'iuf':
+        return None
+    if arr.dtype.kind != 'f' and (arr.min() < 0 or arr.max() >= COUNT_LUT_SIZE):
+        return None
+    index = arr.astype(np.uint16)
+    if arr.dtype.kind == 'f' and not np.array_equal(index, arr):
+        return None
+    return index
+
+
+def _get_count_lut(calibrate, key):
+    """Get the lookup table of *calibrate* for *key* from the cache."""
+    try:
+        lut = _COUNT_LUTS.pop(key)
+    except KeyError:
+        from satpy.dataset import Dataset
+        counts = Dataset(np.arange(COUNT_LUT_SIZE, dtype=np.float32),
+                         mask=np.zeros(COUNT_LUT_SIZE, dtype=bool))
+        with np.errstate(all='ignore'):
+            calibrate(counts)
+        mask = np.ma.getmaskarray(counts)
+        lut = (counts.data, mask if mask.any() else None, counts.info)
+        if len(_COUNT_LUTS) >= COUNT_LUTS_SIZE:
+            _COUNT_LUTS.popitem(last=False)
+    _COUNT_LUTS[key] = lut
+    return lut
+
+
+def calibrate_counts(data, calibrate, key, counts=None):
+    """Calibrate the counts of *data* in place through a lookup table.
+
+    *calibrate* is the per-pixel calibration of the reader, working in place
+    on a float32 `Dataset`. It is run once on all the 16 bits counts to build
+    a lookup table, cached under *key* which must identify the calibration
+    coefficients, and the table is applied to *data* as a single gather. If
+    *data* doesn't hold integer counts, *calibrate* is applied to *data*
+    directly.
+
+    The unsigned integer *counts* of *data* can be given when the reader has
+    them at hand, the values of *data* are then not read.
+    """
+    if counts is not None and counts.dtype.kind == 'u' and \
+            counts.dtype.itemsize <= 2:
+        index = counts
+    else:
+        index = _count_index(data)
+    if index is None:
+        LOGGER.debug("Data are not plain counts, calibrating pixelwise")
+        calibrate(data)
+        return
+
+    values, mask, info = _get_count_lut(calibrate, key)
+    data.data[:] = values.take(index, mode='clip')
+    if mask is not None:
+        mask = mask.take(index, mode='clip')
+        if isinstance(data, np.ma.MaskedArray):
+            data.mask |= mask
+        else:
+            # in-place loading shuttle
+            data.mask[:] |= mask
+    if info:
+        data.info.update(info)
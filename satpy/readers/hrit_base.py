@@ -286,17 +286,17 @@ class HRITFileHandler(BaseFileHandler):
                 data = np.fromfile(fp_, dtype=np.uint8, count=int(np.ceil(
                     self.mda['data_field_length'] / 8.)))
                 out.data[:] = dec10216(data).reshape((self.mda['number_of_lines'],
-                                                      self.mda['number_of_columns']))[yslice, xslice] * 1.0
+                                                      self.mda['number_of_columns']))[yslice, xslice]
             elif self.mda['number_of_bits_per_pixel'] == 16:
                 data = np.fromfile(fp_, dtype='>u2', count=int(np.ceil(
                     self.mda['data_field_length'] / 8.)))
                 out.data[:] = data.reshape((self.mda['number_of_lines'],
-                                            self.mda['number_of_columns']))[yslice, xslice] * 1.0
+                                            self.mda['number_of_columns']))[yslice, xslice]
             elif self.mda['number_of_bits_per_pixel'] == 8:
                 data = np.fromfile(fp_, dtype='>u1', count=int(np.ceil(
                     self.mda['data_field_length'] / 8.)))
                 out.data[:] = data.reshape((self.mda['number_of_lines'],
-                                            self.mda['number_of_columns']))[yslice, xslice] * 1.0
+                                            self.mda['number_of_columns']))[yslice, xslice]
             out.mask[:] = out.data == 0
         logger.debug("Reading time " + str(datetime.now() - tic))
 
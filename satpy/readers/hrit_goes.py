@@ -36,6 +36,7 @@ from datetime import datetime, timedelta
 import numpy as np
 
 from pyresample import geometry
+from satpy.readers.helper_functions import calibrate_counts
 from satpy.readers.hrit_base import (HRITFileHandler, ancillary_text,
                                      annotation_header, base_hdr_map,
                                      image_data_function, make_time_cds_short,
@@ -456,10 +457,11 @@ class HRITGOESFileHandler(HRITFileHandler):
         if calibration == 'counts':
             return
 
-        if calibration == 'reflectance':
-            self._calibrate(data)
-        elif calibration == 'brightness_temperature':
-            self._calibrate(data)
+        if calibration in ['reflectance', 'brightness_temperature']:
+            params = self.mda['calibration_parameters']
+            key = ('hrit_goes', calibration, params['indices'].tobytes(),
+                   params['values'].tobytes(), params['_UNIT'])
+            calibrate_counts(data, self._calibrate, key)
         else:
             raise NotImplementedError("Don't know how to calibrate to " +
                                       str(calibration))
@@ -470,7 +472,12 @@ class HRITGOESFileHandler(HRITFileHandler):
         """Calibrate *data*."""
         idx = self.mda['calibration_parameters']['indices']
         val = self.mda['calibration_parameters']['values']
-        data.mask[:] = data.data == 0
+        # zero counts are masked on top of the mask of the data, as with the
+        # lookup tables of calibrate_counts
+        if isinstance(data, np.ma.MaskedArray):
+            data.mask |= data.data == 0
+        else:
+            data.mask[:] |= data.data == 0
         data.data[:] = np.interp(data.data, idx, val)
         data.info['units'] = self.mda['calibration_parameters']['_UNIT']
 
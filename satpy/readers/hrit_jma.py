@@ -34,6 +34,7 @@ from datetime import datetime, timedelta
 import numpy as np
 
 from pyresample import geometry
+from satpy.readers.helper_functions import calibrate_counts
 from satpy.readers.hrit_base import (HRITFileHandler, ancillary_text,
                                      annotation_header, base_hdr_map,
                                      image_data_function, make_time_cds_short,
@@ -214,12 +215,17 @@ class HRITJMAFileHandler(HRITFileHandler):
         elif calibration == 'radiance':
             raise NotImplementedError("Can't calibrate to radiance.")
         else:
-            cal = self.calibration_table
-
-            data.data[:] = np.interp(data.data.ravel(),
-                                     cal[:, 0], cal[:, 1]).reshape(data.data.shape)
+            key = ('hrit_jma', calibration, self.calibration_table.tobytes())
+            calibrate_counts(data, self._calibrate, key)
         logger.debug("Calibration time " + str(datetime.now() - tic))
 
+    def _calibrate(self, data):
+        """Calibrate the data pixel by pixel."""
+        cal = self.calibration_table
+
+        data.data[:] = np.interp(data.data.ravel(),
+                                 cal[:, 0], cal[:, 1]).reshape(data.data.shape)
+
 
 def show(data, negate=False):
     """Show the stretched data.
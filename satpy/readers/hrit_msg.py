@@ -36,6 +36,7 @@ from datetime import datetime, timedelta
 import numpy as np
 
 from pyresample import geometry
+from satpy.readers.helper_functions import calibrate_counts
 from satpy.readers.hrit_base import (HRITFileHandler, ancillary_text,
                                      annotation_header, base_hdr_map,
                                      image_data_function, make_time_cds_short,
@@ -970,20 +971,40 @@ class HRITMSGFileHandler(HRITFileHandler):
             return
 
         if calibration in ['radiance', 'reflectance', 'brightness_temperature']:
-            self.convert_to_radiance(data)
+            gain, offset = self._get_gain_offset()
+            key = ('hrit_msg', self.platform_id, self.channel_name,
+                   calibration, float(gain), float(offset),
+                   int(self._get_cal_type()))
+            calibrate_counts(data,
+                             lambda counts: self._calibrate(counts, calibration),
+                             key)
+
+        logger.debug("Calibration time " + str(datetime.now() - tic))
+
+    def _calibrate(self, data, calibration):
+        """Calibrate the data pixel by pixel."""
+        self.convert_to_radiance(data)
         if calibration == 'reflectance':
             self._vis_calibrate(data)
         elif calibration == 'brightness_temperature':
             self._ir_calibrate(data)
 
-        logger.debug("Calibration time " + str(datetime.now() - tic))
-
-    def convert_to_radiance(self, data):
-        """Calibrate to radiance."""
+    def _get_gain_offset(self):
+        """Get the counts to radiance coefficients."""
         coeffs = self.prologue["RadiometricProcessing"]
         coeffs = coeffs["Level1_5ImageCalibration"]
         gain = coeffs['Cal_Slope'][self.mda['spectral_channel_id'] - 1]
         offset = coeffs['Cal_Offset'][self.mda['spectral_channel_id'] - 1]
+        return gain, offset
+
+    def _get_cal_type(self):
+        """Get the type of radiances (1 spectral, 2 effective)."""
+        return self.prologue['ImageDescription'][
+            'Level1_5ImageProduction']['PlannedChanProcessing'][self.mda['spectral_channel_id']]
+
+    def convert_to_radiance(self, data):
+        """Calibrate to radiance."""
+        gain, offset = self._get_gain_offset()
 
         data.data[:] *= gain
         data.data[:] += offset
@@ -1027,8 +1048,7 @@ class HRITMSGFileHandler(HRITFileHandler):
 
     def _ir_calibrate(self, data):
         """IR calibration."""
-        cal_type = self.prologue['ImageDescription'][
-            'Level1_5ImageProduction']['PlannedChanProcessing'][self.mda['spectral_channel_id']]
+        cal_type = self._get_cal_type()
 
         if cal_type == 1:
             # spectral radiances
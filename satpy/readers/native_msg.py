@@ -32,8 +32,10 @@ import logging
 from datetime import datetime
 import numpy as np
 
+from satpy.config import get_float_dtype
 from satpy.dataset import Dataset, DatasetID
 from satpy.readers.file_handlers import BaseFileHandler
+from satpy.readers.helper_functions import calibrate_counts
 from satpy.readers.hrit_msg import (CALIB, SATNUM, C1, C2, BTFIT)
 
 from pyresample import geometry
@@ -58,6 +60,30 @@ class CalibrationError(Exception):
 logger = logging.getLogger('native_msg')
 
 
+def read_lines(line_data, yslice=slice(None), xslice=slice(None)):
+    """Decode the *yslice*, *xslice* part of a channel from its 10 bits lines.
+
+    Lines and columns are stored in reverse order in the file, so the slices
+    are mapped back to the file lines and to the groups of 5 bytes (4 pixels)
+    containing the columns, and only those are decoded.
+    """
+    nlines = line_data.shape[0]
+    ncols = line_data.shape[1] * 8 // 10
+    ystart, ystop, ystep = yslice.indices(nlines)
+    xstart, xstop, xstep = xslice.indices(ncols)
+    if ystep < 0 or xstep < 0:
+        return dec10216(line_data[:, :ncols * 10 // 8])[::-1, ::-1][yslice, xslice]
+    ystop = max(ystart, ystop)
+    xstop = max(xstart, xstop)
+
+    first_group = (ncols - xstop) // 4
+    last_group = -(-(ncols - xstart) // 4)
+    data = dec10216(line_data[nlines - ystop:nlines - ystart,
+                              first_group * 5:last_group * 5])[::-1, ::-1]
+    shift = last_group * 4 - ncols
+    return data[::ystep, xstart + shift:xstop + shift:xstep]
+
+
 class NativeMSGFileHandler(BaseFileHandler):
 
     """Native MSG format reader
@@ -254,6 +280,13 @@ class NativeMSGFileHandler(BaseFileHandler):
         self.area = area
         return area
 
+    def get_shape(self, dsid, ds_info):
+        """Get the shape of the *dsid* image."""
+        if dsid.name == 'HRV':
+            # three lines per VIS/IR line
+            return 3 * self.data_len, self._cols_hrv * 8 // 10
+        return self.data_len, self._cols_visir * 8 // 10
+
     def get_dataset(self, key, info, out=None,
                     xslice=slice(None), yslice=slice(None)):
 
@@ -261,35 +294,16 @@ class NativeMSGFileHandler(BaseFileHandler):
             raise KeyError('Channel % s not available in the file' % key.name)
         elif key.name not in ['HRV']:
             ch_idn = self.channel_order_list.index(key.name)
-            data = dec10216(
-                self.memmap['visir']['line_data'][:, ch_idn, :])[::-1, ::-1]
-
-            data = np.ma.masked_array(data, mask=(data == 0))
-            res = Dataset(data, dtype=np.float32)
+            data = read_lines(self.memmap['visir']['line_data'][:, ch_idn],
+                              yslice, xslice)
         else:
-            data2 = dec10216(
-                self.memmap["hrv"]["line_data"][:, 2, :])[::-1, ::-1]
-            data1 = dec10216(
-                self.memmap["hrv"]["line_data"][:, 1, :])[::-1, ::-1]
-            data0 = dec10216(
-                self.memmap["hrv"]["line_data"][:, 0, :])[::-1, ::-1]
-            # Make empty array:
-            shape = data0.shape[0] * 3, data0.shape[1]
-            data = np.zeros(shape)
-            idx = range(0, shape[0], 3)
-            data[idx, :] = data2
-            idx = range(1, shape[0], 3)
-            data[idx, :] = data1
-            idx = range(2, shape[0], 3)
-            data[idx, :] = data0
-
-            data = np.ma.masked_array(data, mask=(data == 0))
-            res = Dataset(data, dtype=np.float32)
-
-        if res is not None:
-            out = res
+            data = self._read_hrv(yslice, xslice)
+
+        if out is None:
+            out = Dataset(data, mask=(data == 0), dtype=get_float_dtype())
         else:
-            return None
+            out.data[:] = data
+            out.mask[:] = data == 0
 
         self.calibrate(out, key)
         out.info['units'] = info['units']
@@ -300,6 +314,29 @@ class NativeMSGFileHandler(BaseFileHandler):
 
         return out
 
+    def _read_hrv(self, yslice, xslice):
+        """Read the HRV channel.
+
+        Each line record of the file holds three HRV lines, stored in
+        reverse order like the lines themselves.
+        """
+        line_data = self.memmap["hrv"]["line_data"]
+        ystart, ystop, ystep = yslice.indices(3 * line_data.shape[0])
+        if ystep < 0:
+            return self._read_hrv(slice(None), xslice)[yslice]
+        ystop = max(ystart, ystop)
+        records = slice(ystart // 3, -(-ystop // 3))
+
+        lines = [read_lines(line_data[:, idx], records, xslice)
+                 for idx in (2, 1, 0)]
+        data = np.empty((lines[0].shape[0] * 3, lines[0].shape[1]),
+                        dtype=get_float_dtype())
+        for idx, sub_lines in enumerate(lines):
+            data[idx::3] = sub_lines
+
+        offset = 3 * records.start
+        return data[ystart - offset:ystop - offset:ystep]
+
     def calibrate(self, data, key):
         """Calibrate the data."""
         tic = datetime.now()
@@ -309,17 +346,27 @@ class NativeMSGFileHandler(BaseFileHandler):
             return
 
         if calibration in ['radiance', 'reflectance', 'brightness_temperature']:
-            self.convert_to_radiance(data, key.name)
-        if calibration == 'reflectance':
-            self._vis_calibrate(data, key.name)
-        elif calibration == 'brightness_temperature':
-            self._ir_calibrate(data, key.name)
+            gain, offset = self._get_gain_offset(key.name)
+            cal_key = ('native_msg', self.platform_id, key.name, calibration,
+                       float(gain), float(offset),
+                       int(self._get_cal_type(key.name)))
+            calibrate_counts(data,
+                             lambda counts: self._calibrate(counts, key.name,
+                                                            calibration),
+                             cal_key)
 
         logger.debug("Calibration time " + str(datetime.now() - tic))
 
-    def convert_to_radiance(self, data, key_name):
-        """Calibrate to radiance."""
+    def _calibrate(self, data, key_name, calibration):
+        """Calibrate the data pixel by pixel."""
+        self.convert_to_radiance(data, key_name)
+        if calibration == 'reflectance':
+            self._vis_calibrate(data, key_name)
+        elif calibration == 'brightness_temperature':
+            self._ir_calibrate(data, key_name)
 
+    def _get_gain_offset(self, key_name):
+        """Get the counts to radiance coefficients."""
         coeffs = self.header['15_DATA_HEADER'][
             'RadiometricProcessing']['Level15ImageCalibration']
 
@@ -327,6 +374,18 @@ class NativeMSGFileHandler(BaseFileHandler):
 
         gain = coeffs['CalSlope'][0][channel_index]
         offset = coeffs['CalOffset'][0][channel_index]
+        return gain, offset
+
+    def _get_cal_type(self, key_name):
+        """Get the type of radiances (1 spectral, 2 effective)."""
+        channel_index = self.channel_order_list.index(key_name)
+
+        return self.header['15_DATA_HEADER']['ImageDescription'][
+            'Level15ImageProduction']['PlannedChanProcessing'][0][channel_index]
+
+    def convert_to_radiance(self, data, key_name):
+        """Calibrate to radiance."""
+        gain, offset = self._get_gain_offset(key_name)
 
         data.data[:] *= gain
         data.data[:] += offset
@@ -371,10 +430,7 @@ class NativeMSGFileHandler(BaseFileHandler):
     def _ir_calibrate(self, data, key_name):
         """IR calibration."""
 
-        channel_index = self.channel_order_list.index(key_name)
-
-        cal_type = self.header['15_DATA_HEADER']['ImageDescription'][
-            'Level15ImageProduction']['PlannedChanProcessing'][0][channel_index]
+        cal_type = self._get_cal_type(key_name)
 
         if cal_type == 1:
             # spectral radiances
@@ -29,12 +29,14 @@ import xml.etree.ElementTree as ET
 import numpy as np
 from osgeo import gdal
 
-from geotiepoints.geointerpolator import GeoInterpolator
 from satpy.dataset import Dataset
 from satpy.readers.file_handlers import BaseFileHandler
 
 logger = logging.getLogger(__name__)
 
+# number of rows calibrated or navigated at once
+WINDOW_ROWS = 512
+
 
 def dictify(r, root=True):
     """Convert an ElementTree into a dict."""
@@ -58,6 +60,61 @@ def dictify(r, root=True):
     return d
 
 
+class LineInterpolator(object):
+
+    """Interpolate values given on some lines of an image to the full image.
+
+    The calibration and noise vectors of the SAFE annotations lie on a
+    line/pixel lattice: each vector gives values at some pixels of one
+    line. The values are interpolated linearly along each vector line
+    first, then between the vector lines, block of rows by block of rows.
+    Values are extrapolated with the nearest vector, like the outermost
+    pixels.
+    """
+
+    def __init__(self, data, low_res_coords, full_res_size, blocksize=1024):
+        x, y = (np.asarray(coords) for coords in low_res_coords)
+        data = np.asarray(data)
+        self.shape = tuple(full_res_size)
+        self.blocksize = blocksize
+
+        order = np.lexsort((x, y))
+        x, y, data = x[order], y[order], data[order]
+        self.lines, starts = np.unique(y, return_index=True)
+        stops = np.append(starts[1:], y.size)
+        columns = np.arange(self.shape[1])
+        self.line_values = np.empty((self.lines.size, self.shape[1]),
+                                    dtype=np.float32)
+        for idx, (start, stop) in enumerate(zip(starts, stops)):
+            self.line_values[idx] = np.interp(columns, x[start:stop],
+                                              data[start:stop])
+
+    def __call__(self, yslice=slice(None), out=None):
+        """Interpolate the *yslice* rows of the image, into *out* if given."""
+        rows = np.arange(*yslice.indices(self.shape[0]))
+        if out is None:
+            out = np.empty((rows.size, self.shape[1]), dtype=np.float32)
+        if self.lines.size == 1:
+            out[:] = self.line_values[0]
+            return out
+
+        last = self.lines.size - 2
+        for start in range(0, rows.size, self.blocksize):
+            block = rows[start:start + self.blocksize]
+            idx = np.clip(np.searchsorted(self.lines, block, side='right') - 1,
+                          0, last)
+            below = self.lines[idx]
+            weight = ((block - below) /
+                      (self.lines[idx + 1] - below).astype(np.float64))
+            weight = np.clip(weight, 0, 1).astype(np.float32)[:, np.newaxis]
+            res = out[start:start + block.size]
+            np.subtract(self.line_values[idx + 1], self.line_values[idx],
+                        out=res)
+            res *= weight
+            res += self.line_values[idx]
+        return out
+
+
 class SAFEXML(BaseFileHandler):
 
     def __init__(self, filename, filename_info, filetype_info, header_file=None):
@@ -71,6 +128,7 @@ class SAFEXML(BaseFileHandler):
         self.hdr = {}
         if header_file is not None:
             self.hdr = header_file.get_metadata()
+        self._interpolators = {}
 
     def get_metadata(self):
         """Convert the xml metadata to dict."""
@@ -93,38 +151,47 @@ class SAFEXML(BaseFileHandler):
 
     @staticmethod
     def interpolate_xml_array(data, low_res_coords, full_res_size):
-        """Interpolate arbitrary size dataset to a full sized grid."""
-        from scipy.interpolate import griddata
-        grid_x, grid_y = np.mgrid[0:full_res_size[0], 0:full_res_size[1]]
-        x, y = low_res_coords
+        """Interpolate the vectors of *data* to a full sized grid."""
+        return LineInterpolator(data, low_res_coords, full_res_size)()
 
-        return griddata(np.vstack((np.asarray(y), np.asarray(x))).T,
-                        data,
-                        (grid_x, grid_y),
-                        method='linear')
+    def get_interpolator(self, xml_item, xml_tag, shape, squared=False):
+        """Get the `LineInterpolator` of the *xml_tag* vectors.
+
+        The interpolators are kept, so the annotations are only parsed once
+        per file.
+        """
+        key = (xml_item, xml_tag, tuple(shape), squared)
+        if key not in self._interpolators:
+            data_items = self.root.findall(".//" + xml_item)
+            data, low_res_coords = self.read_xml_array(data_items, xml_tag)
+            if squared:
+                data **= 2
+            self._interpolators[key] = LineInterpolator(data, low_res_coords,
+                                                        shape)
+        return self._interpolators[key]
+
+    def get_image_shape(self):
+        """Get the shape of the image from the product annotation."""
+        info = self.hdr['product']['imageAnnotation']['imageInformation']
+        return info['numberOfLines'], info['numberOfSamples']
 
     def get_dataset(self, key, info):
         """Load a dataset."""
         if self._polarization != key.polarization:
             return
 
-        data_items = self.root.findall(".//" + info['xml_item'])
-        data, low_res_coords = self.read_xml_array(data_items,
-                                                   info['xml_tag'])
-        if key.name.endswith('squared'):
-            data **= 2
-
-        data = self.interpolate_xml_array(data, low_res_coords, data.shape)
+        interpolator = self.get_interpolator(info['xml_item'],
+                                             info['xml_tag'],
+                                             self.get_image_shape(),
+                                             key.name.endswith('squared'))
+        return Dataset(interpolator(), copy=False)
 
     def get_noise_correction(self, shape):
-        data_items = self.root.findall(".//noiseVector")
-        data, low_res_coords = self.read_xml_array(data_items, 'noiseLut')
-        return self.interpolate_xml_array(data, low_res_coords, shape)
+        return self.get_interpolator('noiseVector', 'noiseLut', shape)()
 
     def get_calibration(self, name, shape):
-        data_items = self.root.findall(".//calibrationVector")
-        data, low_res_coords = self.read_xml_array(data_items, name)
-        return self.interpolate_xml_array(data ** 2, low_res_coords, shape)
+        return self.get_interpolator('calibrationVector', name, shape,
+                                     squared=True)()
 
     def get_calibration_constant(self):
         """Load the calibration constant."""
@@ -141,6 +208,14 @@ class SAFEXML(BaseFileHandler):
 
 class SAFEGRD(BaseFileHandler):
 
+    """Measurement file handler, calibrating the data window by window.
+
+    The image is read and calibrated in windows of rows aligned on the GDAL
+    blocks of the file, and the coordinates are only computed for the
+    requested rows, so that the full image is never held in memory as
+    anything but the float32 output array.
+    """
+
     def __init__(self, filename, filename_info, filetype_info, calfh, noisefh):
         super(SAFEGRD, self).__init__(filename, filename_info,
                                       filetype_info)
@@ -150,8 +225,7 @@ class SAFEGRD(BaseFileHandler):
 
         self._polarization = filename_info['polarization']
 
-        self.lats = None
-        self.lons = None
+        self._splines = None
 
         self.calibration = calfh
         self.noise = noisefh
@@ -166,83 +240,138 @@ class SAFEGRD(BaseFileHandler):
         else:
             raise IOError("Path {} does not exist.".format(self.filename))
 
-    def get_dataset(self, key, info):
-        """Load a dataset."""
+    def get_shape(self, key, info):
+        """Get the shape of the image.
+
+        Files of another polarization are given no rows, so they are skipped
+        when the datasets are loaded.
+        """
+        if self._polarization != key.polarization:
+            return 0, self.filehandle.RasterXSize
+        return self.filehandle.RasterYSize, self.filehandle.RasterXSize
+
+    def get_dataset(self, key, info, out=None, xslice=slice(None),
+                    yslice=slice(None)):
+        """Load a dataset, possibly in place in *out*."""
         if self._polarization != key.polarization:
             return
 
         logger.debug('Reading %s.', key.name)
 
-        band = self.filehandle
+        if out is None:
+            shape = self.get_shape(key, info)
+            ysize = len(range(*yslice.indices(shape[0])))
+            xsize = len(range(*xslice.indices(shape[1])))
+            if key.name in ['longitude', 'latitude']:
+                dtype = np.float64
+            else:
+                dtype = np.float32
+            out = Dataset(np.empty((ysize, xsize), dtype=dtype),
+                          mask=np.zeros((ysize, xsize), dtype=bool),
+                          copy=False)
 
+        out.info.update(info)
         if key.name in ['longitude', 'latitude']:
             logger.debug('Constructing coordinate arrays.')
-
-            if self.lons is None or self.lats is None:
-                self.lons, self.lats = self.get_lonlats()
-
-            if key.name == 'latitude':
-                proj = Dataset(self.lats, id=key, **info)
-            else:
-                proj = Dataset(self.lons, id=key, **info)
-
+            self.read_lonlats(key.name, out.data, xslice, yslice)
         else:
-            data = band.GetRasterBand(1).ReadAsArray().astype(np.float)
-            logger.debug('Reading noise data.')
-
-            noise = self.noise.get_noise_correction(data.shape)
-
-            logger.debug('Reading calibration data.')
-
-            cal = self.calibration.get_calibration('gamma', data.shape)
-            cal_constant = self.calibration.get_calibration_constant()
-
             logger.debug('Calibrating.')
-
-            data **= 2
-            data += cal_constant - noise
-            data /= cal
-            data[data < 0] = 0
-            del noise, cal
-
-            proj = Dataset(np.sqrt(data),
-                           copy=False,
-                           units='sigma')
-        del band
-        return proj
+            self.read_calibrated(out.data, xslice, yslice)
+            out.info['units'] = 'sigma'
+        return out
+
+    def _windows(self, start, stop, size):
+        """Split the *start*:*stop* rows in windows aligned on the blocks."""
+        block_rows = self.filehandle.GetRasterBand(1).GetBlockSize()[1]
+        size = max(block_rows, size // block_rows * block_rows)
+        edge = (start // size + 1) * size
+        while start < stop:
+            yield start, min(edge, stop)
+            start, edge = edge, edge + size
+
+    def read_calibrated(self, out, xslice=slice(None), yslice=slice(None)):
+        """Read and calibrate the *yslice*, *xslice* part of the image.
+
+        For each window, the digital numbers are squared, corrected for the
+        noise and divided by the gamma calibration in float32 in *out*.
+        """
+        ysize = self.filehandle.RasterYSize
+        xsize = self.filehandle.RasterXSize
+        ystart, ystop, ystep = yslice.indices(ysize)
+        if ystep != 1:
+            raise NotImplementedError("Row steps are not supported.")
+        xstart, xstop, xstep = xslice.indices(xsize)
+        width = xstop - xstart
+        xslice = slice(xstart, xstop, xstep)
+
+        band = self.filehandle.GetRasterBand(1)
+        noise = self.noise.get_interpolator('noiseVector', 'noiseLut',
+                                            (ysize, xsize))
+        cal = self.calibration.get_interpolator('calibrationVector', 'gamma',
+                                                (ysize, xsize), squared=True)
+        cal_constant = self.calibration.get_calibration_constant()
+
+        buf = np.empty((WINDOW_ROWS, xsize), dtype=np.float32)
+        for start, stop in self._windows(ystart, ystop, WINDOW_ROWS):
+            rows = stop - start
+            if buf.shape[0] < rows:
+                buf = np.empty((rows, xsize), dtype=np.float32)
+            res = out[start - ystart:stop - ystart]
+            dn = band.ReadAsArray(xstart, start, width, rows)[:, ::xstep]
+            np.multiply(dn, dn, out=res, dtype=np.float32)
+            del dn
+            res += cal_constant
+            res -= noise(slice(start, stop), buf[:rows])[:, xslice]
+            res /= cal(slice(start, stop), buf[:rows])[:, xslice]
+            np.maximum(res, 0, out=res)
+            np.sqrt(res, out=res)
+        return out
+
+    def _get_splines(self):
+        """Get the splines of the GCPs, as cartesian coordinates."""
+        if self._splines is None:
+            from scipy.interpolate import RectBivariateSpline
+            (xpoints, ypoints), (gcp_lons, gcp_lats) = self.get_gcps()
+            lons, lats = np.deg2rad(gcp_lons), np.deg2rad(gcp_lats)
+            bbox = [min(ypoints[0], 0),
+                    max(ypoints[-1], self.filehandle.RasterYSize - 1),
+                    min(xpoints[0], 0),
+                    max(xpoints[-1], self.filehandle.RasterXSize - 1)]
+            self._splines = [RectBivariateSpline(ypoints, xpoints, coord,
+                                                 bbox=bbox, kx=2, ky=2)
+                             for coord in (np.cos(lats) * np.cos(lons),
+                                           np.cos(lats) * np.sin(lons),
+                                           np.sin(lats))]
+        return self._splines
+
+    def read_lonlats(self, name, out, xslice=slice(None), yslice=slice(None)):
+        """Compute the *name* coordinate of the *yslice*, *xslice* pixels.
+
+        The GCPs are interpolated with splines on the unit sphere, evaluated
+        only for the requested rows, a window at a time.
+        """
+        rows = np.arange(*yslice.indices(self.filehandle.RasterYSize))
+        cols = np.arange(*xslice.indices(self.filehandle.RasterXSize))
+        splines = self._get_splines()
+        for start in range(0, rows.size, WINDOW_ROWS):
+            window = rows[start:start + WINDOW_ROWS]
+            x, y, z = (spline(window, cols) for spline in splines)
+            if name == 'longitude':
+                coord = np.arctan2(y, x)
+            else:
+                coord = np.arctan2(z, np.hypot(x, y))
+            out[start:start + window.size] = np.rad2deg(coord)
+        return out
 
     def get_lonlats(self):
-        """Obtain GCPs and construct latitude and longitude arrays.
+        """Construct the full resolution longitude and latitude arrays.
 
-        Args:
-           band (gdal band): Measurement band which comes with GCP's
-           array_shape (tuple) : The size of the data array
         Returns:
            coordinates (tuple): A tuple with longitude and latitude arrays
         """
-        band = self.filehandle
-
-        band_x_size = band.RasterXSize
-        band_y_size = band.RasterYSize
-
-        (xpoints, ypoints), (gcp_lons, gcp_lats) = self.get_gcps()
-        fine_cols = np.arange(band_x_size)
-        fine_rows = np.arange(band_y_size)
-
-        satint = GeoInterpolator((gcp_lons, gcp_lats),
-                                 (ypoints, xpoints),
-                                 (fine_rows, fine_cols), 2, 2)
-
-        longitudes, latitudes = satint.interpolate()
-
-        # FIXME: check if the array is C-contigious, and make it such if it
-        # isn't
-        if longitudes.flags['CONTIGUOUS'] is False:
-            longitudes = np.ascontiguousarray(longitudes)
-        if latitudes.flags['CONTIGUOUS'] is False:
-            latitudes = np.ascontiguousarray(latitudes)
-
-        return longitudes, latitudes
+        shape = (self.filehandle.RasterYSize, self.filehandle.RasterXSize)
+        return tuple(self.read_lonlats(name, np.empty(shape))
+                     for name in ('longitude', 'latitude'))
 
     def get_gcps(self):
         """Read GCP from the GDAL band.
@@ -169,6 +169,20 @@ class VIIRSSDRFileHandler(HDF5FileHandler):
             'sensor_name', default).format(**self.filetype_info)
         return self[sensor_path].lower()
 
+    def get_bounding_box(self):
+        """Get the G-Ring of the granule as (lons, lats).
+
+        The G-Rings of aggregated granules don't make up a single polygon,
+        so the bounding box is only available for single granule files.
+        """
+        default = 'Data_Products/{file_group}/{file_group}_Gran_*/attr/G-Ring_{coord}'
+        gring_path = self.filetype_info.get('gring', default)
+        lons = self[gring_path.format(coord='Longitude', **self.filetype_info)]
+        lats = self[gring_path.format(coord='Latitude', **self.filetype_info)]
+        if len(lons) != 1 or len(lats) != 1:
+            raise NotImplementedError("No bounding box for {} granules".format(len(lons)))
+        return np.ravel(lons[0]), np.ravel(lats[0])
+
     def get_file_units(self, dataset_id, ds_info):
         file_units = ds_info.get("file_units")
 
@@ -190,16 +204,24 @@ class VIIRSSDRFileHandler(HDF5FileHandler):
 
         return file_units
 
-    def scale_swath_data(self, data, mask, scaling_factors):
+    def scale_swath_data(self, data, mask, scaling_factors, row_offset=0,
+                         total_rows=None):
         """Scale swath data using scaling factors and offsets.
 
         Multi-granule (a.k.a. aggregated) files will have more than the usual two values.
+        If *data* are only some rows of the file, *row_offset* is the row of the
+        file they start at and *total_rows* the number of rows of the file, so
+        that each row gets the factors of its granule.
         """
         num_grans = len(scaling_factors) // 2
-        gran_size = data.shape[0] // num_grans
+        if total_rows is None:
+            total_rows = data.shape[0]
+        gran_size = total_rows // num_grans
         for i in range(num_grans):
-            start_idx = i * gran_size
-            end_idx = start_idx + gran_size
+            start_idx = max(i * gran_size - row_offset, 0)
+            end_idx = min((i + 1) * gran_size - row_offset, data.shape[0])
+            if end_idx <= start_idx:
+                continue
             m = scaling_factors[i * 2]
             b = scaling_factors[i * 2 + 1]
             # in rare cases the scaling factors are actually fill values
@@ -244,10 +266,15 @@ class VIIRSSDRFileHandler(HDF5FileHandler):
         var_path = self._generate_file_key(ds_id, ds_info)
         return self[var_path + "/shape"]
 
-    def get_dataset(self, dataset_id, ds_info, out=None):
+    def get_dataset(self, dataset_id, ds_info, out=None,
+                    xslice=slice(None), yslice=slice(None)):
         var_path = self._generate_file_key(dataset_id, ds_info)
         factor_var_path = ds_info.get("factors_key", var_path + "Factors")
         data = self[var_path]
+        if data.ndim == 2:
+            data = data[yslice, xslice]
+        elif data.ndim == 1:
+            data = data[yslice]
         dtype = ds_info.get("dtype", np.float32)
         is_floating = np.issubdtype(data.dtype, np.floating)
         if out is not None:
@@ -256,9 +283,9 @@ class VIIRSSDRFileHandler(HDF5FileHandler):
             # out array
             out.data[:] = data
         else:
-            shape = self.get_shape(dataset_id, ds_info)
-            out = np.ma.empty(shape, dtype=dtype)
-            out.mask = np.zeros(shape, dtype=np.bool)
+            out = np.ma.empty(data.shape, dtype=dtype)
+            out.mask = np.zeros(data.shape, dtype=np.bool)
+            out.data[:] = data
 
         if is_floating:
             # If the data is a float then we mask everything <= -999.0
@@ -278,7 +305,10 @@ class VIIRSSDRFileHandler(HDF5FileHandler):
         factors = self.adjust_scaling_factors(factors, file_units, output_units)
 
         if factors is not None:
-            self.scale_swath_data(out.data, out.mask, factors)
+            total_rows = self.get_shape(dataset_id, ds_info)[0]
+            self.scale_swath_data(out.data, out.mask, factors,
+                                  row_offset=yslice.start or 0,
+                                  total_rows=total_rows)
 
         i = getattr(out, 'info', {})
         i.update(ds_info)
@@ -36,10 +36,13 @@ import six
 import yaml
 
 from pyresample.geometry import StackedAreaDefinition, SwathDefinition
-from satpy.config import recursive_dict_update
+from satpy.config import (apply_precision, get_float_dtype,
+                          recursive_dict_update)
 from satpy.dataset import DATASET_KEYS, Dataset, DatasetID
 from satpy.readers import DatasetDict
-from satpy.readers.helper_functions import get_area_slices, get_sub_area
+from satpy.readers.footprints import get_footprint_index
+from satpy.readers.helper_functions import (get_area_slices, get_sub_area,
+                                            get_sub_swath, get_swath_slices)
 from trollsift.parser import globify, parse
 
 logger = logging.getLogger(__name__)
@@ -388,6 +391,10 @@ class FileYAMLReader(AbstractYAMLReader):
         self.file_handlers = {}
         self.filter_filenames = self.info.get('filter_filenames', filter_filenames)
         self.filter_parameters = filter_parameters or {}
+        self.footprint_index = None
+        if self.filter_parameters.get('footprint_index') is not None:
+            self.footprint_index = get_footprint_index(
+                self.filter_parameters['footprint_index'])
         if kwargs:
             logger.warning("Unrecognized/unused reader keyword argument(s) '{}'".format(kwargs))
 
@@ -419,19 +426,52 @@ class FileYAMLReader(AbstractYAMLReader):
         If the file doesn't provide any bounding box information or 'area'
         was not provided in `filter_parameters`, the check returns True.
         """
-        from trollsched.boundary import AreaDefBoundary, Boundary
-        from satpy.resample import get_area_def
         try:
-            gbb = Boundary(*file_handler.get_bounding_box())
+            footprint = file_handler.get_bounding_box()
         except NotImplementedError:
-            pass
-        else:
-            abb = AreaDefBoundary(get_area_def(check_area), frequency=1000)
+            return True
+        return FileYAMLReader.footprint_covers_area(footprint, check_area)
 
-            intersection = gbb.contour_poly.intersection(abb.contour_poly)
-            if not intersection:
-                return False
-        return True
+    @staticmethod
+    def footprint_covers_area(footprint, check_area):
+        """Checks if the bounding box *footprint* intersects *check_area*."""
+        from trollsched.boundary import AreaDefBoundary, Boundary
+        from satpy.resample import get_area_def
+        gbb = Boundary(*footprint)
+        abb = AreaDefBoundary(get_area_def(check_area), frequency=1000)
+
+        intersection = gbb.contour_poly.intersection(abb.contour_poly)
+        return bool(intersection)
+
+    def footprint_matches(self, filename):
+        """Check the indexed footprint of *filename* against the area filter.
+
+        Files without a known footprint match.
+        """
+        check_area = self.filter_parameters.get('area')
+        if check_area is None or self.footprint_index is None:
+            return True
+        footprint = self.footprint_index.get(filename)
+        if footprint is None:
+            return True
+        return self.footprint_covers_area(footprint, check_area)
+
+    def index_file_covers_area(self, file_handler):
+        """Record the footprint of *file_handler* and check the area filter.
+
+        Only used with a footprint index, so that the footprints of the
+        opened files are known to the next runs.
+        """
+        check_area = self.filter_parameters.get('area')
+        if check_area is None or self.footprint_index is None:
+            return True
+        if self.footprint_index.get(file_handler.filename) is None:
+            try:
+                footprint = file_handler.get_bounding_box()
+            except NotImplementedError:
+                return True
+            self.footprint_index.add(file_handler.filename, *footprint)
+        return self.footprint_matches(file_handler.filename)
 
     def find_required_filehandlers(self, requirements, filename_info):
         """Find the necessary fhs for the current filehandler.
@@ -553,15 +593,20 @@ class FileYAMLReader(AbstractYAMLReader):
                                     month=fstart.month,
                                     day=fstart.day)
                 filename_info['end_time'] = fend
-            if self.metadata_matches(filename_info):
-                yield filename, filename_info
+            if not self.metadata_matches(filename_info):
+                continue
+            if not self.footprint_matches(filename):
+                logger.debug("Skipping %s, outside of the area", filename)
+                continue
+            yield filename, filename_info
 
     def filter_fh_by_metadata(self, filehandlers):
         """Filter out filehandlers using provide filter parameters."""
         for filehandler in filehandlers:
             filehandler.metadata['start_time'] = filehandler.start_time
             filehandler.metadata['end_time'] = filehandler.end_time
-            if self.metadata_matches(filehandler.metadata, filehandler):
+            if (self.metadata_matches(filehandler.metadata, filehandler) and
+                    self.index_file_covers_area(filehandler)):
                 yield filehandler
 
     def filter_selected_filenames(self, filenames):
@@ -588,22 +633,70 @@ class FileYAMLReader(AbstractYAMLReader):
         return list(filtered_iter)
 
     def create_filehandlers(self, filenames):
-        """Organize the filenames into file types and create file handlers."""
+        """Organize the filenames into file types and create file handlers.
+
+        The reader can be given more files later on, for example segments
+        of geostationary data as they arrive: the new file handlers are then
+        merged with the existing ones, and the files already known are
+        skipped. Files that didn't get a file handler, eg. because their
+        requirements weren't there yet, are tried again when given again.
+
+        Returns:
+            dict of the new file handlers by file type.
+        """
         logger.debug("Assigning to %s: %s", self.info['name'], filenames)
 
-        self.info.setdefault('filenames', []).extend(filenames)
+        known_filenames = set(fhd.filename
+                              for filehandlers in self.file_handlers.values()
+                              for fhd in filehandlers)
+        filenames = [filename for filename in filenames
+                     if filename not in known_filenames]
         filename_set = set(filenames)
 
+        new_filehandlers = {}
         for filetype, filetype_info in self.sorted_filetype_items():
             filehandlers = self.new_filehandlers_for_filetype(filetype_info,
                                                               filename_set)
 
             filename_set -= set([fhd.filename for fhd in filehandlers])
             if filehandlers:
+                new_filehandlers[filetype] = filehandlers
                 self.file_handlers[filetype] = sorted(
-                    filehandlers,
+                    self.file_handlers.get(filetype, []) + filehandlers,
                     key=lambda fhd: (fhd.start_time, fhd.filename))
 
+        self.info.setdefault('filenames', []).extend(
+            filename for filename in filenames
+            if filename not in filename_set)
+        if self.footprint_index is not None:
+            self.footprint_index.save()
+        return new_filehandlers
+
+    def get_segment_runs(self, dsid, file_handlers):
+        """Get the runs of consecutive old and new segments of *dsid*.
+
+        Args:
+            dsid: the dataset to get the segments of.
+            file_handlers: the new file handlers by file type, as returned by
+                `create_filehandlers`.
+
+        Returns:
+            list of (is_new, file handlers) tuples, in the row order of the
+            dataset, or None if *dsid* isn't provided by this reader.
+        """
+        if dsid not in self.ids:
+            return None
+        new_filehandlers = set(fhd for filehandlers in file_handlers.values()
+                               for fhd in filehandlers)
+        runs = []
+        for fhd in self._get_file_handlers(dsid) or []:
+            is_new = fhd in new_filehandlers
+            if runs and runs[-1][0] == is_new:
+                runs[-1][1].append(fhd)
+            else:
+                runs.append((is_new, [fhd]))
+        return runs
+
     @staticmethod
     def get_shape_n_slices(all_shapes, xslice=slice(None), yslice=slice(None)):
         """Get the shape and slices to use."""
@@ -650,7 +743,7 @@ class FileYAMLReader(AbstractYAMLReader):
 
         out_info = {'reader': self.name}
         data = np.empty(overall_shape,
-                        dtype=ds_info.get('dtype', np.float32))
+                        dtype=ds_info.get('dtype', get_float_dtype()))
         mask = np.ma.make_mask_none(overall_shape)
 
         offset = 0
@@ -711,9 +804,18 @@ class FileYAMLReader(AbstractYAMLReader):
             # FIXME: Is NotImplementedError included in Exception for all
             # versions of Python?
             proj = self._load_entire_dataset(dsid, ds_info, file_handlers)
+            if xslice != slice(None) or yslice != slice(None):
+                # the file handlers can't slice, do it after loading
+                if proj.ndim == 1:
+                    data = proj[yslice]
+                else:
+                    data = proj[yslice, xslice]
+                proj = proj.__class__(data, copy=False, **proj.info)
         else:
             proj = self._load_sliced_dataset(dsid, ds_info, file_handlers,
                                              xslice, yslice)
+        if ds_info.get('standard_name') not in ('longitude', 'latitude'):
+            proj = apply_precision(proj)
         # FIXME: areas could be concatenated here
         # Update the metadata
         proj.info['start_time'] = file_handlers[0].start_time
@@ -769,14 +871,20 @@ class FileYAMLReader(AbstractYAMLReader):
             coordinates.setdefault(dsid, []).extend(cids)
         return coordinates
 
-    def _get_file_handlers(self, dsid):
-        """Get the file handler to load this dataset."""
+    def _get_file_handlers(self, dsid, file_handlers=None):
+        """Get the file handler to load this dataset.
+
+        If *file_handlers* is given, only the file handlers in it are used.
+        """
         ds_info = self.ids[dsid]
 
         filetype = self._preferred_filetype(ds_info['file_type'])
         if filetype is None:
             logger.warning("Required file type '%s' not found or loaded for "
                            "'%s'", ds_info['file_type'], dsid.name)
+        elif file_handlers is not None:
+            return [fhd for fhd in self.file_handlers[filetype]
+                    if fhd in file_handlers]
         else:
             return self.file_handlers[filetype]
 
@@ -817,37 +925,61 @@ class FileYAMLReader(AbstractYAMLReader):
             return area
 
     # TODO: move this out of here.
-    def _get_slices(self, area):
+    def _get_slices(self, area, rows_per_scan=None):
         """Get the slices of raw data covering area.
 
         Args:
             area: the area to slice.
+            rows_per_scan: the number of lines per scan of swath data, that
+                the slices are aligned to. The other swath slicing options of
+                `get_swath_slices` can be given in the `swath_slicing`
+                filter parameter.
 
         Returns:
             slice_kwargs: kwargs to pass on to loading giving the span of the
-                data to load.
+                data to load, or None if the swath doesn't overlap the area,
+                so that nothing has to be loaded.
             area: the trimmed area corresponding to the slices.
         """
         slice_kwargs = {}
 
         if area is not None and self.filter_parameters.get('area') is not None:
             try:
-                slices = get_area_slices(area, self.filter_parameters['area'])
-                area = get_sub_area(area, *slices)
+                if isinstance(area, SwathDefinition):
+                    try:
+                        slices = get_swath_slices(
+                            area, self.filter_parameters['area'],
+                            rows_per_scan=rows_per_scan,
+                            **self.filter_parameters.get('swath_slicing', {}))
+                    except ValueError:
+                        return None, None
+                    area = get_sub_swath(area, *slices)
+                else:
+                    slices = get_area_slices(area,
+                                             self.filter_parameters['area'])
+                    area = get_sub_area(area, *slices)
                 slice_kwargs['xslice'], slice_kwargs['yslice'] = slices
             except (NotImplementedError, AttributeError):
                 logger.info("Cannot compute specific slice of data to load.")
 
         return slice_kwargs, area
 
-    def _load_dataset_with_area(self, dsid, coords):
+    def _load_dataset_with_area(self, dsid, coords, file_handlers=None):
         """Loads *dsid* and it's area if available."""
-        file_handlers = self._get_file_handlers(dsid)
+        file_handlers = self._get_file_handlers(dsid, file_handlers)
         if not file_handlers:
             return
 
         area = self._load_dataset_area(dsid, file_handlers, coords)
-        slice_kwargs, area = self._get_slices(area)
+        rows_per_scan = self.ids[dsid].get('rows_per_scan')
+        for coord in coords:
+            if rows_per_scan is None and coord is not None:
+                rows_per_scan = coord.info.get('rows_per_scan')
+        slice_kwargs, area = self._get_slices(area, rows_per_scan)
+        if slice_kwargs is None:
+            logger.info("Skipping %s, the data doesn't overlap the area",
+                        dsid.name)
+            return None
 
         try:
             ds = self._load_dataset_data(file_handlers, dsid, **slice_kwargs)
@@ -859,8 +991,14 @@ class FileYAMLReader(AbstractYAMLReader):
             ds.info['area'] = area
         return ds
 
-    def load(self, dataset_keys):
-        """Load *dataset_keys*."""
+    def load(self, dataset_keys, file_handlers=None):
+        """Load *dataset_keys*.
+
+        If *file_handlers* is given, only the file handlers in it are read,
+        eg. the ones of a few segments.
+        """
+        if file_handlers is not None:
+            file_handlers = set(file_handlers)
         all_datasets = DatasetDict()
         datasets = DatasetDict()
 
@@ -872,7 +1010,7 @@ class FileYAMLReader(AbstractYAMLReader):
         for dsid in all_dsids:
             coords = [all_datasets.get(cid, None)
                       for cid in coordinates.get(dsid, [])]
-            ds = self._load_dataset_with_area(dsid, coords)
+            ds = self._load_dataset_with_area(dsid, coords, file_handlers)
             if ds is not None:
                 all_datasets[dsid] = ds
                 if dsid in dsids:
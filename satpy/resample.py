@@ -30,18 +30,21 @@ except ImportError:
 import hashlib
 import json
 import os
+import shutil
+import tempfile
 from copy import deepcopy
 from logging import getLogger
 
 import numpy as np
 import six
 
-from pyresample.bilinear import get_bil_info, get_sample_from_bil_info
+from pyresample.bilinear import get_bil_info
 from pyresample.ewa import fornav, ll2cr
-from pyresample.geometry import SwathDefinition
+from pyresample.geometry import AreaDefinition, SwathDefinition
 from pyresample.kd_tree import (get_neighbour_info,
                                 get_sample_from_neighbour_info)
-from satpy.config import get_config, get_config_path
+from satpy.config import (_file_signature, apply_precision,
+                          config_search_paths, get_config, get_config_path)
 
 try:
     import configparser
@@ -51,9 +54,34 @@ except ImportError:
 LOG = getLogger(__name__)
 
 CACHE_SIZE = 10
+# extension of the cache directories of memory-mapped arrays
+CACHE_DIR_EXT = '.npyd'
+
+# memory allowed for the coordinates kept by the area registry, in bytes
+AREA_CACHE_BYTES = 256 * 1024 ** 2
+
+# number of target rows the grid resampler handles at once
+GRID_BLOCK_ROWS = 512
+
+
+# (satpy.cfg signatures, working directory) -> area file name
+_AREA_FILE_CACHE = {}
 
 
 def get_area_file():
+    """Get the name of the area file set in satpy's configuration.
+
+    The configuration is only read again when one of the satpy.cfg files
+    changes.
+    """
+    paths = config_search_paths("satpy.cfg")
+    key = (tuple((path, _file_signature(path)) for path in paths),
+           os.getcwd())
+    try:
+        return _AREA_FILE_CACHE[key]
+    except KeyError:
+        pass
+
     conf, successes = get_config("satpy.cfg")
     if conf is None or not successes:
         LOG.warning(
@@ -63,18 +91,197 @@ def get_area_file():
     try:
         fn = os.path.join(conf.get("projector", "area_directory") or "",
                           conf.get("projector", "area_file"))
-        return get_config_path(fn)
+        _AREA_FILE_CACHE[key] = get_config_path(fn)
+        return _AREA_FILE_CACHE[key]
     except configparser.NoSectionError:
         LOG.warning("Couldn't find 'projector' section of 'satpy.cfg'")
 
 
+class AreaRegistry(object):
+
+    """The area definitions of the area files, by id.
+
+    Each area file is parsed once, and again only when its modification time
+    or size changes, so the same area definition object is returned for the
+    same area. The longitudes and latitudes and the projection coordinates of
+    area definitions are kept too, the least recently used ones being
+    dropped beyond `AREA_CACHE_BYTES`. The cached arrays are read-only.
+    """
+
+    def __init__(self):
+        # filename -> ((mtime, size), {area_id: area})
+        self.files = {}
+        # (area hash, name) -> arrays
+        self.coords = OrderedDict()
+        self.coords_size = 0
+
+    def get_areas(self, filename):
+        """Get the area definitions of *filename*, by id."""
+        from pyresample.utils import parse_area_file
+        filename = os.path.abspath(filename)
+        signature = _file_signature(filename)
+        try:
+            cached_signature, areas = self.files[filename]
+        except KeyError:
+            cached_signature = None
+        if cached_signature != signature:
+            LOG.debug("Parsing area file %s", filename)
+            areas = dict((area.area_id, area)
+                         for area in parse_area_file(filename))
+            self.files[filename] = signature, areas
+        return areas
+
+    def get_area_def(self, area_name, filename=None):
+        """Get the definition of *area_name* from *filename*.
+
+        The area file set in satpy's configuration is used by default.
+        """
+        from pyresample.utils import AreaNotFound
+        if filename is None:
+            filename = get_area_file()
+        try:
+            return self.get_areas(filename)[area_name]
+        except KeyError:
+            raise AreaNotFound('Area "{}" not found in file "{}"'.format(
+                area_name, filename))
+
+    def _get_coords(self, area, name, func):
+        """Get the arrays *func* computes for *area*, from the cache if
+        possible."""
+        if not isinstance(area, AreaDefinition):
+            return func()
+        key = (BaseResampler.hash_area(area), name)
+        try:
+            arrays = self.coords.pop(key)
+        except KeyError:
+            arrays = func()
+            size = sum(arr.nbytes for arr in arrays)
+            if size > AREA_CACHE_BYTES:
+                return arrays
+            for arr in arrays:
+                arr.flags.writeable = False
+            self.coords_size += size
+            while self.coords_size > AREA_CACHE_BYTES:
+                old_arrays = self.coords.popitem(False)[1]
+                self.coords_size -= sum(arr.nbytes for arr in old_arrays)
+        self.coords[key] = arrays
+        return arrays
+
+    def get_lonlats(self, area):
+        """Get the longitudes and latitudes of *area*."""
+        return self._get_coords(area, 'lonlats', area.get_lonlats)
+
+    def get_proj_coords(self, area):
+        """Get the projection coordinates of *area*."""
+        return self._get_coords(area, 'proj_coords', area.get_proj_coords)
+
+    def clear(self):
+        """Forget all the areas and coordinates."""
+        self.files.clear()
+        self.coords.clear()
+        self.coords_size = 0
+
+
+AREA_REGISTRY = AreaRegistry()
+
+
 def get_area_def(area_name):
     """Get the definition of *area_name* from file. The file is defined to use
     is to be placed in the $PPP_CONFIG_DIR directory, and its name is defined
     in satpy's configuration file.
+
+    The area file is only parsed again when it changes, see `AreaRegistry`.
+    """
+    return AREA_REGISTRY.get_area_def(area_name)
+
+
+def get_multi_neighbour_info(source_geo_def, target_geo_defs,
+                             radius_of_influence, neighbours=1, epsilon=0,
+                             reduce_data=True, nprocs=1, segments=None):
+    """Get the neighbour info of *source_geo_def* for several targets.
+
+    This works like :func:`pyresample.kd_tree.get_neighbour_info`, but the
+    kd-tree of the source is built only once, from the source pixels close
+    to any of the targets, and then queried for each target. This uses
+    internals of pyresample: when they aren't available, the targets are
+    given to `get_neighbour_info` one by one instead.
+
+    Returns:
+        The list of (valid_input_index, valid_output_index, index_array,
+        distance_array) of each target.
+    """
+    try:
+        return _get_shared_neighbour_info(
+            source_geo_def, target_geo_defs, radius_of_influence,
+            neighbours=neighbours, epsilon=epsilon, reduce_data=reduce_data,
+            nprocs=nprocs, segments=segments)
+    except (AttributeError, TypeError) as err:
+        LOG.debug("Can't share the kd-tree between the targets: %s",
+                  str(err))
+    return [get_neighbour_info(source_geo_def, target, radius_of_influence,
+                               neighbours=neighbours, epsilon=epsilon,
+                               reduce_data=reduce_data, nprocs=nprocs,
+                               segments=segments)
+            for target in target_geo_defs]
+
+
+def _get_shared_neighbour_info(source_geo_def, target_geo_defs,
+                               radius_of_influence, neighbours=1, epsilon=0,
+                               reduce_data=True, nprocs=1, segments=None):
+    """Get the neighbour info of the targets from one kd-tree.
+
+    This relies on private functions of `pyresample.kd_tree` and
+    `pyresample.geometry`, as found in pyresample 1.7.
     """
-    from pyresample.utils import parse_area_file
-    return parse_area_file(get_area_file(), area_name)[0]
+    from pyresample import data_reduce, geometry, kd_tree
+
+    source_lons, source_lats = source_geo_def.get_lonlats(nprocs=nprocs)
+    source_lons = np.asanyarray(source_lons).ravel()
+    source_lats = np.asanyarray(source_lats).ravel()
+    valid_input_index = ((source_lons >= -180) & (source_lons <= 180) &
+                         (source_lats <= 90) & (source_lats >= -90))
+
+    grid_types = (geometry.GridDefinition, geometry.AreaDefinition)
+    if reduce_data and all(isinstance(target, grid_types)
+                           for target in target_geo_defs):
+        close = np.zeros(source_lons.shape, dtype=bool)
+        for target in target_geo_defs:
+            lons, lats = target.get_boundary_lonlats()
+            close |= data_reduce.get_valid_index_from_lonlat_boundaries(
+                lons, lats, source_lons, source_lats, radius_of_influence)
+        valid_input_index &= close
+    if isinstance(valid_input_index, np.ma.MaskedArray):
+        valid_input_index = valid_input_index.filled(False)
+
+    try:
+        resample_kdtree = kd_tree._create_resample_kdtree(
+            source_lons, source_lats, valid_input_index, nprocs=nprocs)
+    except kd_tree.EmptyResult:
+        return [(valid_input_index, ) +
+                kd_tree._create_empty_info(source_geo_def, target, neighbours)
+                for target in target_geo_defs]
+
+    infos = []
+    for target in target_geo_defs:
+        target_segments = segments
+        if target_segments is None:
+            target_segments = max(int(target.size / 3000000), 1)
+        if target_segments > 1:
+            target_slices = geometry._get_slice(target_segments, target.shape)
+        else:
+            target_slices = [slice(None)]
+        parts = [kd_tree._query_resample_kdtree(resample_kdtree,
+                                                source_geo_def, target,
+                                                radius_of_influence,
+                                                target_slice,
+                                                neighbours=neighbours,
+                                                epsilon=epsilon,
+                                                reduce_data=reduce_data,
+                                                nprocs=nprocs)
+                 for target_slice in target_slices]
+        infos.append((valid_input_index, ) +
+                     tuple(np.concatenate(arrays) for arrays in zip(*parts)))
+    return infos
 
 
 class BaseResampler(object):
@@ -140,6 +347,14 @@ class BaseResampler(object):
                             hashlib.sha1(json.dumps(kwargs, sort_keys=True).encode('utf-8')).hexdigest()))
         return the_hash
 
+    def get_cache_hash(self, source_geo_def=None, **kwargs):
+        """Get the hash of the parameters `precompute` would cache.
+
+        *kwargs* are the `precompute` arguments. Resamplers that don't
+        cache anything raise NotImplementedError.
+        """
+        raise NotImplementedError
+
     def precompute(self, **kwargs):
         """Do the precomputation.
 
@@ -161,7 +376,15 @@ class BaseResampler(object):
             LOG.debug("Projection already saved to %s", filename)
         else:
             LOG.info("Saving projection to %s", filename)
-            np.savez(filename, **self.cache)
+            # the geometry definitions aren't saved, they would be pickled
+            np.savez(filename, **dict((key, val)
+                                      for key, val in self.cache.items()
+                                      if isinstance(val, np.ndarray)))
+
+    @staticmethod
+    def load_cache(filename):
+        """Load the projection info saved in *filename* by `dump`."""
+        return dict(np.load(filename))
 
     def resample(self, data, cache_dir=False, mask_area=True, **kwargs):
         """Resample the *data*, saving the projection info on disk if *precompute* evaluates to True.
@@ -171,7 +394,8 @@ class BaseResampler(object):
         if mask_area and hasattr(data, "mask"):
             kwargs.setdefault("mask", data.mask)
         cache_id = self.precompute(cache_dir=cache_dir, **kwargs)
-        return self.compute(data, cache_id=cache_id, **kwargs)
+        return apply_precision(self.compute(data, cache_id=cache_id,
+                                            **kwargs))
 
     # FIXME: there should be only one obvious way to resample
     def __call__(self, *args, **kwargs):
@@ -182,8 +406,8 @@ class BaseResampler(object):
     def _create_cache_filename(self, cache_dir, hash_str):
         """Create filename for the cached resampling parameters"""
         if isinstance(cache_dir, (str, six.text_type)):
-            filename = os.path.join(
-                cache_dir, hashlib.sha1(hash_str).hexdigest() + ".npz")
+            filename = os.path.join(cache_dir, hashlib.sha1(
+                hash_str.encode("utf-8")).hexdigest() + ".npz")
         else:
             filename = os.path.join('.', hashlib.sha1(
                 hash_str.encode("utf-8")).hexdigest() + ".npz")
@@ -203,7 +427,7 @@ class BaseResampler(object):
             return
         except KeyError:
             if os.path.exists(filename):
-                self.cache = dict(np.load(filename))
+                self.cache = self.load_cache(filename)
                 self.caches[hash_str] = self.cache
                 while len(self.caches) > CACHE_SIZE:
                     self.caches.popitem(False)
@@ -219,8 +443,6 @@ class BaseResampler(object):
             self.caches.popitem(False)
 
         if cache_dir:
-            # XXX: Look in to doing memmap-able files instead
-            # `arr.tofile(filename)`
             self.dump(filename)
 
 
@@ -243,9 +465,9 @@ class KDTreeResampler(BaseResampler):
 
         source_geo_def = mask_source_lonlats(self.source_geo_def, mask)
 
-        kd_hash = self.get_hash(source_geo_def=source_geo_def,
-                                radius_of_influence=radius_of_influence,
-                                epsilon=epsilon)
+        kd_hash = self.get_cache_hash(source_geo_def,
+                                      radius_of_influence=radius_of_influence,
+                                      epsilon=epsilon)
 
         filename = self._create_cache_filename(cache_dir, kd_hash)
         self._read_params_from_cache(cache_dir, kd_hash, filename)
@@ -278,6 +500,70 @@ class KDTreeResampler(BaseResampler):
 
         return self.cache
 
+    def get_cache_hash(self, source_geo_def=None, radius_of_influence=10000,
+                       epsilon=0, **kwargs):
+        """Get the hash of the kd-tree parameters."""
+        return self.get_hash(source_geo_def=source_geo_def,
+                             radius_of_influence=radius_of_influence,
+                             epsilon=epsilon)
+
+    @classmethod
+    def precompute_targets(cls, source_geo_def, target_geo_defs, mask=None,
+                           radius_of_influence=10000, epsilon=0,
+                           reduce_data=True, nprocs=1, segments=None,
+                           cache_dir=False, **kwargs):
+        """Precompute the kd-tree parameters for several target areas.
+
+        The source kd-tree is built once for all the targets that aren't
+        cached yet (see :func:`get_multi_neighbour_info`). The parameters
+        of each target are cached as :meth:`precompute` would cache them,
+        so resampling to the targets afterwards just uses the caches.
+
+        Returns:
+            The list of the kd-tree parameters of each target.
+        """
+        del kwargs
+
+        if len(target_geo_defs) > CACHE_SIZE and not cache_dir:
+            LOG.warning("Only %d of the %d precomputed areas will be kept "
+                        "in memory, use a cache_dir", CACHE_SIZE,
+                        len(target_geo_defs))
+
+        source_geo_def = mask_source_lonlats(source_geo_def, mask)
+
+        resamplers = []
+        missing = []
+        for target_geo_def in target_geo_defs:
+            resampler = cls(source_geo_def, target_geo_def)
+            kd_hash = resampler.get_cache_hash(
+                radius_of_influence=radius_of_influence, epsilon=epsilon)
+            filename = resampler._create_cache_filename(cache_dir, kd_hash)
+            resampler._read_params_from_cache(cache_dir, kd_hash, filename)
+            resamplers.append(resampler)
+            if resampler.cache is None:
+                missing.append((resampler, kd_hash, filename))
+
+        if missing:
+            LOG.debug("Computing kd-tree parameters for %d areas",
+                      len(missing))
+            infos = get_multi_neighbour_info(
+                source_geo_def,
+                [resampler.target_geo_def for resampler, _, _ in missing],
+                radius_of_influence, neighbours=1, epsilon=epsilon,
+                reduce_data=reduce_data, nprocs=nprocs, segments=segments)
+            for (resampler, kd_hash, filename), info in zip(missing, infos):
+                valid_input_index, valid_output_index, index_array, \
+                    distance_array = info
+                resampler.cache = {"valid_input_index": valid_input_index,
+                                   "valid_output_index": valid_output_index,
+                                   "index_array": index_array,
+                                   "distance_array": distance_array,
+                                   "source_geo_def": source_geo_def,
+                                   }
+                resampler._update_caches(kd_hash, cache_dir, filename)
+
+        return [resampler.cache for resampler in resamplers]
+
     def compute(self, data, weight_funcs=None, fill_value=None, with_uncert=False, **kwargs):
 
         del kwargs
@@ -297,6 +583,8 @@ class KDTreeResampler(BaseResampler):
 
 class EWAResampler(BaseResampler):
 
+    """Resample using Elliptical Weighted Averaging."""
+
     def __init__(self, source_geo_def, target_geo_def, swath_usage=0, grid_coverage=0, **kwargs):
         """
 
@@ -310,6 +598,10 @@ class EWAResampler(BaseResampler):
         super(EWAResampler, self).__init__(
             source_geo_def, target_geo_def, **kwargs)
 
+    def get_cache_hash(self, source_geo_def=None, **kwargs):
+        """Get the hash of the ll2cr parameters."""
+        return self.get_hash(source_geo_def=source_geo_def)
+
     def precompute(self, mask=None,
                    # nprocs=1,
                    cache_dir=False,
@@ -324,7 +616,7 @@ class EWAResampler(BaseResampler):
 
         source_geo_def = self.source_geo_def
 
-        ewa_hash = self.get_hash(source_geo_def=source_geo_def)
+        ewa_hash = self.get_cache_hash(source_geo_def)
 
         filename = self._create_cache_filename(cache_dir, ewa_hash)
         self._read_params_from_cache(cache_dir, ewa_hash, filename)
@@ -335,7 +627,6 @@ class EWAResampler(BaseResampler):
         else:
             LOG.debug("Computing ll2cr parameters")
 
-        lons, lats = source_geo_def.get_lonlats()
         grid_name = getattr(self.target_geo_def, "name", "N/A")
 
         # SatPy/PyResample don't support dynamic grids out of the box yet
@@ -351,7 +642,7 @@ class EWAResampler(BaseResampler):
                 "Dynamic ll2cr is not supported by satpy yet")
 
         # Determine if enough of the input swath was used
-        fraction_in = swath_points_in_grid / float(lons.size)
+        fraction_in = swath_points_in_grid / float(source_geo_def.size)
         swath_used = fraction_in > self.swath_usage
         if not swath_used:
             LOG.info("Data does not fit in grid %s because it only %f%% of "
@@ -379,8 +670,8 @@ class EWAResampler(BaseResampler):
         return self.cache
 
     def compute(self, data, fill_value=0, weight_count=10000, weight_min=0.01,
-                weight_distance_max=1.0, weight_sum_min=-1.0,
-                maximum_weight_mode=False, **kwargs):
+                weight_distance_max=1.0, weight_delta_max=10.0,
+                weight_sum_min=-1.0, maximum_weight_mode=False, **kwargs):
         rows = self.cache["rows"]
         cols = self.cache["cols"]
 
@@ -406,6 +697,7 @@ class EWAResampler(BaseResampler):
                    weight_count=weight_count,
                    weight_min=weight_min,
                    weight_distance_max=weight_distance_max,
+                   weight_delta_max=weight_delta_max,
                    weight_sum_min=weight_sum_min,
                    maximum_weight_mode=maximum_weight_mode)
 
@@ -429,7 +721,55 @@ class EWAResampler(BaseResampler):
 
 class BilinearResampler(BaseResampler):
 
-    """Resample using bilinear."""
+    """Resample using bilinear.
+
+    The bilinear coefficients are turned into a sparse (CSR) matrix of
+    weights from the raveled source to the raveled target, so all the bands
+    are resampled at once by a sparse matrix product.
+
+    The arrays of the matrix are cached on disk as separate .npy files in a
+    directory, and memory-mapped when loaded again.
+    """
+
+    def get_cache_hash(self, source_geo_def=None, radius_of_influence=50000,
+                       **kwargs):
+        """Get the hash of the bilinear weights."""
+        return self.get_hash(source_geo_def=source_geo_def,
+                             radius_of_influence=radius_of_influence,
+                             mode="bilinear", weights="csr")
+
+    def _create_cache_filename(self, cache_dir, hash_str):
+        """Create the name of the directory of the cached weights."""
+        filename = super(BilinearResampler, self)._create_cache_filename(
+            cache_dir, hash_str)
+        return os.path.splitext(filename)[0] + CACHE_DIR_EXT
+
+    def dump(self, filename):
+        """Save the weights to the *filename* directory, one file per array.
+        """
+        if os.path.exists(filename):
+            LOG.debug("Projection already saved to %s", filename)
+            return
+        LOG.info("Saving projection to %s", filename)
+        # the arrays are written to a temporary directory first, so that
+        # no partial cache is ever found
+        tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(filename) or '.')
+        try:
+            for key, val in self.cache.items():
+                if isinstance(val, np.ndarray):
+                    np.save(os.path.join(tmp_dir, key + '.npy'), val)
+            os.rename(tmp_dir, filename)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not os.path.exists(filename):
+                raise
+
+    @staticmethod
+    def load_cache(filename):
+        """Memory-map the weights saved in the *filename* directory."""
+        return dict((os.path.splitext(name)[0],
+                     np.load(os.path.join(filename, name), mmap_mode='r'))
+                    for name in os.listdir(filename) if name.endswith('.npy'))
 
     def precompute(self, mask=None, radius_of_influence=50000,
                    reduce_data=True, nprocs=1, segments=None,
@@ -445,9 +785,8 @@ class BilinearResampler(BaseResampler):
 
         source_geo_def = mask_source_lonlats(self.source_geo_def, mask)
 
-        bil_hash = self.get_hash(source_geo_def=source_geo_def,
-                                 radius_of_influence=radius_of_influence,
-                                 mode="bilinear")
+        bil_hash = self.get_cache_hash(source_geo_def,
+                                       radius_of_influence=radius_of_influence)
 
         filename = self._create_cache_filename(cache_dir, bil_hash)
         self._read_params_from_cache(cache_dir, bil_hash, filename)
@@ -462,43 +801,397 @@ class BilinearResampler(BaseResampler):
             get_bil_info(source_geo_def, self.target_geo_def,
                          radius_of_influence, neighbours=32,
                          nprocs=nprocs, masked=False)
-        self.cache = {'bilinear_s': bilinear_s,
-                      'bilinear_t': bilinear_t,
-                      'input_idxs': input_idxs,
-                      'idx_arr': idx_arr}
+        # the matrix is kept as flat arrays, that can be saved to disk
+        weights = self.get_weight_matrix(bilinear_t, bilinear_s, input_idxs,
+                                         idx_arr, source_geo_def.size,
+                                         self.target_geo_def.size)
+        self.cache = {'weight_data': weights.data,
+                      'weight_indices': weights.indices,
+                      'weight_indptr': weights.indptr,
+                      'weight_sum': weights.dot(np.ones(weights.shape[1],
+                                                        dtype=np.float32))}
 
         self._update_caches(bil_hash, cache_dir, filename)
 
         return self.cache
 
+    @staticmethod
+    def get_weight_matrix(t__, s__, input_idxs, idx_arr, source_size,
+                          target_size):
+        """Convert the bilinear coefficients to a sparse weight matrix.
+
+        Returns:
+            The (target_size, source_size) CSR matrix giving the weight of
+            each source pixel in each target pixel, in float32.
+        """
+        from scipy.sparse import coo_matrix
+
+        t__ = np.ma.getdata(t__).ravel()
+        s__ = np.ma.getdata(s__).ravel()
+        weights = np.vstack(((1 - s__) * (1 - t__), s__ * (1 - t__),
+                             (1 - s__) * t__, s__ * t__)).T
+        valid = np.isfinite(weights).all(axis=1)
+        rows = np.repeat(np.flatnonzero(valid), 4)
+        cols = np.flatnonzero(np.ravel(input_idxs))[idx_arr[valid]].ravel()
+        weights = weights[valid].ravel().astype(np.float32)
+        # corners falling on the same source pixel are summed
+        return coo_matrix((weights, (rows, cols)),
+                          shape=(target_size, source_size)).tocsr()
+
     def compute(self, data, fill_value=None, **kwargs):
-        """Resample the given data using bilinear interpolation"""
+        """Resample the given data using bilinear interpolation.
+
+        The masked (or NaN) source pixels are left out, the weights of the
+        other pixels being renormalized.
+        """
+        from scipy.sparse import csr_matrix
+
         del kwargs
 
         target_shape = self.target_geo_def.shape
-        if data.ndim == 3:
-            output_shape = list(target_shape)
-            output_shape.append(data.shape[-1])
-            res = np.zeros(output_shape, dtype=data.dtype)
-            for i in range(data.shape[-1]):
-                res[:, :, i] = \
-                    get_sample_from_bil_info(data[:, :, i].ravel(),
-                                             self.cache['bilinear_t'],
-                                             self.cache['bilinear_s'],
-                                             self.cache['input_idxs'],
-                                             self.cache['idx_arr'],
-                                             output_shape=target_shape)
+        weights = csr_matrix((self.cache['weight_data'],
+                              self.cache['weight_indices'],
+                              self.cache['weight_indptr']),
+                             shape=(int(np.prod(target_shape)),
+                                    int(np.prod(data.shape[:2]))))
+
+        # the bands are the columns of the dense matrix
+        nbands = data.shape[2] if data.ndim == 3 else 1
+        values = np.ma.getdata(data).reshape((-1, nbands))
+        invalid = np.ma.getmaskarray(data).reshape((-1, nbands))
+        with np.errstate(invalid='ignore'):
+            invalid = invalid | ~np.isfinite(values)
+
+        if invalid.any():
+            res = weights.dot(np.where(invalid, 0, values))
+            weight_sum = weights.dot((~invalid).astype(np.float32))
+        else:
+            res = weights.dot(values)
+            weight_sum = self.cache['weight_sum'][:, np.newaxis]
+
+        covered = np.broadcast_to(weight_sum > 0, res.shape)
+        res = np.where(covered, res / np.where(weight_sum > 0, weight_sum, 1),
+                       0)
+
+        output_shape = tuple(target_shape) + data.shape[2:]
+        return np.ma.masked_array(res.reshape(output_shape),
+                                  mask=~covered.reshape(output_shape))
+
+
+class GridResampler(BaseResampler):
+
+    """Resample gridded data by locating the target pixels in the source grid.
 
+    For an `AreaDefinition` source, the target longitudes and latitudes are
+    projected in the source projection and converted to (fractional) source
+    rows and columns with the affine transform of the source grid, a block
+    of target rows at a time. No KD-tree and no source longitudes and
+    latitudes are needed. The data are then sampled with *mode* 'nearest'
+    or 'bilinear'.
+
+    Other sources (swaths) are resampled with the `KDTreeResampler`.
+    """
+
+    def __init__(self, source_geo_def, target_geo_def):
+        super(GridResampler, self).__init__(source_geo_def, target_geo_def)
+        self.fallback = None
+        if not isinstance(source_geo_def, AreaDefinition):
+            LOG.debug("Source isn't gridded, using the kd-tree resampler")
+            self.fallback = KDTreeResampler(source_geo_def, target_geo_def)
+
+    def get_cache_hash(self, source_geo_def=None, **kwargs):
+        """Get the hash of the source rows and columns."""
+        if self.fallback is not None:
+            return self.fallback.get_cache_hash(source_geo_def, **kwargs)
+        return self.get_hash(source_geo_def=source_geo_def, method="grid")
+
+    def precompute(self, cache_dir=False, **kwargs):
+        """Compute the source rows and columns of the target pixels."""
+        if self.fallback is not None:
+            self.cache = self.fallback.precompute(cache_dir=cache_dir,
+                                                  **kwargs)
+            return self.cache
+
+        del kwargs
+
+        grid_hash = self.get_cache_hash()
+
+        filename = self._create_cache_filename(cache_dir, grid_hash)
+        self._read_params_from_cache(cache_dir, grid_hash, filename)
+
+        if self.cache is not None:
+            LOG.debug("Loaded grid parameters")
+            return self.cache
         else:
-            res = \
-                get_sample_from_bil_info(data.ravel(),
-                                         self.cache['bilinear_t'],
-                                         self.cache['bilinear_s'],
-                                         self.cache['input_idxs'],
-                                         self.cache['idx_arr'],
-                                         output_shape=target_shape)
-        res = np.ma.masked_invalid(res)
+            LOG.debug("Computing grid parameters")
+
+        rows, cols = self.get_source_coords()
+        self.cache = {"rows": rows, "cols": cols}
+
+        self._update_caches(grid_hash, cache_dir, filename)
+
+        return self.cache
 
+    def get_source_coords(self):
+        """Get the fractional source rows and columns of the target pixels.
+
+        Target pixels that can't be projected in the source projection get
+        NaN.
+        """
+        from pyproj import Proj
+
+        source, target = self.source_geo_def, self.target_geo_def
+        same_proj = source.proj_dict == target.proj_dict
+        proj = Proj(source.proj_dict)
+        rows = np.empty(target.shape, dtype=np.float32)
+        cols = np.empty(target.shape, dtype=np.float32)
+        nrows = target.shape[0]
+        for start in range(0, nrows, GRID_BLOCK_ROWS):
+            block = (slice(start, min(start + GRID_BLOCK_ROWS, nrows)),
+                     slice(None))
+            if same_proj:
+                x__, y__ = target.get_proj_coords(data_slice=block)
+            else:
+                lons, lats = target.get_lonlats(data_slice=block)
+                with np.errstate(invalid='ignore'):
+                    valid = (np.isfinite(lons) & np.isfinite(lats) &
+                             (np.abs(lons) <= 180) & (np.abs(lats) <= 90))
+                x__, y__ = proj(np.where(valid, lons, 0),
+                                np.where(valid, lats, 0))
+                x__ = np.where(valid, x__, np.nan)
+                y__ = np.where(valid, y__, np.nan)
+            cols[block] = ((x__ - source.pixel_upper_left[0]) /
+                           source.pixel_size_x)
+            rows[block] = ((source.pixel_upper_left[1] - y__) /
+                           source.pixel_size_y)
+        return rows, cols
+
+    def compute(self, data, mode='nearest', fill_value=None, **kwargs):
+        """Sample the *data* at the target pixels.
+
+        Masked source pixels are left out, the bilinear weights of the
+        valid neighbours being renormalized.
+        """
+        if self.fallback is not None:
+            return self.fallback.compute(data, fill_value=fill_value,
+                                         **kwargs)
+
+        del kwargs
+
+        if mode == 'nearest':
+            sample = self._sample_nearest
+            dtype = data.dtype
+        elif mode == 'bilinear':
+            sample = self._sample_bilinear
+            dtype = np.promote_types(data.dtype, np.float32)
+        else:
+            raise ValueError("Unknown grid resampling mode: " + str(mode))
+
+        values = np.ma.getdata(data)
+        mask = np.ma.getmaskarray(data)
+        shape = tuple(self.target_geo_def.shape) + data.shape[2:]
+        res = np.zeros(shape, dtype=dtype)
+        res_mask = np.ones(shape, dtype=bool)
+        for start in range(0, shape[0], GRID_BLOCK_ROWS):
+            block = slice(start, start + GRID_BLOCK_ROWS)
+            sample(values, mask, self.cache["rows"][block],
+                   self.cache["cols"][block], res[block], res_mask[block])
+
+        res = np.ma.masked_array(res, mask=res_mask, copy=False)
+        if fill_value is not None:
+            return res.filled(fill_value)
+        return res
+
+    @staticmethod
+    def _sample_nearest(values, mask, rows, cols, out, out_mask):
+        """Sample the nearest source pixels of *rows*, *cols*."""
+        nrows, ncols = values.shape[:2]
+        with np.errstate(invalid='ignore'):
+            rows = np.floor(rows + 0.5)
+            cols = np.floor(cols + 0.5)
+            valid = (rows >= 0) & (rows < nrows) & (cols >= 0) & (cols < ncols)
+        rows = rows[valid].astype(np.intp)
+        cols = cols[valid].astype(np.intp)
+        out[valid] = values[rows, cols]
+        out_mask[valid] = mask[rows, cols]
+
+    @staticmethod
+    def _sample_bilinear(values, mask, rows, cols, out, out_mask):
+        """Interpolate the source pixels bilinearly at *rows*, *cols*."""
+        nrows, ncols = values.shape[:2]
+        with np.errstate(invalid='ignore'):
+            valid = ((rows >= -0.5) & (rows <= nrows - 0.5) &
+                     (cols >= -0.5) & (cols <= ncols - 0.5))
+        rows = np.clip(rows[valid], 0, nrows - 1)
+        cols = np.clip(cols[valid], 0, ncols - 1)
+        row0 = np.minimum(rows.astype(np.intp), max(nrows - 2, 0))
+        col0 = np.minimum(cols.astype(np.intp), max(ncols - 2, 0))
+        row1 = np.minimum(row0 + 1, nrows - 1)
+        col1 = np.minimum(col0 + 1, ncols - 1)
+        drow = rows - row0
+        dcol = cols - col0
+
+        # broadcast the weights over the bands, if any
+        extra_dims = (1, ) * (values.ndim - 2)
+        total = 0
+        weight_sum = 0
+        for row, col, weight in ((row0, col0, (1 - drow) * (1 - dcol)),
+                                 (row0, col1, (1 - drow) * dcol),
+                                 (row1, col0, drow * (1 - dcol)),
+                                 (row1, col1, drow * dcol)):
+            weight = weight.reshape(weight.shape + extra_dims)
+            weight = np.where(mask[row, col], 0, weight)
+            total = total + np.where(weight > 0, weight * values[row, col], 0)
+            weight_sum = weight_sum + weight
+        covered = weight_sum > 0
+        out[valid] = np.where(covered, total / np.where(covered, weight_sum, 1),
+                              0)
+        out_mask[valid] = ~covered
+
+
+def _take_padded(arr, axis, start, stop):
+    """Take the *start*:*stop* part of *arr* along *axis*, padding with 0."""
+    if start >= 0 and stop <= arr.shape[axis]:
+        index = [slice(None)] * arr.ndim
+        index[axis] = slice(start, stop)
+        return arr[tuple(index)]
+    shape = list(arr.shape)
+    shape[axis] = stop - start
+    res = np.zeros(shape, dtype=arr.dtype)
+    first, last = max(start, 0), min(stop, arr.shape[axis])
+    if first < last:
+        src = [slice(None)] * arr.ndim
+        dst = [slice(None)] * arr.ndim
+        src[axis] = slice(first, last)
+        dst[axis] = slice(first - start, last - start)
+        res[tuple(dst)] = arr[tuple(src)]
+    return res
+
+
+def _block_resample_axis(arr, axis, size, offset, repeats, blocks):
+    """Resample *arr* along *axis* to *size* elements.
+
+    The elements are repeated *repeats* times or summed by *blocks*, and
+    the target starts *offset* elements (of the finer resolution) after the
+    source.
+    """
+    first = offset // repeats
+    last = -(-(offset + size * blocks) // repeats)
+    arr = _take_padded(arr, axis, first, last)
+    if repeats > 1:
+        arr = np.repeat(arr, repeats, axis=axis)
+        start = offset - first * repeats
+        arr = _take_padded(arr, axis, start, start + size)
+    if blocks > 1:
+        shape = arr.shape[:axis] + (size, blocks) + arr.shape[axis + 1:]
+        arr = arr.reshape(shape).sum(axis=axis + 1)
+    return arr
+
+
+class NativeResampler(BaseResampler):
+
+    """Resample between aligned grids of the same projection.
+
+    When the source and target areas share their projection, their pixel
+    sizes have integer ratios and their pixel edges are aligned, the data
+    are replicated (finer target) or averaged (coarser target) by blocks
+    and cropped or padded to the target extent, without any geolocation
+    computation. Otherwise, the data are resampled with the
+    `GridResampler`.
+    """
+
+    def __init__(self, source_geo_def, target_geo_def):
+        super(NativeResampler, self).__init__(source_geo_def, target_geo_def)
+        self.plan = self.get_plan(source_geo_def, target_geo_def)
+        self.fallback = None
+        if self.plan is None:
+            LOG.debug("Areas aren't aligned, using the grid resampler")
+            self.fallback = GridResampler(source_geo_def, target_geo_def)
+
+    @staticmethod
+    def _get_axis_plan(src_start, src_step, dst_start, dst_step):
+        """Get the (offset, repeats, blocks) of an axis, or None."""
+        ratio = src_step / float(dst_step)
+        if ratio <= 0:
+            return None
+        repeats = int(round(ratio)) if ratio >= 1 else 1
+        blocks = int(round(1 / ratio)) if ratio < 1 else 1
+        if not np.isclose(ratio, repeats / float(blocks), rtol=1e-6):
+            return None
+        step = min(src_step, dst_step, key=abs)
+        offset = (dst_start - src_start) / step
+        if not np.isclose(offset, round(offset), rtol=0, atol=1e-6):
+            return None
+        return int(round(offset)), repeats, blocks
+
+    @classmethod
+    def get_plan(cls, source, target):
+        """Get how the rows and columns of *target* are taken from *source*.
+
+        Returns:
+            The (offset, repeats, blocks) of the rows and of the columns, or
+            None if the areas aren't aligned grids of the same projection.
+        """
+        if not (isinstance(source, AreaDefinition) and
+                isinstance(target, AreaDefinition)):
+            return None
+        if source.proj_dict != target.proj_dict:
+            return None
+        # rows go from the top of the extent down
+        rows = cls._get_axis_plan(source.area_extent[3], -source.pixel_size_y,
+                                  target.area_extent[3], -target.pixel_size_y)
+        cols = cls._get_axis_plan(source.area_extent[0], source.pixel_size_x,
+                                  target.area_extent[0], target.pixel_size_x)
+        if rows is None or cols is None:
+            return None
+        return rows, cols
+
+    def get_cache_hash(self, source_geo_def=None, **kwargs):
+        """Get the hash of the fallback parameters, if any."""
+        if self.fallback is None:
+            raise NotImplementedError
+        return self.fallback.get_cache_hash(source_geo_def, **kwargs)
+
+    def precompute(self, **kwargs):
+        """Precompute the fallback resampling, if needed."""
+        if self.fallback is not None:
+            self.cache = self.fallback.precompute(**kwargs)
+            return self.cache
+        return None
+
+    def compute(self, data, fill_value=None, **kwargs):
+        """Replicate or average the *data* by blocks.
+
+        Averaged pixels are computed from the unmasked source pixels only.
+        """
+        if self.fallback is not None:
+            return self.fallback.compute(data, fill_value=fill_value,
+                                         **kwargs)
+
+        del kwargs
+
+        values = np.ma.getdata(data)
+        count = (~np.ma.getmaskarray(data)).astype(np.int32)
+        aggregate = any(blocks > 1 for offset, repeats, blocks in self.plan)
+        if aggregate:
+            dtype = np.promote_types(values.dtype, np.float32)
+            total = np.where(count, values, 0).astype(dtype)
+        else:
+            total = values
+
+        for axis, (size, plan) in enumerate(zip(self.target_geo_def.shape,
+                                                self.plan)):
+            total = _block_resample_axis(total, axis, size, *plan)
+            count = _block_resample_axis(count, axis, size, *plan)
+
+        mask = count == 0
+        if aggregate:
+            total /= np.where(mask, 1, count)
+        elif np.may_share_memory(total, values):
+            total = total.copy()
+        res = np.ma.masked_array(total, mask=mask, copy=False)
+        if fill_value is not None:
+            return res.filled(fill_value)
         return res
 
 
@@ -506,6 +1199,8 @@ RESAMPLERS = {"kd_tree": KDTreeResampler,
               "nearest": KDTreeResampler,
               "ewa": EWAResampler,
               "bilinear": BilinearResampler,
+              "grid": GridResampler,
+              "native": NativeResampler,
               }
 
 
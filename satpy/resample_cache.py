@@ -0,0 +1,317 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 PyTroll developers
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Precompute the resampling caches of a set of areas, ahead of production.
+
+The resampling parameters of each source area (as found in sample files of a
+reader) and target area are computed and saved in the cache directory, under
+the same file names the resamplers look for when given `cache_dir`. Existing
+cache files are checked against the areas and only recomputed if they are
+missing or don't fit. From the command line::
+
+    python -m satpy.resample_cache --reader seviri_l1b_hrit \\
+        --files /data/sample/* --areas euro4 scan --resamplers kd_tree \\
+        --cache-dir /var/cache/satpy --workers 4
+
+or with the ``satpy_warm_caches`` script installed with satpy.
+"""
+
+from __future__ import print_function
+
+import argparse
+import logging
+import os
+import shutil
+import time
+import zipfile
+from itertools import product
+from multiprocessing import Pool
+
+import six
+
+from satpy.resample import (CACHE_DIR_EXT, RESAMPLERS, BaseResampler,
+                            BilinearResampler, EWAResampler, GridResampler,
+                            KDTreeResampler, get_area_def)
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ordereddict import OrderedDict
+
+LOG = logging.getLogger(__name__)
+
+
+def get_source_areas(filenames, reader=None, datasets=None,
+                     reader_kwargs=None, **kwargs):
+    """Get the different areas of the *datasets* found in *filenames*.
+
+    All the available datasets are loaded if *datasets* isn't given.
+    *kwargs* are passed to the `Scene`.
+    """
+    from satpy.scene import Scene
+    scn = Scene(filenames=filenames, reader=reader,
+                reader_kwargs=reader_kwargs, **kwargs)
+    if datasets is None:
+        datasets = scn.available_dataset_names()
+    scn.load(datasets)
+    areas = OrderedDict()
+    for dataset in scn:
+        area = dataset.info.get('area')
+        if area is not None:
+            areas.setdefault(BaseResampler.hash_area(area), area)
+    return list(areas.values())
+
+
+def get_area_name(area):
+    """Get a name to report *area* with."""
+    return getattr(area, 'area_id', None) or getattr(area, 'name', 'swath')
+
+
+def _get_cached_sizes(resampler):
+    """Get the sizes of the arrays *resampler* caches, by name."""
+    source, target = resampler.source_geo_def, resampler.target_geo_def
+    while getattr(resampler, 'fallback', None) is not None:
+        resampler = resampler.fallback
+    if isinstance(resampler, KDTreeResampler):
+        return {'valid_input_index': source.size,
+                'valid_output_index': target.size}
+    if isinstance(resampler, BilinearResampler):
+        return {'weight_indptr': target.size + 1,
+                'weight_sum': target.size}
+    if isinstance(resampler, GridResampler):
+        return {'rows': target.size, 'cols': target.size}
+    if isinstance(resampler, EWAResampler):
+        return {'rows': source.size, 'cols': source.size}
+    return {}
+
+
+def get_cache_size(filename):
+    """Get the size of the cache file or directory *filename*, in bytes."""
+    if not os.path.isdir(filename):
+        return os.path.getsize(filename)
+    return sum(os.path.getsize(os.path.join(filename, name))
+               for name in os.listdir(filename))
+
+
+def remove_cache(filename):
+    """Remove the cache file or directory *filename*."""
+    if os.path.isdir(filename):
+        shutil.rmtree(filename)
+    else:
+        os.remove(filename)
+
+
+def check_cache(resampler, filename):
+    """Check that the cache in *filename* fits the areas of *resampler*.
+
+    The cache must be readable and hold all the arrays *resampler* uses,
+    with the sizes of its source and target areas.
+    """
+    try:
+        sizes = dict((key, arr.size) for key, arr
+                     in resampler.load_cache(filename).items())
+    except (IOError, OSError, ValueError, zipfile.BadZipfile) as err:
+        LOG.debug("Can't read %s: %s", filename, str(err))
+        return False
+    for key, size in _get_cached_sizes(resampler).items():
+        if sizes.get(key) != size:
+            LOG.debug("Bad or missing '%s' array in %s", key, filename)
+            return False
+    return True
+
+
+def warm_cache(source_area, target_area, cache_dir, resampler='kd_tree',
+               check_only=False, **kwargs):
+    """Precompute the resampling cache of *source_area* to *target_area*.
+
+    The cache is only computed if there is no valid one in *cache_dir*
+    already, and is not computed at all with *check_only*. *kwargs* are
+    passed to the `precompute` method of the resampler.
+
+    Returns:
+        A report of the cache, as a dictionary with the names of the areas
+        and of the resampler, the `filename` of the cache, its `status`
+        ('created', 'recreated', 'valid', 'invalid', 'missing', 'failed'
+        or 'not cached' for resamplers with nothing to cache), and the
+        `size` (in bytes) and computation `time` (in seconds) of the cache.
+    """
+    if isinstance(resampler, six.string_types):
+        resampler_name = resampler
+        resampler_class = RESAMPLERS[resampler]
+    else:
+        resampler_name = resampler.__name__
+        resampler_class = resampler
+    instance = resampler_class(source_area, target_area)
+    report = {'source': get_area_name(source_area),
+              'target': get_area_name(target_area),
+              'resampler': resampler_name,
+              'filename': None, 'status': 'not cached',
+              'size': 0, 'time': 0.}
+    try:
+        cache_hash = instance.get_cache_hash(**kwargs)
+    except NotImplementedError:
+        return report
+
+    filename = instance._create_cache_filename(cache_dir, cache_hash)
+    report['filename'] = filename
+    status = 'created'
+    if os.path.exists(filename):
+        report['size'] = get_cache_size(filename)
+        if check_cache(instance, filename):
+            report['status'] = 'valid'
+            return report
+        if check_only:
+            report['status'] = 'invalid'
+            return report
+        LOG.info("Replacing invalid cache %s", filename)
+        remove_cache(filename)
+        status = 'recreated'
+    elif check_only:
+        report['status'] = 'missing'
+        return report
+
+    start = time.time()
+    try:
+        instance.precompute(cache_dir=cache_dir, **kwargs)
+    except Exception as err:
+        # eg. the source data doesn't overlap the target area
+        LOG.warning("Couldn't precompute %s resampling from %s to %s: %s",
+                    resampler_name, report['source'], report['target'],
+                    str(err))
+        report['status'] = 'failed'
+        return report
+    report['time'] = time.time() - start
+    report['status'] = status
+    report['size'] = get_cache_size(filename)
+    return report
+
+
+def _warm_cache_job(args):
+    """Run `warm_cache` with the *args* of a job, in a worker process."""
+    source_area, target_area, cache_dir, resampler, check_only, kwargs = args
+    return warm_cache(source_area, target_area, cache_dir,
+                      resampler=resampler, check_only=check_only, **kwargs)
+
+
+def warm_caches(source_areas, target_areas, cache_dir,
+                resamplers=('kd_tree', ), workers=1, check_only=False,
+                **kwargs):
+    """Precompute the resampling caches of all the areas to *cache_dir*.
+
+    Args:
+        source_areas (list): The areas of the data, eg. from
+            `get_source_areas`.
+        target_areas (list): The target areas, as definitions or names.
+        cache_dir (str): The directory to save the caches in, as given to
+            `Scene.resample`.
+        resamplers (list): The names of the resamplers to precompute.
+        workers (int): The number of processes computing the caches.
+        check_only (bool): Only check the existing caches.
+        kwargs: Arguments for the `precompute` method of the resamplers,
+            eg. `radius_of_influence`. They have to match the ones used
+            later in `Scene.resample` for the caches to be found.
+
+    Returns:
+        The list of the reports from `warm_cache`, for each source area,
+        target area and resampler.
+    """
+    target_areas = [get_area_def(area)
+                    if isinstance(area, six.string_types) else area
+                    for area in target_areas]
+    if not os.path.isdir(cache_dir) and not check_only:
+        os.makedirs(cache_dir)
+    jobs = [(source_area, target_area, cache_dir, resampler, check_only,
+             kwargs)
+            for source_area, target_area, resampler
+            in product(source_areas, target_areas, resamplers)]
+    if workers > 1 and len(jobs) > 1:
+        pool = Pool(min(workers, len(jobs)))
+        try:
+            return pool.map(_warm_cache_job, jobs)
+        finally:
+            pool.close()
+            pool.join()
+    return [_warm_cache_job(job) for job in jobs]
+
+
+def find_unused_caches(cache_dir, reports):
+    """Find the cache files of *cache_dir* that none of *reports* uses."""
+    used = set(os.path.abspath(report['filename']) for report in reports
+               if report['filename'] is not None)
+    if not os.path.isdir(cache_dir):
+        return []
+    return sorted(os.path.join(cache_dir, filename)
+                  for filename in os.listdir(cache_dir)
+                  if filename.endswith(('.npz', CACHE_DIR_EXT)) and
+                  os.path.abspath(
+                      os.path.join(cache_dir, filename)) not in used)
+
+
+def main(argv=None):
+    """Precompute the resampling caches from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reader', help="reader of the sample files")
+    parser.add_argument('--files', nargs='+', required=True,
+                        help="sample files of the source data")
+    parser.add_argument('--datasets', nargs='+',
+                        help="datasets to get the source areas from "
+                        "(default: all the available datasets)")
+    parser.add_argument('--areas', nargs='+', required=True,
+                        help="names of the target areas")
+    parser.add_argument('--resamplers', nargs='+', default=['kd_tree'],
+                        choices=sorted(RESAMPLERS.keys()),
+                        help="resamplers to precompute (default: kd_tree)")
+    parser.add_argument('--cache-dir', required=True,
+                        help="directory of the caches")
+    parser.add_argument('--radius-of-influence', type=float,
+                        help="radius of influence of the resampling, in "
+                        "meters (default: the resamplers' default)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="number of processes (default: 1)")
+    parser.add_argument('--check', action='store_true',
+                        help="only check the existing caches")
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help="print debug messages")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose
+                        else logging.WARNING)
+    kwargs = {}
+    if args.radius_of_influence is not None:
+        kwargs['radius_of_influence'] = args.radius_of_influence
+
+    source_areas = get_source_areas(args.files, reader=args.reader,
+                                    datasets=args.datasets)
+    reports = warm_caches(source_areas, args.areas, args.cache_dir,
+                          resamplers=args.resamplers, workers=args.workers,
+                          check_only=args.check, **kwargs)
+    for report in reports:
+        print("{status:<10} {resampler:<8} {source} -> {target} "
+              "{megabytes:.1f} MB {time:.1f} s {filename}".format(
+                  megabytes=report['size'] / 1e6, **report))
+    for filename in find_unused_caches(args.cache_dir, reports):
+        print("{:<10} {}".format('unused', filename))
+
+    bad = [report for report in reports
+           if report['status'] in ('invalid', 'missing', 'failed')]
+    return 1 if bad else 0
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())
@@ -26,14 +26,19 @@
 
 import logging
 import os
-import yaml
+import weakref
+
+import numpy as np
+from pyresample.geometry import StackedAreaDefinition
 
 from satpy.composites import CompositorLoader, IncompatibleAreas
-from satpy.config import (config_search_paths, get_environ_config_dir,
+from satpy.config import (apply_precision, config_search_paths,
+                          get_environ_config_dir, load_yaml_config,
                           runtime_import, recursive_dict_update)
 from satpy.dataset import Dataset, DatasetID, InfoObject
 from satpy.node import DependencyTree
 from satpy.readers import DatasetDict, load_readers
+from satpy.readers.helper_functions import get_area_rows
 
 try:
     import configparser
@@ -43,6 +48,129 @@ except ImportError:
 LOG = logging.getLogger(__name__)
 
 
+def _stitch_rows(dataset, runs, bands, buffers=None, total_segments=None):
+    """Stitch the rows of new segments in between the rows of *dataset*.
+
+    The rows are written in place in preallocated arrays, which *dataset*
+    then views. The arrays are allocated for *total_segments* segments if
+    known, so that segments arriving in order are just added after the rows
+    already there. Segments arriving in between only move the rows after
+    them.
+
+    Args:
+        dataset: the dataset made of the old segments, all of the same
+            number of rows.
+        runs: the (is_new, number of segments) runs of consecutive old and
+            new segments, in row order.
+        bands: the datasets of the runs of new segments.
+        buffers: the (data, mask) arrays *dataset* is a view of, from a
+            previous call, if any.
+        total_segments: the number of segments of the whole dataset, if
+            known.
+
+    Returns:
+        The stitched dataset, the row slices of the *bands* in it, and the
+        (data, mask) arrays it is a view of.
+    """
+    old_segments = sum(num for is_new, num in runs if not is_new)
+    rows = dataset.shape[-2]
+    if not old_segments or rows % old_segments:
+        raise ValueError("Can't split {} rows in {} segments".format(
+            rows, old_segments))
+    height = rows // old_segments
+    area = dataset.info.get('area')
+    if area is None or not hasattr(area, 'proj_dict'):
+        raise ValueError("Rows can only be stitched on area definitions")
+
+    bands = list(bands)
+    for part in bands:
+        if (part.shape[:-2] != dataset.shape[:-2] or
+                part.shape[-1] != dataset.shape[-1]):
+            raise ValueError("Segment shape {} doesn't match {}".format(
+                part.shape, dataset.shape))
+    total_rows = rows + sum(part.shape[-2] for part in bands)
+    dtype = np.result_type(dataset.dtype, *[part.dtype for part in bands])
+    if (buffers is None or buffers[0].dtype != dtype or
+            buffers[0].shape[-2] < total_rows):
+        capacity = max(total_rows, (total_segments or 0) * height)
+        if buffers is not None:
+            # grow geometrically when the number of segments is unknown
+            capacity = max(capacity, 2 * buffers[0].shape[-2])
+        shape = dataset.shape[:-2] + (capacity, dataset.shape[-1])
+        data = np.empty(shape, dtype=dtype)
+        mask = np.ones(shape, dtype=bool)
+        data[..., :rows, :] = np.ma.getdata(dataset)
+        mask[..., :rows, :] = np.ma.getmaskarray(dataset)
+    else:
+        data, mask = buffers
+
+    bands = iter(bands)
+    moves, writes, areas, slices = [], [], [], []
+    offset = out_offset = 0
+    for is_new, num in runs:
+        if is_new:
+            part = next(bands)
+            yslice = slice(out_offset, out_offset + part.shape[-2])
+            writes.append((yslice, part))
+            areas.append(part.info['area'])
+            slices.append(yslice)
+        else:
+            yslice = slice(offset, offset + num * height)
+            moves.append((yslice, slice(out_offset,
+                                        out_offset + num * height)))
+            areas.append(get_area_rows(area, yslice))
+            offset += num * height
+        out_offset = yslice.stop if is_new else out_offset + num * height
+
+    # the old rows only move down, so the last ones are moved first
+    for old_rows, new_rows in reversed(moves):
+        if old_rows != new_rows:
+            data[..., new_rows, :] = data[..., old_rows, :]
+            mask[..., new_rows, :] = mask[..., old_rows, :]
+    for yslice, part in writes:
+        data[..., yslice, :] = np.ma.getdata(part)
+        mask[..., yslice, :] = np.ma.getmaskarray(part)
+
+    info = dataset.info.copy()
+    info['area'] = StackedAreaDefinition(*areas).squeeze()
+    for _, part in writes:
+        if part.info.get('start_time') and info.get('start_time'):
+            info['start_time'] = min(info['start_time'],
+                                     part.info['start_time'])
+        if part.info.get('end_time') and info.get('end_time'):
+            info['end_time'] = max(info['end_time'], part.info['end_time'])
+    return (dataset.__class__(data[..., :total_rows, :],
+                              mask=mask[..., :total_rows, :],
+                              copy=False, **info),
+            slices, (data, mask))
+
+
+class _RowBuffers(object):
+    """The preallocated arrays of the datasets stitched from segments.
+
+    The arrays are forgotten as soon as the dataset viewing them is deleted.
+    """
+
+    def __init__(self):
+        self._buffers = {}
+
+    def get(self, ds_id, dataset):
+        """Get the (data, mask) arrays *dataset* is a view of, if any."""
+        ref, data, mask = self._buffers.get(ds_id, (None, None, None))
+        if ref is None or ref() is not dataset:
+            return None
+        return data, mask
+
+    def set(self, ds_id, dataset, buffers):
+        """Remember that *dataset* is a view of the *buffers* arrays."""
+        entries = self._buffers
+
+        def _forget(ref):
+            if entries.get(ds_id, (None, ))[0] is ref:
+                del entries[ds_id]
+        entries[ds_id] = (weakref.ref(dataset, _forget), ) + tuple(buffers)
+
+
 class Scene(InfoObject):
     """The Almighty Scene Class.
 
@@ -147,6 +275,7 @@ class Scene(InfoObject):
         comps, mods = self.cpl.load_compositors(self.info['sensor'])
         self.wishlist = set()
         self.dep_tree = DependencyTree(self.readers, comps, mods)
+        self._row_buffers = _RowBuffers()
 
     def _ipython_key_completions_(self):
         return [x.name for x in self.datasets.keys()]
@@ -458,9 +587,10 @@ class Scene(InfoObject):
         )
 
         try:
-            composite = compositor(prereq_datasets,
-                                   optional_datasets=optional_datasets,
-                                   **self.info)
+            composite = apply_precision(
+                compositor(prereq_datasets,
+                           optional_datasets=optional_datasets,
+                           **self.info))
             self.datasets[composite.id] = composite
             if comp_node.name in self.wishlist:
                 self.wishlist.remove(comp_node.name)
@@ -576,6 +706,133 @@ class Scene(InfoObject):
         if unload:
             self.unload(keepables=keepables)
 
+    def add_files(self, filenames):
+        """Add new segment files to the readers of the scene.
+
+        This is meant for geostationary data arriving segment by segment::
+
+            scn = Scene(filenames=first_segments, reader='ahi_hsd')
+            scn.load(['true_color'])
+            rows = scn.add_files(next_segments)
+
+        Only the new segments are read for the loaded datasets, and the
+        composites are only generated for the rows of the new segments. The
+        rows already there are kept. Datasets that can't be updated this way
+        (eg. swath data, or composites needing datasets from other files)
+        are loaded and generated again entirely.
+
+        Returns:
+            dict: DatasetID -> list of the row slices of the updated datasets
+            that were read or generated.
+
+        """
+        updated = {}
+        for reader_instance in self.readers.values():
+            loadables = reader_instance.select_files_from_pathnames(
+                filenames)
+            if not loadables:
+                continue
+            new_filehandlers = reader_instance.create_filehandlers(loadables)
+            if new_filehandlers:
+                updated.update(self._add_segments(reader_instance,
+                                                  new_filehandlers))
+        self.info.update(self._compute_metadata_from_readers())
+
+        reload_ids = [ds_id for ds_id, rows in updated.items()
+                      if rows is None]
+        if reload_ids:
+            self.read()
+            keepables = self.compute()
+            self.unload(keepables=keepables)
+            for ds_id in reload_ids:
+                if ds_id in self.datasets:
+                    rows = self.datasets[ds_id].shape[-2]
+                    updated[ds_id] = [slice(0, rows)]
+                else:
+                    del updated[ds_id]
+        return updated
+
+    def _add_segments(self, reader_instance, new_filehandlers):
+        """Update the datasets with the segments of *new_filehandlers*.
+
+        Returns:
+            dict: DatasetID -> list of the new row slices, or None if the
+            dataset was removed to be loaded again.
+
+        """
+        updated = {}
+        targets = {}
+        for ds_id in list(self.datasets.keys()):
+            if ds_id in reader_instance.ids:
+                leaf_ids = [ds_id]
+            elif ds_id in self.dep_tree and not self.dep_tree[ds_id].is_leaf:
+                leaf_ids = [node.name for node in
+                            self.dep_tree.leaves(nodes=[ds_id])]
+            else:
+                continue
+            all_runs = [reader_instance.get_segment_runs(leaf_id,
+                                                         new_filehandlers)
+                        for leaf_id in leaf_ids]
+            if not any(is_new for runs in all_runs if runs
+                       for is_new, _ in runs):
+                continue
+            patterns = set(tuple((is_new, len(fhds)) for is_new, fhds in runs)
+                           if runs else None for runs in all_runs)
+            if (len(patterns) != 1 or None in patterns or
+                    reader_instance.filter_parameters.get('area') is not None):
+                LOG.debug("Loading %s again for the new segments", ds_id)
+                del self.datasets[ds_id]
+                updated[ds_id] = None
+                continue
+            pattern = patterns.pop()
+            group = targets.setdefault(pattern, ([], set(), []))
+            group[0].append(ds_id)
+            group[1].update(leaf_ids)
+            group[2].extend(all_runs)
+
+        for pattern, (ds_ids, leaf_ids, all_runs) in targets.items():
+            new_runs = [idx for idx, (is_new, _) in enumerate(pattern)
+                        if is_new]
+            # eg. the full disk segment count in the AHI file names
+            total_segments = max([getattr(fhd, 'filename_info', {}).get(
+                'total_segments', 0) for runs in all_runs
+                for _, fhds in runs for fhd in fhds] or [0])
+            bands = {}
+            for idx in new_runs:
+                band_filehandlers = set(fhd for runs in all_runs
+                                        for fhd in runs[idx][1])
+                band_scn = Scene()
+                band_scn.info = self.info.copy()
+                band_scn.dep_tree = self.dep_tree.copy()
+                band_scn.datasets.update(reader_instance.load(
+                    leaf_ids, file_handlers=band_filehandlers))
+                comp_ids = [ds_id for ds_id in ds_ids
+                            if ds_id not in band_scn.datasets]
+                band_scn.wishlist = set(comp_ids)
+                band_scn.compute(nodes=[band_scn.dep_tree[ds_id]
+                                        for ds_id in comp_ids])
+                for ds_id in ds_ids:
+                    bands.setdefault(ds_id, []).append(
+                        band_scn.datasets.get(ds_id))
+
+            for ds_id in ds_ids:
+                try:
+                    if any(band is None for band in bands[ds_id]):
+                        raise ValueError("Missing segments")
+                    dataset = self.datasets[ds_id]
+                    dataset, updated[ds_id], buffers = _stitch_rows(
+                        dataset, pattern, bands[ds_id],
+                        self._row_buffers.get(ds_id, dataset),
+                        total_segments)
+                    self.datasets[ds_id] = dataset
+                    self._row_buffers.set(ds_id, dataset, buffers)
+                except ValueError as err:
+                    LOG.debug("Loading %s again for the new segments: %s",
+                              ds_id, str(err))
+                    del self.datasets[ds_id]
+                    updated[ds_id] = None
+        return updated
+
     def resample(self,
                  destination,
                  datasets=None,
@@ -638,8 +895,7 @@ class Scene(InfoObject):
     def load_writer_config(self, config_files, **kwargs):
         conf = {}
         for conf_fn in config_files:
-            with open(conf_fn) as fd:
-                conf = recursive_dict_update(conf, yaml.load(fd))
+            conf = recursive_dict_update(conf, load_yaml_config(conf_fn))
         writer_class = conf['writer']['writer']
         writer = writer_class(ppp_config_dir=self.ppp_config_dir,
                               config_files=config_files,
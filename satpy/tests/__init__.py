@@ -26,10 +26,11 @@ import logging
 import sys
 
 from satpy.tests import (reader_tests, test_dataset, test_file_handlers,
-                         test_helper_functions, test_readers, test_resample,
-                         test_scene, test_utils, test_writers,
-                         test_yaml_reader, writer_tests,
-                         test_enhancements)
+                         test_helper_functions, test_pipeline, test_readers,
+                         test_resample, test_resample_cache, test_scene,
+                         test_utils, test_writers, test_yaml_reader,
+                         writer_tests,
+                         test_enhancements, test_composites)
 
 
 if sys.version_info < (2, 7):
@@ -45,10 +46,12 @@ def suite():
 
     mysuite = unittest.TestSuite()
     mysuite.addTests(test_scene.suite())
+    mysuite.addTests(test_pipeline.suite())
     mysuite.addTests(test_dataset.suite())
     mysuite.addTests(test_writers.suite())
     mysuite.addTests(test_readers.suite())
     mysuite.addTests(test_resample.suite())
+    mysuite.addTests(test_resample_cache.suite())
     mysuite.addTests(test_yaml_reader.suite())
     mysuite.addTests(test_helper_functions.suite())
     mysuite.addTests(reader_tests.suite())
@@ -56,6 +59,7 @@ def suite():
     mysuite.addTests(test_file_handlers.suite())
     mysuite.addTests(test_utils.suite())
     mysuite.addTests(test_enhancements.suite())
+    mysuite.addTests(test_composites.suite())
 
     return mysuite
 
@@ -30,7 +30,9 @@ from satpy.tests.reader_tests import (test_abi_l1b, test_hrit_base,
                                       test_hdf5_utils, test_netcdf_utils,
                                       test_hdf4_utils,
                                       test_acspo, test_amsr2_l1b,
-                                      test_omps_edr, test_nucaps, test_geocat)
+                                      test_omps_edr, test_nucaps, test_geocat,
+                                      test_ahi_hsd, test_safe_sar_c,
+                                      test_hrit_goes)
 
 if sys.version_info < (2, 7):
     import unittest2 as unittest
@@ -55,5 +57,8 @@ def suite():
     mysuite.addTests(test_omps_edr.suite())
     mysuite.addTests(test_nucaps.suite())
     mysuite.addTests(test_geocat.suite())
+    mysuite.addTests(test_ahi_hsd.suite())
+    mysuite.addTests(test_safe_sar_c.suite())
+    mysuite.addTests(test_hrit_goes.suite())
 
     return mysuite
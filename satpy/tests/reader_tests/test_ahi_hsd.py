@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 PyTroll developers
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Unittesting the AHI HSD reader
+"""
+
+import os
+import sys
+from tempfile import mkstemp
+
+import numpy as np
+
+from satpy.dataset import Dataset, DatasetID
+from satpy.readers import ahi_hsd
+
+if sys.version_info < (2, 7):
+    import unittest2 as unittest
+else:
+    import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+NLINES = NCOLS = 110
+
+
+def _block(dtype, number, extra=0, **values):
+    block = np.zeros(1, dtype=dtype)
+    block['hblock_number'] = number
+    block['blocklength'] = dtype.itemsize + extra
+    for key, val in values.items():
+        block[key] = val
+    return block.tobytes()
+
+
+def _records(dtype, num):
+    records = np.zeros(num, dtype=dtype)
+    records[dtype.names[0]] = np.arange(num)
+    return records.tobytes() + b'\0' * 40
+
+
+def write_hsd(filename, counts):
+    """Write a band 13, full disk, single segment file of *counts*."""
+    cal = np.zeros(1, dtype=ahi_hsd._IRCAL_INFO_TYPE)
+    cal['c0_rad2tb_conversion'] = -0.11
+    cal['c1_rad2tb_conversion'] = 1.0
+    cal['c2_rad2tb_conversion'] = -1.4e-06
+    cal['speed_of_light'] = 299792458.0
+    cal['planck_constant'] = 6.62606957e-34
+    cal['boltzmann_constant'] = 1.3806488e-23
+    navcorr = _records(ahi_hsd._NAVIGATION_CORRECTION_TYPE, 2)
+    obstime = _records(ahi_hsd._OBS_TIME_TYPE, 3)
+    errors = _records(ahi_hsd._ERROR_LINE_TYPE, 1)
+
+    blocks = [
+        _block(ahi_hsd._DATA_INFO_TYPE, 2, number_of_bits_per_pixel=16,
+               number_of_columns=NCOLS, number_of_lines=NLINES),
+        # a 2 km full disk subsampled 50 times
+        _block(ahi_hsd._PROJ_INFO_TYPE, 3, sub_lon=140.7,
+               CFAC=20466275 // 50, LFAC=20466275 // 50, COFF=55.5,
+               LOFF=55.5, distance_from_earth_center=42164.,
+               earth_equatorial_radius=6378.137,
+               earth_polar_radius=6356.7523),
+        _block(ahi_hsd._NAV_INFO_TYPE, 4, SSP_longitude=140.7,
+               distance_earth_center_to_satellite=42164.),
+        _block(ahi_hsd._CAL_INFO_TYPE, 5, ahi_hsd._IRCAL_INFO_TYPE.itemsize,
+               band_number=13, central_wave_length=10.4,
+               count_value_error_pixels=65535,
+               count_value_outside_scan_pixels=65534,
+               gain_count2rad_conversion=-0.0037,
+               offset_count2rad_conversion=15.2) + cal.tobytes(),
+        _block(ahi_hsd._INTER_CALIBRATION_INFO_TYPE, 6),
+        _block(ahi_hsd._SEGMENT_INFO_TYPE, 7, total_number_of_segments=1,
+               segment_sequence_number=1),
+        _block(ahi_hsd._NAVIGATION_CORRECTION_INFO_TYPE, 8, len(navcorr),
+               numof_correction_info_data=2) + navcorr,
+        _block(ahi_hsd._OBS_TIME_INFO_TYPE, 9, len(obstime),
+               number_of_observation_times=3) + obstime,
+        _block(ahi_hsd._ERROR_INFO_TYPE, 10, len(errors),
+               number_of_error_info_data=1) + errors,
+        _block(ahi_hsd._SPARE_TYPE, 11),
+    ]
+    header_length = (ahi_hsd._BASIC_INFO_TYPE.itemsize +
+                     sum(len(block) for block in blocks))
+    blocks.insert(0, _block(ahi_hsd._BASIC_INFO_TYPE, 1,
+                            satellite=b'Himawari-8',
+                            observation_start_time=58000.,
+                            observation_end_time=58000.01,
+                            total_header_length=header_length))
+    with open(filename, 'wb') as fdes:
+        for block in blocks:
+            fdes.write(block)
+        fdes.write(counts.astype('<u2').tobytes())
+
+
+class TestAHIHSDFileHandler(unittest.TestCase):
+
+    """Test the AHI HSD file handler."""
+
+    def setUp(self):
+        """Write a fake segment file."""
+        fdes, self.filename = mkstemp(suffix='.DAT')
+        os.close(fdes)
+        self.counts = np.arange(NLINES * NCOLS).reshape((NLINES, NCOLS))
+        self.counts = (self.counts % 4000 + 1).astype(np.uint16)
+        self.counts[3, 50] = 65535
+        self.counts[60, 4] = 65534
+        write_hsd(self.filename, self.counts)
+        self.fh = ahi_hsd.AHIHSDFileHandler(
+            self.filename, {'segment_number': 1, 'total_segments': 1}, {})
+        self.fh.get_area_def(None)
+
+    def tearDown(self):
+        """Remove the fake file."""
+        self.fh._memmap = None
+        os.remove(self.filename)
+
+    def test_header(self):
+        """Test reading the header blocks."""
+        header = self.fh._header
+        self.assertEqual(self.fh.platform_name, 'Himawari-8')
+        self.assertEqual(int(self.fh.data_info['number_of_lines']), NLINES)
+        self.assertEqual(header['block5']['band_number'][0], 13)
+        self.assertEqual(header['calibration']['c1_rad2tb_conversion'][0],
+                         1.0)
+        self.assertEqual(header['block7']['total_number_of_segments'][0], 1)
+        self.assertEqual(len(header['navigation_corrections']), 2)
+        np.testing.assert_array_equal(
+            header['observation_time_information']['line_number'],
+            [0, 1, 2])
+        self.assertEqual(len(header['error_information_data']), 1)
+        self.assertEqual(header['block10']['hblock_number'][0], 10)
+
+    def test_get_dataset(self):
+        """Test reading slices of the counts and brightness temperatures."""
+        info = {'units': 'K', 'standard_name': 'toa_brightness_temperature',
+                'wavelength': (9.9, 10.4, 10.9)}
+        key = DatasetID(name='B13', calibration='counts')
+        res = self.fh.get_dataset(key, info)
+        np.testing.assert_array_equal(res.data, self.counts)
+        space = ((np.arange(NLINES)[:, None] - 54.5) ** 2 +
+                 (np.arange(NCOLS) - 54.5) ** 2) > 56 ** 2
+        self.assertTrue(res.mask[space].all())
+        self.assertFalse(res.mask[50:60, 50:60].any())
+        self.assertTrue(res.mask[3, 50])
+        self.assertTrue(res.mask[60, 4])
+        self.assertEqual(res.info['units'], 'K')
+
+        # the file is only read in the requested slice
+        yslice, xslice = slice(10, 70), slice(20, 100, 3)
+        out = Dataset(np.zeros((60, 27), dtype=np.float32),
+                      mask=np.zeros((60, 27), dtype=bool))
+        self.fh.get_dataset(key, info, out, xslice, yslice)
+        np.testing.assert_array_equal(out.data, res.data[yslice, xslice])
+        np.testing.assert_array_equal(out.mask, res.mask[yslice, xslice])
+
+        # calibrating from the counts gives the pixelwise calibration
+        key = DatasetID(name='B13', calibration='brightness_temperature')
+        res = self.fh.get_dataset(key, info, None, xslice, yslice)
+        expected = Dataset(self.counts[yslice, xslice].astype(np.float32),
+                           mask=np.zeros((60, 27), dtype=bool))
+        with np.errstate(invalid='ignore'):
+            self.fh._calibrate(expected, 'brightness_temperature')
+        valid = ~out.mask & ~expected.mask
+        np.testing.assert_allclose(res.data[valid], expected.data[valid],
+                                   rtol=1e-6)
+        self.assertTrue(res.mask[~valid].all())
+
+    def test_header_read_once(self):
+        """Test that the header isn't parsed again when reading."""
+        key = DatasetID(name='B13', calibration='counts')
+        info = {'units': '1', 'standard_name': 'counts',
+                'wavelength': (9.9, 10.4, 10.9)}
+        with mock.patch.object(ahi_hsd.np, 'fromfile') as fromfile:
+            self.fh.get_dataset(key, info)
+            self.fh.get_dataset(key, info)
+            fromfile.assert_not_called()
+
+
+def suite():
+    """The test suite for test_ahi_hsd.
+    """
+    loader = unittest.TestLoader()
+    mysuite = unittest.TestSuite()
+    mysuite.addTest(loader.loadTestsFromTestCase(TestAHIHSDFileHandler))
+    return mysuite
+
+if __name__ == "__main__":
+    # So you can run tests from this module individually.
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 PyTroll developers
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""The hrit goes reader tests package.
+"""
+
+import sys
+
+import numpy as np
+
+from satpy.dataset import Dataset
+from satpy.readers import helper_functions
+from satpy.readers.hrit_goes import HRITGOESFileHandler
+
+if sys.version_info < (2, 7):
+    import unittest2 as unittest
+else:
+    import unittest
+
+
+class TestHRITGOESFileHandler(unittest.TestCase):
+
+    """Test the HRIT GOES calibration."""
+
+    def setUp(self):
+        self.reader = HRITGOESFileHandler.__new__(HRITGOESFileHandler)
+        self.reader.mda = {'calibration_parameters': {
+            'indices': np.array([0, 10]),
+            'values': np.array([200., 300.], dtype=np.float32),
+            '_UNIT': 'KELVIN'}}
+
+    def tearDown(self):
+        helper_functions._COUNT_LUTS.clear()
+
+    def _calibrate(self, counts, mask):
+        data = Dataset(counts, mask=mask.copy())
+        self.reader.calibrate(data, 'brightness_temperature')
+        return data
+
+    def test_calibrate_mask(self):
+        """Test that both calibration paths keep the mask of the data."""
+        mask = np.zeros((2, 3), dtype=bool)
+        mask[1, 0] = True
+        expected_mask = mask.copy()
+        expected_mask[0, 0] = expected_mask[1, 2] = True
+
+        # integer counts go through a lookup table
+        res = self._calibrate(np.array([[0, 1, 4], [3, 2, 0]],
+                                       dtype=np.float32), mask)
+        np.testing.assert_array_equal(res.mask, expected_mask)
+        np.testing.assert_allclose(res.data[0, 1:], [210., 240.])
+        self.assertEqual(res.info['units'], 'KELVIN')
+
+        # other values are calibrated pixelwise
+        res = self._calibrate(np.array([[0, 1, 4.5], [3, 2, 0]],
+                                       dtype=np.float32), mask)
+        np.testing.assert_array_equal(res.mask, expected_mask)
+        np.testing.assert_allclose(res.data[0, 1:], [210., 245.])
+        self.assertEqual(res.info['units'], 'KELVIN')
+
+
+def suite():
+    """The test suite for test_hrit_goes.
+    """
+    loader = unittest.TestLoader()
+    mysuite = unittest.TestSuite()
+    mysuite.addTest(loader.loadTestsFromTestCase(TestHRITGOESFileHandler))
+    return mysuite
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -89,6 +89,17 @@ CALIBRATION_TYPE = np.array(
     [[2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2]], dtype=np.uint8)
 
 
+def pack10(data):
+    """Pack 16 bits *data* in 10 bits, 4 pixels in 5 bytes."""
+    data = data.astype(np.uint64).reshape(data.shape[:-1] + (-1, 4))
+    packed = ((data[..., 0] << 30) | (data[..., 1] << 20) |
+              (data[..., 2] << 10) | data[..., 3])
+    res = np.empty(packed.shape + (5, ), dtype=np.uint8)
+    for idx in range(5):
+        res[..., idx] = (packed >> (8 * (4 - idx))) & 255
+    return res.reshape(data.shape[:-2] + (-1, ))
+
+
 def assertNumpyArraysEqual(self, other):
     if self.shape != other.shape:
         raise AssertionError("Shapes don't match")
@@ -153,6 +164,80 @@ class TestNativeMSGFileHandler(unittest.TestCase):
         self.reader._ir_calibrate(data, key_name)
         assertNumpyArraysEqual(data.data, IR_108_TBS)
 
+    def test_calibrate(self):
+        """Test that the calibration of counts matches the pixelwise one"""
+        from satpy.dataset import Dataset
+        from satpy.readers.helper_functions import _COUNT_LUTS
+
+        counts = np.arange(1, 1024, dtype=np.float32).reshape((31, 33))
+        for name, calibration in [('VIS006', 'reflectance'),
+                                  ('IR_108', 'brightness_temperature'),
+                                  ('IR_108', 'radiance')]:
+            key = mock.Mock(calibration=calibration)
+            key.name = name
+            data = Dataset(counts.copy(), mask=counts == 0)
+            self.reader.calibrate(data, key)
+            expected = Dataset(counts.copy(), mask=counts == 0)
+            self.reader._calibrate(expected, name, calibration)
+            np.testing.assert_array_equal(data.data, expected.data)
+            np.testing.assert_array_equal(data.mask, expected.mask)
+        self.assertEqual(len([cal_key for cal_key in _COUNT_LUTS
+                              if cal_key[0] == 'native_msg']), 3)
+
+    def _set_memmap(self):
+        """Fill the memmap with 10 bits counts of 8 lines of 12 pixels."""
+        nchans = len(CHANNEL_ORDER_LIST) - 1
+        visir = np.arange(8 * nchans * 12).reshape((8, nchans, 12)) % 1024 + 1
+        hrv = np.arange(8 * 3 * 24).reshape((8, 3, 24)) % 1023 + 1
+        self.reader.memmap = np.zeros(
+            8, dtype=[('visir', [('line_data', np.uint8, 15)], nchans),
+                      ('hrv', [('line_data', np.uint8, 30)], 3)])
+        self.reader.memmap['visir']['line_data'] = pack10(visir)
+        self.reader.memmap['hrv']['line_data'] = pack10(hrv)
+        self.reader.data_len = 8
+        self.reader._cols_visir = 15
+        self.reader._cols_hrv = 30
+        # images as stored before, flipped
+        vis_image = visir[::-1, :, ::-1]
+        hrv_image = np.zeros((24, 24))
+        hrv_image[0::3] = hrv[::-1, 2, ::-1]
+        hrv_image[1::3] = hrv[::-1, 1, ::-1]
+        hrv_image[2::3] = hrv[::-1, 0, ::-1]
+        return vis_image, hrv_image
+
+    def test_get_dataset_slices(self):
+        """Test reading slices of the flipped images"""
+        vis_image, hrv_image = self._set_memmap()
+        info = {'units': 'K', 'wavelength': 10.8, 'standard_name': 'bt'}
+        for name, image in [('IR_108', vis_image[:, 8]), ('HRV', hrv_image)]:
+            key = mock.Mock(calibration='counts')
+            key.name = name
+            self.assertEqual(self.reader.get_shape(key, info), image.shape)
+            for yslice, xslice in [(slice(None), slice(None)),
+                                   (slice(1, 7), slice(3, 10)),
+                                   (slice(2, 5), slice(5, 6)),
+                                   (slice(1, 8, 2), slice(0, 12, 3)),
+                                   (slice(None, None, -1), slice(4, 0, -1))]:
+                res = self.reader.get_dataset(key, info, xslice=xslice,
+                                              yslice=yslice)
+                self.assertEqual(res.dtype, np.float32)
+                np.testing.assert_array_equal(res, image[yslice, xslice])
+
+    def test_get_dataset_inplace(self):
+        """Test loading a dataset in place"""
+        from satpy.readers.yaml_reader import Shuttle
+        _, hrv_image = self._set_memmap()
+        info = {'units': 'K', 'wavelength': 0.7, 'standard_name': 'counts'}
+        key = mock.Mock(calibration='counts')
+        key.name = 'HRV'
+        out = Shuttle(np.empty((5, 7), dtype=np.float32),
+                      np.ones((5, 7), dtype=bool), {})
+        self.reader.get_dataset(key, info, out=out, xslice=slice(2, 9),
+                                yslice=slice(10, 15))
+        np.testing.assert_array_equal(out.data, hrv_image[10:15, 2:9])
+        self.assertFalse(out.mask.any())
+        self.assertEqual(out.info['platform_name'], 'Meteosat-10')
+
     def tearDown(self):
         pass
 
@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 PyTroll developers
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Unittesting the SAFE SAR-C reader
+"""
+
+import os
+import sys
+from datetime import datetime
+from tempfile import mkstemp
+
+import numpy as np
+
+if sys.version_info < (2, 7):
+    import unittest2 as unittest
+else:
+    import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+def import_safe_sar_c():
+    """Import the reader module without gdal."""
+    modules = {'osgeo': mock.MagicMock()}
+    with mock.patch.dict('sys.modules', modules):
+        from satpy.readers import safe_sar_c
+    return safe_sar_c
+
+
+CALIBRATION_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<calibration>
+  <calibrationVectorList count="3">
+{vectors}
+  </calibrationVectorList>
+</calibration>
+"""
+
+VECTOR_XML = """    <calibrationVector>
+      <line>{line}</line>
+      <pixel count="{count}">{pixels}</pixel>
+      <gamma count="{count}">{values}</gamma>
+    </calibrationVector>"""
+
+
+def linear(lines, pixels):
+    """Values varying linearly on the image."""
+    return 100. + 0.5 * np.asarray(lines) - 0.25 * np.asarray(pixels)
+
+
+class TestLineInterpolator(unittest.TestCase):
+
+    """Test the interpolation of the annotation vectors."""
+
+    def setUp(self):
+        self.safe_sar_c = import_safe_sar_c()
+
+    def test_linear(self):
+        """Test interpolating values linear on the image."""
+        # the vectors don't have the same pixels
+        lines = [0, 0, 0, 40, 40, 99, 99, 99]
+        pixels = [0, 30, 59, 0, 59, 0, 10, 59]
+        data = linear(lines, pixels)
+        interp = self.safe_sar_c.LineInterpolator(data, (pixels, lines),
+                                                  (100, 60), blocksize=16)
+        expected = linear(*np.mgrid[0:100, 0:60])
+        res = interp()
+        self.assertEqual(res.dtype, np.float32)
+        np.testing.assert_allclose(res, expected, rtol=1e-6)
+
+        out = np.zeros((30, 60), dtype=np.float32)
+        interp(slice(35, 65), out)
+        np.testing.assert_allclose(out, expected[35:65], rtol=1e-6)
+
+    def test_bilinear_and_edges(self):
+        """Test the interpolation between lines and beyond the vectors."""
+        lines = [10, 10, 20, 20]
+        pixels = [2, 6, 2, 6]
+        data = [0., 4., 10., 30.]
+        interp = self.safe_sar_c.LineInterpolator(data, (pixels, lines),
+                                                  (25, 8))
+        res = interp()
+        self.assertAlmostEqual(res[15, 4], (2. + 20.) / 2)
+        np.testing.assert_allclose(res[10], [0, 0, 0, 1, 2, 3, 4, 4])
+        np.testing.assert_allclose(res[:10], res[[10] * 10])
+        np.testing.assert_allclose(res[21:], res[[20] * 4])
+
+    def test_single_line(self):
+        """Test interpolating a single vector."""
+        interp = self.safe_sar_c.LineInterpolator([1., 3.], ([0, 2], [0, 0]),
+                                                  (3, 3))
+        np.testing.assert_allclose(interp(), [[1, 2, 3]] * 3)
+
+
+class TestSAFEXML(unittest.TestCase):
+
+    """Test reading the calibration annotations."""
+
+    def setUp(self):
+        self.safe_sar_c = import_safe_sar_c()
+        pixels = [0, 20, 49]
+        vectors = []
+        for line in [0, 30, 79]:
+            vectors.append(VECTOR_XML.format(
+                line=line, count=len(pixels),
+                pixels=" ".join(str(pixel) for pixel in pixels),
+                values=" ".join(str(np.sqrt(linear(line, pixel)))
+                                for pixel in pixels)))
+        fdes, self.filename = mkstemp(suffix='.xml')
+        with os.fdopen(fdes, 'w') as xml_file:
+            xml_file.write(CALIBRATION_XML.format(vectors="\n".join(vectors)))
+        filename_info = {'start_time': datetime(2018, 1, 1),
+                         'end_time': datetime(2018, 1, 1, 0, 1),
+                         'polarization': 'hh'}
+        self.fh = self.safe_sar_c.SAFEXML(self.filename, filename_info, {})
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_get_calibration(self):
+        """Test interpolating the squared calibration vectors."""
+        res = self.fh.get_calibration('gamma', (80, 50))
+        np.testing.assert_allclose(res, linear(*np.mgrid[0:80, 0:50]),
+                                   rtol=1e-5)
+
+        # the annotations are parsed once
+        with mock.patch.object(self.fh, 'read_xml_array') as rxa:
+            self.fh.get_calibration('gamma', (80, 50))
+            rxa.assert_not_called()
+
+    def test_get_dataset(self):
+        """Test loading the vectors as a dataset."""
+        from satpy.dataset import DatasetID
+        self.fh.hdr = {'product': {'imageAnnotation': {'imageInformation': {
+            'numberOfLines': 80, 'numberOfSamples': 50}}}}
+        key = DatasetID(name='gamma_squared', polarization='hh')
+        info = {'xml_item': 'calibrationVector', 'xml_tag': 'gamma'}
+        res = self.fh.get_dataset(key, info)
+        np.testing.assert_allclose(res, linear(*np.mgrid[0:80, 0:50]),
+                                   rtol=1e-5)
+        key = DatasetID(name='gamma_squared', polarization='hv')
+        self.assertIsNone(self.fh.get_dataset(key, info))
+
+
+class FakeGCP(object):
+
+    """A ground control point, as given by gdal."""
+
+    def __init__(self, line, pixel, lon, lat):
+        self.GCPLine = line
+        self.GCPPixel = pixel
+        self.GCPX = lon
+        self.GCPY = lat
+
+
+def smooth_lonlats(lines, pixels):
+    """Coordinates varying smoothly on the image."""
+    lines, pixels = np.asarray(lines), np.asarray(pixels)
+    return (20. + 0.01 * pixels - 0.002 * lines,
+            60. - 0.005 * lines + 0.0001 * pixels)
+
+
+class TestSAFEGRD(unittest.TestCase):
+
+    """Test reading and calibrating the measurements."""
+
+    def setUp(self):
+        self.safe_sar_c = import_safe_sar_c()
+        self.shape = (300, 90)
+        self.dn = (np.arange(300 * 90).reshape(self.shape) % 1000 + 1)
+        self.dn = self.dn.astype(np.uint16)
+
+        def read_as_array(xoff, yoff, width, height):
+            return self.dn[yoff:yoff + height, xoff:xoff + width]
+        band = mock.MagicMock()
+        band.GetBlockSize.return_value = [90, 16]
+        band.ReadAsArray.side_effect = read_as_array
+
+        gcps = []
+        for line in [0, 100, 200, 299]:
+            for pixel in [0, 30, 60, 89]:
+                lon, lat = smooth_lonlats(line, pixel)
+                gcps.append(FakeGCP(line, pixel, lon, lat))
+        filehandle = mock.MagicMock(RasterYSize=300, RasterXSize=90)
+        filehandle.GetRasterBand.return_value = band
+        filehandle.GetGCPs.return_value = gcps
+
+        lines, pixels = [0, 0, 150, 150, 299, 299], [0, 89] * 3
+        self.noise = linear(lines, pixels)
+        self.gamma = 2 * self.noise
+        calfh = mock.MagicMock()
+        calfh.get_calibration_constant.return_value = 5.
+        calfh.get_interpolator.return_value = self.safe_sar_c.LineInterpolator(
+            self.gamma, (pixels, lines), self.shape)
+        noisefh = mock.MagicMock()
+        noisefh.get_interpolator.return_value = \
+            self.safe_sar_c.LineInterpolator(self.noise, (pixels, lines),
+                                             self.shape)
+        filename_info = {'start_time': datetime(2018, 1, 1),
+                         'end_time': datetime(2018, 1, 1, 0, 1),
+                         'polarization': 'hh'}
+        with mock.patch.object(self.safe_sar_c.SAFEGRD,
+                               'get_gdal_filehandle'):
+            self.fh = self.safe_sar_c.SAFEGRD('measurement.tiff',
+                                              filename_info, {}, calfh,
+                                              noisefh)
+        self.fh.filehandle = filehandle
+
+    def test_calibration(self):
+        """Test calibrating the measurements window by window."""
+        from satpy.dataset import Dataset, DatasetID
+        key = DatasetID(name='measurement', polarization='hh')
+        self.assertEqual(self.fh.get_shape(key, {}), self.shape)
+        grid = np.mgrid[0:300, 0:90]
+        expected = self.dn.astype(np.float64) ** 2
+        expected += 5. - linear(*grid)
+        expected /= 2 * linear(*grid)
+        expected = np.sqrt(np.maximum(expected, 0))
+
+        with mock.patch.object(self.safe_sar_c, 'WINDOW_ROWS', 40):
+            res = self.fh.get_dataset(key, {'name': 'measurement'})
+            self.assertEqual(res.dtype, np.float32)
+            self.assertEqual(res.info['units'], 'sigma')
+            np.testing.assert_allclose(res, expected, rtol=1e-5)
+
+            yslice, xslice = slice(35, 170), slice(10, 80, 2)
+            out = Dataset(np.zeros((135, 35), dtype=np.float32),
+                          mask=np.zeros((135, 35), dtype=bool))
+            self.fh.get_dataset(key, {}, out, xslice, yslice)
+            np.testing.assert_allclose(out, expected[yslice, xslice],
+                                       rtol=1e-5)
+
+        # the windows are aligned on the blocks of the file
+        band = self.fh.filehandle.GetRasterBand.return_value
+        offsets = [args[1] for args, kwargs in band.ReadAsArray.call_args_list]
+        self.assertEqual(offsets, list(range(0, 300, 32)) +
+                         [35, 64, 96, 128, 160])
+
+        key = DatasetID(name='measurement', polarization='hv')
+        self.assertEqual(self.fh.get_shape(key, {}), (0, 90))
+        self.assertIsNone(self.fh.get_dataset(key, {}))
+
+    def test_lonlats(self):
+        """Test interpolating the coordinates of the requested rows."""
+        from satpy.dataset import DatasetID
+        lons, lats = self.fh.get_lonlats()
+        exp_lons, exp_lats = smooth_lonlats(*np.mgrid[0:300, 0:90])
+        np.testing.assert_allclose(lons, exp_lons, atol=1e-4)
+        np.testing.assert_allclose(lats, exp_lats, atol=1e-4)
+
+        key = DatasetID(name='latitude', polarization='hh')
+        yslice, xslice = slice(120, 250), slice(5, 70)
+        with mock.patch.object(self.safe_sar_c, 'WINDOW_ROWS', 50):
+            res = self.fh.get_dataset(key, {'units': 'degree'},
+                                      xslice=xslice, yslice=yslice)
+        self.assertEqual(res.dtype, np.float64)
+        np.testing.assert_allclose(res, lats[yslice, xslice], rtol=1e-6)
+        self.assertEqual(res.info['units'], 'degree')
+
+
+def suite():
+    """The test suite for test_safe_sar_c.
+    """
+    loader = unittest.TestLoader()
+    mysuite = unittest.TestSuite()
+    mysuite.addTest(loader.loadTestsFromTestCase(TestLineInterpolator))
+    mysuite.addTest(loader.loadTestsFromTestCase(TestSAFEXML))
+    mysuite.addTest(loader.loadTestsFromTestCase(TestSAFEGRD))
+    return mysuite
+
+
+if __name__ == "__main__":
+    # So you can run tests from this module individually.
+    unittest.main()
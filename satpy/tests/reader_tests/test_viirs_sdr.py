@@ -41,6 +41,7 @@ class FakeHDF5FileHandler2(FakeHDF5FileHandler):
         prefix1 = 'Data_Products/{file_group}'.format(**filetype_info)
         prefix2 = '{prefix}/{file_group}_Aggr'.format(prefix=prefix1, **filetype_info)
         prefix3 = 'All_Data/{file_group}_All'.format(**filetype_info)
+        prefix4 = '{prefix}/{file_group}_Gran_0'.format(prefix=prefix1, **filetype_info)
         begin_date = start_time.strftime('%Y%m%d')
         begin_time = start_time.strftime('%H%M%S.%fZ')
         ending_date = end_time.strftime('%Y%m%d')
@@ -58,6 +59,8 @@ class FakeHDF5FileHandler2(FakeHDF5FileHandler):
             "{prefix2}/attr/AggregateEndingTime": ending_time,
             "{prefix2}/attr/G-Ring_Longitude": np.array([0.0, 0.1, 0.2, 0.3]),
             "{prefix2}/attr/G-Ring_Latitude": np.array([0.0, 0.1, 0.2, 0.3]),
+            "{prefix4}/attr/G-Ring_Longitude": np.array([10.0, 20.0, 20.0, 10.0]),
+            "{prefix4}/attr/G-Ring_Latitude": np.array([60.0, 60.0, 50.0, 50.0]),
             "{prefix2}/attr/AggregateBeginningOrbitNumber": "{0:d}".format(filename_info['orbit']),
             "{prefix2}/attr/AggregateEndingOrbitNumber": "{0:d}".format(filename_info['orbit']),
             "{prefix1}/attr/Instrument_Short_Name": "VIIRS",
@@ -66,7 +69,7 @@ class FakeHDF5FileHandler2(FakeHDF5FileHandler):
         if geo_prefix:
             file_content['/attr/N_GEO_Ref'] = geo_prefix + filename[5:]
         for k, v in list(file_content.items()):
-            file_content[k.format(prefix1=prefix1, prefix2=prefix2)] = v
+            file_content[k.format(prefix1=prefix1, prefix2=prefix2, prefix4=prefix4)] = v
 
         if filename[:3] in ['SVM', 'SVI', 'SVD']:
             if filename[2:5] in ['M{:02d}'.format(x) for x in range(12)] + ['I01', 'I02', 'I03']:
@@ -177,6 +180,39 @@ class TestVIIRSSDRReader(unittest.TestCase):
         # make sure we have some files
         self.assertTrue(r.file_handlers)
 
+    def test_init_footprint_index(self):
+        """Test skipping files outside of the area with a footprint index."""
+        from satpy.readers import load_reader
+        from satpy.readers.footprints import FootprintIndex
+        from satpy.readers.yaml_reader import FileYAMLReader
+        filename = 'SVI01_npp_d20120225_t1801245_e1802487_b01708_c20120226002130255476_noaa_ops.h5'
+        index = FootprintIndex()
+        r = load_reader(self.reader_configs,
+                        filter_parameters={'area': 'euron1',
+                                           'footprint_index': index})
+        with mock.patch.object(FileYAMLReader, 'footprint_covers_area',
+                               return_value=False) as fca:
+            # the file has to be opened once to get its footprint
+            loadables = r.select_files_from_pathnames([filename])
+            self.assertEqual(len(loadables), 1)
+            r.create_filehandlers(loadables)
+            self.assertFalse(r.file_handlers)
+            lons, lats = index.get(filename)
+            np.testing.assert_allclose(lons, [10.0, 20.0, 20.0, 10.0])
+            np.testing.assert_allclose(lats, [60.0, 60.0, 50.0, 50.0])
+            self.assertEqual(fca.call_args[0][1], 'euron1')
+
+            # then it is skipped without being opened
+            r = load_reader(self.reader_configs,
+                            filter_parameters={'area': 'euron1',
+                                               'footprint_index': index})
+            loadables = r.select_files_from_pathnames([filename])
+            self.assertEqual(list(r.filter_selected_filenames(loadables)), [])
+            fca.reset_mock()
+            r.create_filehandlers(loadables)
+            self.assertFalse(r.file_handlers)
+            self.assertEqual(fca.call_count, 1)
+
     def test_load_all_m_reflectances_no_geo(self):
         """Load all M band reflectances with no geo files provided"""
         from satpy.readers import load_reader
@@ -472,6 +508,38 @@ class TestVIIRSSDRReader(unittest.TestCase):
             self.assertIn('area', d.info)
             self.assertIsNotNone(d.info['area'])
 
+    def test_aggregated_slices(self):
+        """Scale rows of aggregated granules with their own factors"""
+        from satpy.readers import load_reader
+        r = load_reader(self.reader_configs)
+        loadables = r.select_files_from_pathnames([
+            'SVM12_npp_d20120225_t1801245_e1802487_b01708_c20120226002130255476_noaa_ops.h5',
+        ])
+        r.create_filehandlers(loadables)
+        fh = r.file_handlers['svm12'][0]
+        key = 'All_Data/VIIRS-M12-SDR_All/BrightnessTemperature'
+        # two granules of 10 rows, the first one with fill value factors
+        data = np.ones((20, 300), dtype=DEFAULT_FILE_DTYPE)
+        fh.file_content[key] = data
+        fh.file_content[key + '/shape'] = data.shape
+        fh.file_content[key + 'Factors'] = np.array([-999., -999., 3., 1.],
+                                                    dtype=np.float32)
+        dsid = r.get_dataset_key('M12')
+        ds_info = r.ids[dsid].copy()
+
+        res = fh.get_dataset(dsid, ds_info, yslice=slice(12, 18))
+        self.assertEqual(res.shape, (6, 300))
+        np.testing.assert_allclose(res, 4.)
+        self.assertFalse(res.mask.any())
+        # sub-swaths are cut on whole scans
+        self.assertEqual(res.info['rows_per_scan'], 16)
+
+        # a slice crossing the granule boundary
+        res = fh.get_dataset(dsid, r.ids[dsid].copy(), yslice=slice(7, 14))
+        self.assertTrue(res.mask[:3].all())
+        self.assertFalse(res.mask[3:].any())
+        np.testing.assert_allclose(res[3:], 4.)
+
     def test_load_i_no_files(self):
         """Load I01 when only DNB files are provided"""
         from satpy.readers import load_reader
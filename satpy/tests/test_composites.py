@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2018 PyTroll developers
+#
+# This file is part of satpy.
+#
+# satpy is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# satpy is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# satpy.  If not, see <http://www.gnu.org/licenses/>.
+"""Tests for compositors.
+"""
+
+import sys
+
+import numpy as np
+
+if sys.version_info < (2, 7):
+    import unittest2 as unittest
+else:
+    import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+class _FakeImage(object):
+
+    """Identity enhancement of a dataset."""
+
+    def __init__(self, dataset):
+        if dataset.ndim == 2:
+            self.channels = [dataset.copy()]
+        else:
+            self.channels = [band.copy() for band in dataset]
+
+
+class TestDayNightCompositor(unittest.TestCase):
+
+    """Test the DayNightCompositor."""
+
+    def setUp(self):
+        from satpy.dataset import Dataset
+        self.day = Dataset(np.full((3, 2, 2), 1.), sensor='seviri',
+                           name='day', units='%')
+        self.night = Dataset(np.zeros((2, 2)), sensor='seviri', name='night')
+        self.sza = Dataset(np.array([[0., 85.], [90., 100.]]))
+
+    @mock.patch('satpy.composites.get_enhanced_image', _FakeImage)
+    def test_blending(self):
+        """Test blending a 3-channel day and 1-channel night composite."""
+        from satpy.composites import DayNightCompositor
+        comp = DayNightCompositor('dn', standard_name='day_night')
+        res = comp((self.day, self.night, self.sza))
+        self.assertEqual(res.shape, (3, 2, 2))
+        self.assertEqual(res.info['mode'], 'RGB')
+        self.assertEqual(res.info['sensor'], 'seviri')
+        self.assertNotIn('units', res.info)
+        expected = np.array([[1., 1.], [0.5, 0.]])
+        for band in res:
+            np.testing.assert_allclose(band, expected, rtol=1e-6)
+        self.assertFalse(res.mask.any())
+        # float64 inputs are blended in the float32 precision
+        self.assertEqual(res.dtype, np.float32)
+
+    @mock.patch('satpy.composites.get_enhanced_image', _FakeImage)
+    def test_masks(self):
+        """Test that only pixels masked on both sides are masked."""
+        from satpy.composites import DayNightCompositor
+        self.day.mask = np.zeros(self.day.shape, dtype=bool)
+        self.day.mask[:, 0, 0] = True
+        self.day.mask[:, 1, 1] = True
+        self.night.mask = np.array([[True, False], [False, False]])
+        self.sza.mask = np.array([[False, False], [True, False]])
+        comp = DayNightCompositor('dn', standard_name='day_night')
+        res = comp((self.day, self.night, self.sza))
+        expected_mask = np.array([[True, False], [True, False]])
+        for band in res:
+            np.testing.assert_array_equal(band.mask, expected_mask)
+        # masked day pixel is blended as 0
+        self.assertEqual(res[0, 1, 1], 0)
+
+    @mock.patch('satpy.composites.get_enhanced_image', _FakeImage)
+    def test_incompatible_shapes(self):
+        """Test that mismatching shapes raise IncompatibleAreas."""
+        from satpy.composites import DayNightCompositor, IncompatibleAreas
+        from satpy.dataset import Dataset
+        comp = DayNightCompositor('dn', standard_name='day_night')
+        night = Dataset(np.zeros((3, 3)))
+        self.assertRaises(IncompatibleAreas, comp,
+                          (self.day, night, self.sza))
+
+
+def _iterative_saturation(radiance, max_val):
+    """Raise *max_val* like the original IDL code of ERFDNB."""
+    max_val = max_val.copy()
+    valid = ~(np.ma.getmaskarray(radiance) | np.ma.getmaskarray(max_val))
+    radiance = np.ma.getdata(radiance)[valid]
+    while (np.count_nonzero(radiance > np.ma.getdata(max_val)[valid]) /
+           float(valid.size)) > 0.005:
+        max_val *= 1.1
+    return max_val
+
+
+class TestERFDNB(unittest.TestCase):
+
+    """Test the saturation correction of the ERFDNB composite."""
+
+    def setUp(self):
+        self.random = np.random.RandomState(42)
+        self.max_val = np.ma.masked_array(
+            np.linspace(1e-5, 1e-3, 200 * 50).reshape((200, 50)))
+
+    def _check(self, radiance, max_val=None):
+        from satpy.composites.viirs import get_saturation_factor
+        if max_val is None:
+            max_val = self.max_val
+        factor = get_saturation_factor(radiance, max_val)
+        np.testing.assert_allclose(max_val * factor,
+                                   _iterative_saturation(radiance, max_val),
+                                   rtol=1e-12)
+        saturated = np.count_nonzero(np.ma.filled(
+            radiance > max_val * factor, False))
+        self.assertLessEqual(saturated, 0.005 * radiance.size)
+        return factor
+
+    def test_distributions(self):
+        """Test the factor on synthetic radiance distributions."""
+        shape = self.max_val.shape
+        # city lights over dark ground
+        radiance = np.ma.masked_array(self.random.lognormal(-11, 2, shape))
+        self.assertGreater(self._check(radiance), 10)
+        radiance = np.ma.masked_array(self.random.uniform(0, 2e-3, shape))
+        self.assertGreater(self._check(radiance), 1)
+        # fires: a few very bright pixels
+        radiance = np.ma.masked_array(np.full(shape, 1e-6))
+        radiance[::20, ::5] = 1.
+        self._check(radiance)
+        radiance[::20, ::50] = 10.
+        self._check(radiance)
+
+    def test_no_saturation(self):
+        """Test that unsaturated data keeps its maximum."""
+        from satpy.composites.viirs import get_saturation_factor
+        radiance = np.ma.masked_array(self.max_val * 0.5)
+        self.assertEqual(get_saturation_factor(radiance, self.max_val), 1)
+        # 0.5% of the pixels can saturate
+        radiance[:5, :10] = 1.
+        self.assertEqual(get_saturation_factor(radiance, self.max_val), 1)
+        radiance[5, 0] = 1.
+        self.assertGreater(self._check(radiance), 1)
+
+    def test_masked(self):
+        """Test that masked pixels are never saturated."""
+        radiance = np.ma.masked_array(self.random.lognormal(-9, 2,
+                                                            (200, 50)))
+        radiance[::2] = np.ma.masked
+        max_val = self.max_val.copy()
+        max_val[:, 1] = np.ma.masked
+        self._check(radiance, max_val)
+
+    def test_zero_maximum(self):
+        """Test that pixels without maximum can't stop the search."""
+        from satpy.composites.viirs import get_saturation_factor
+        radiance = np.ma.masked_array(self.max_val * 2)
+        max_val = self.max_val.copy()
+        max_val[:, :2] = 0
+        self.assertAlmostEqual(get_saturation_factor(radiance, max_val),
+                               1.1 ** 8)
+
+    def test_composite(self):
+        """Test the composite with the saturation correction."""
+        from satpy.composites.viirs import ERFDNB
+        from satpy.dataset import Dataset
+        shape = (100, 40)
+        dnb = Dataset(self.random.lognormal(-9, 2, shape), mask=False,
+                      units='W m-2 sr-1')
+        sza = Dataset(np.full(shape, 120.), mask=False)
+        lza = Dataset(np.full(shape, 30.), mask=False)
+        moon = Dataset(np.array([50.]))
+        comp = ERFDNB('dynamic_dnb', saturation_correction=True)
+        res = comp((dnb, sza, lza, moon))
+        self.assertEqual(res.info['standard_name'], 'equalized_radiance')
+        self.assertLessEqual(np.count_nonzero(res > 1), 0.005 * dnb.size)
+        self.assertGreater(np.count_nonzero(res > 1), 0)
+
+
+def suite():
+    """The test suite for test_composites.
+    """
+    loader = unittest.TestLoader()
+    mysuite = unittest.TestSuite()
+    mysuite.addTest(loader.loadTestsFromTestCase(TestDayNightCompositor))
+    mysuite.addTest(loader.loadTestsFromTestCase(TestERFDNB))
+
+    return mysuite
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -357,6 +357,73 @@ class TestDataset(unittest.TestCase):
     #     self.assertTrue(np.all(c.mask == d.mask))
     #     self.assertDictEqual(c.info, d.info)
 
+    def test_info_copy_on_write(self):
+        """Check that shared metadata is copied when accessed."""
+        for func in (lambda x: -x, lambda x: x * 2, lambda x: x.copy()):
+            a = dataset.Dataset([7, 3, 1], bla=2, blu='hej')
+            c = func(a)
+            self.assertIs(c._info_holder, a._info_holder)
+            c.info['bla'] = 3
+            self.assertEqual(a.info['bla'], 2)
+            self.assertEqual(c.info['bla'], 3)
+            self.assertIsNot(c.info, a.info)
+        a.info['blu'] = 'hoj'
+        c = a + 1
+        a.info['blu'] = 'hej'
+        self.assertEqual(c.info['blu'], 'hoj')
+
+    def test_info_exposed(self):
+        """Check that metadata already handed out isn't shared."""
+        for func in (lambda x: -x, lambda x: x * 2, lambda x: x.copy()):
+            a = dataset.Dataset([7, 3, 1], name='orig')
+            info = a.info
+            b = func(a)
+            info['name'] = 'changed'
+            self.assertEqual(b.info['name'], 'orig')
+            self.assertEqual(a.info['name'], 'changed')
+
+    def test_view_info(self):
+        """Check that views and ufuncs don't merge metadata."""
+        a = dataset.Dataset(np.arange(8), bla=2, blu='hej')
+        with mock.patch('satpy.dataset.combine_info') as combine_info:
+            c = a[3:5]
+            d = np.ma.log(a + 1)
+        self.assertFalse(combine_info.called)
+        self.assertDictEqual(c.info, {})
+        self.assertDictEqual(d.info, {})
+
+    def test_combine_info_identity(self):
+        """Check that identical metadata aren't compared."""
+        area = mock.MagicMock()
+        area.__eq__.side_effect = AssertionError("areas compared")
+        arr = mock.MagicMock(spec=np.ndarray)
+        arr.__eq__.side_effect = AssertionError("arrays compared")
+        a = dataset.Dataset([7, 3, 1], area=area, arr=arr, bla=2)
+        b = dataset.Dataset([2, 0, 0], area=area, arr=arr, bla=2)
+        self.assertDictEqual(dataset.combine_info(a, b),
+                             {'area': area, 'arr': arr, 'bla': 2})
+
+    def test_combine_info_areas(self):
+        """Check that area equality is cached."""
+        class FakeArea(object):
+            comparisons = 0
+
+            def __eq__(self, other):
+                FakeArea.comparisons += 1
+                return True
+
+        area1, area2 = FakeArea(), FakeArea()
+        a = dataset.Dataset([7, 3, 1], area=area1, bla=2)
+        b = dataset.Dataset([2, 0, 0], area=area2, bla=3)
+        for _ in range(3):
+            self.assertDictEqual((a - b).info, {'area': area1})
+        self.assertEqual(FakeArea.comparisons, 1)
+        key = (id(area1), id(area2))
+        self.assertIn(key, dataset._AREA_EQUALITY)
+        # forgotten when an area is deleted
+        del a, b, area2
+        self.assertNotIn(key, dataset._AREA_EQUALITY)
+
     def test_init(self):
         """
         Test initialization
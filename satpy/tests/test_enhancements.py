@@ -71,12 +71,77 @@ class TestEnhancementStretch(unittest.TestCase):
         pass
 
 
+class TestCompiledEnhancement(unittest.TestCase):
+
+    """Test fusing enhancement chains into lookup tables."""
+
+    def setUp(self):
+        """Setup the test"""
+        from satpy.enhancements import stretch, gamma, invert
+        self.stretch = {'method': stretch,
+                        'kwargs': {'stretch': 'crude', 'min_stretch': 180.,
+                                   'max_stretch': 330.}}
+        self.gamma = {'method': gamma, 'kwargs': {'gamma': 1.6}}
+        self.invert = {'method': invert, 'args': [True]}
+        data = np.linspace(150., 350., 20000).reshape((100, 200))
+        mask = np.zeros(data.shape, dtype=bool)
+        mask[:10] = True
+        self.data = np.ma.array(data, mask=mask)
+
+    def _compare(self, operations, mode='L', atol=1.5 / 255):
+        from trollimage.image import Image
+        from satpy.enhancements import compile_operations
+        compiled = compile_operations(operations, mode)
+        self.assertIsNotNone(compiled)
+        nchan = len(mode)
+        expected = Image([self.data] * nchan, mode=mode)
+        for operation in operations:
+            operation['method'](expected, *operation.get('args', []),
+                                **operation.get('kwargs', {}))
+        img = Image([self.data] * nchan, mode=mode)
+        compiled(img)
+        for res, exp in zip(img.channels, expected.channels):
+            self.assertEqual(res.dtype, np.float32)
+            np.testing.assert_array_equal(res.mask, self.data.mask)
+            # gamma of negative stretched values is undefined
+            valid = np.isfinite(exp.data)
+            np.testing.assert_allclose(res.data[valid],
+                                       np.clip(exp.data[valid], 0, 1),
+                                       atol=atol)
+
+    def test_stretch_gamma_invert(self):
+        """Test compiling a stretch, gamma and invert chain."""
+        self._compare([self.stretch, self.gamma, self.invert])
+        self._compare([self.stretch, self.invert], atol=1e-4)
+
+    def test_reversed_rgb_stretch(self):
+        """Test compiling per channel reversed stretches."""
+        self.stretch['kwargs']['min_stretch'] = [180., 330., 200.]
+        self.stretch['kwargs']['max_stretch'] = [330., 180., 300.]
+        self._compare([self.stretch, self.gamma], mode='RGB')
+
+    def test_not_compilable(self):
+        """Test chains that have to be applied sequentially."""
+        from satpy.enhancements import compile_operations, stretch
+        linear = {'method': stretch, 'kwargs': {'stretch': 'linear'}}
+        self.assertIsNone(compile_operations([linear], 'L'))
+        self.assertIsNone(compile_operations([self.gamma], 'L'))
+        self.assertIsNone(compile_operations([self.stretch], 'LA'))
+        self.assertIsNone(compile_operations([self.stretch, linear], 'L'))
+        # the chain doesn't saturate at the ends of the stretched range
+        half = {'method': stretch,
+                'kwargs': {'stretch': 'crude', 'min_stretch': -1.,
+                           'max_stretch': 2.}}
+        self.assertIsNone(compile_operations([self.stretch, half], 'L'))
+
+
 def suite():
     """The test suite for test_satin_helpers.
     """
     loader = unittest.TestLoader()
     mysuite = unittest.TestSuite()
     mysuite.addTest(loader.loadTestsFromTestCase(TestEnhancementStretch))
+    mysuite.addTest(loader.loadTestsFromTestCase(TestCompiledEnhancement))
 
     return mysuite
 
@@ -319,6 +319,39 @@ class TestHelpers(unittest.TestCase):
         np.testing.assert_allclose(expected,
                                    hf.get_geostationary_angle_extent(geos_area))
 
+    def test_get_geostationary_mask(self):
+        """Get the space pixel mask of geostationary areas."""
+        from pyresample.geometry import AreaDefinition
+        proj_dict = {'proj': 'geos', 'lon_0': 0.0, 'a': 6378169.0,
+                     'b': 6356583.8, 'h': 35785831.0, 'units': 'm'}
+        # full disk, full disk flipped and a northern segment
+        extents = [(-5570248.47, -5567248.07, 5567248.07, 5570248.47),
+                   (5567248.07, 5570248.47, -5570248.47, -5567248.07),
+                   (-5570248.47, 1000000., 5567248.07, 5570248.47)]
+        for extent in extents:
+            area = AreaDefinition('test', 'test', 'test', proj_dict,
+                                  101, 80, extent)
+            xmax, ymax = hf.get_geostationary_angle_extent(area)
+            x__, y__ = area.get_proj_coords()
+            expected = ((x__ / proj_dict['h'] / xmax) ** 2 +
+                        (y__ / proj_dict['h'] / ymax) ** 2) > 1
+
+            mask = hf.get_geostationary_mask(area)
+            np.testing.assert_array_equal(mask, expected)
+            mask = hf.get_geostationary_mask(area, slice(10, 50),
+                                             slice(3, 90, 2))
+            np.testing.assert_array_equal(mask, expected[10:50, 3:90:2])
+
+        # the ranges are computed once per area
+        with mock.patch.object(hf, '_compute_geostationary_disk_ranges') \
+                as compute:
+            area = AreaDefinition('other', 'other', 'other', proj_dict,
+                                  101, 80, extents[0])
+            ranges = hf.get_geostationary_disk_ranges(area)
+            compute.assert_not_called()
+            self.assertEqual(ranges.shape, (80, 2))
+            self.assertTrue((ranges[0] == ranges[0, 0]).all())
+
     @mock.patch('satpy.readers.helper_functions.AreaDefinition')
     def test_sub_area(self, adef):
         """Sub area slicing."""
@@ -337,11 +370,110 @@ class TestHelpers(unittest.TestCase):
                                      3, 3,
                                      (0.75, -3.75, 5.25, 0.75))
 
+    def test_area_rows(self):
+        """Test getting the area of rows of stacked segments."""
+        from pyresample.geometry import AreaDefinition, StackedAreaDefinition
+        segments = [AreaDefinition('seg', 'seg', 'seg', {'proj': 'eqc'},
+                                   3, 2, (0, 8 - 2 * num, 3, 10 - 2 * num))
+                    for num in range(1, 5)]
+        area = StackedAreaDefinition(*segments[:2])
+        self.assertEqual(tuple(area.squeeze().area_extent), (0, 4, 3, 8))
+        # the last segment is stacked apart, as if the third were missing
+        area.defs.append(segments[3])
+
+        res = hf.get_area_rows(area, slice(1, 3))
+        self.assertEqual(res.y_size, 2)
+        self.assertEqual(tuple(res.area_extent), (0, 5, 3, 7))
+        res = hf.get_area_rows(area, slice(4, 6))
+        self.assertEqual(tuple(res.area_extent), (0, 0, 3, 2))
+        res = hf.get_area_rows(segments[0], slice(0, 1))
+        self.assertEqual(tuple(res.area_extent), (0, 7, 3, 8))
+
+    def test_swath_slices(self):
+        """Test the slicing of swaths over an area."""
+        from pyresample.geometry import AreaDefinition, SwathDefinition
+        lats, lons = np.meshgrid(np.linspace(80, -80, 200),
+                                 np.linspace(-20, 20, 40), indexing='ij')
+        swath = SwathDefinition(lons, lats)
+        deg = 6378137. * np.pi / 180
+        area = AreaDefinition('test', 'test', 'test',
+                              {'proj': 'eqc', 'a': 6378137.}, 10, 10,
+                              (-5 * deg, 0, 5 * deg, 10 * deg))
+
+        # only line 96 of the subsampled lines is inside
+        xslice, yslice = hf.get_swath_slices(swath, area)
+        self.assertEqual(xslice, slice(0, 40))
+        self.assertEqual(yslice, slice(80, 113))
+        xslice, yslice = hf.get_swath_slices(swath, area, rows_per_scan=16)
+        self.assertEqual(yslice, slice(80, 128))
+        xslice, yslice = hf.get_swath_slices(swath, area, stride=4,
+                                             columns=True)
+        self.assertEqual(xslice, slice(12, 29))
+        self.assertEqual(yslice, slice(84, 101))
+
+        swath.name = 'test_swath'
+        sub_swath = hf.get_sub_swath(swath, xslice, yslice)
+        self.assertEqual(sub_swath.shape, (17, 17))
+        self.assertEqual(sub_swath.name, 'test_swath_84-101_12-29')
+        np.testing.assert_array_equal(sub_swath.lats, lats[84:101, 12:29])
+
+        area = AreaDefinition('test', 'test', 'test',
+                              {'proj': 'eqc', 'a': 6378137.}, 10, 10,
+                              (50 * deg, 0, 60 * deg, 10 * deg))
+        self.assertRaises(ValueError, hf.get_swath_slices, swath, area)
+
     def test_np2str(self):
         """Test the np2str function."""
         npstring = np.string_('hej')
         self.assertEquals(hf.np2str(npstring), 'hej')
 
+    def test_calibrate_counts(self):
+        """Test the lookup table calibration of counts."""
+        from satpy.dataset import Dataset
+
+        def calibrate(data):
+            data.data[:] = np.sqrt(data.data) * 2
+            data.mask[data.data > 7] = True
+            data.info['units'] = 'K'
+
+        calibrate = mock.Mock(side_effect=calibrate)
+        key = ('test_calibrate_counts', 1.5)
+        counts = np.array([[0, 1, 4], [9, 16, 4]], dtype=np.float32)
+        expected = np.sqrt(counts) * 2
+        for _ in range(2):
+            data = Dataset(counts.copy(), mask=counts == 0)
+            hf.calibrate_counts(data, calibrate, key)
+            np.testing.assert_allclose(data.data, expected)
+            np.testing.assert_array_equal(data.mask, (counts == 0) |
+                                          (expected > 7))
+            self.assertEqual(data.info['units'], 'K')
+        # the table is computed once on all the counts
+        self.assertEqual(calibrate.call_count, 1)
+        self.assertEqual(calibrate.call_args[0][0].shape, (2 ** 16, ))
+        self.assertIn(key, hf._COUNT_LUTS)
+
+        # in-place loading
+        from satpy.readers.yaml_reader import Shuttle
+        data = Shuttle(counts.copy(), counts == 0, {})
+        hf.calibrate_counts(data, calibrate, key)
+        np.testing.assert_allclose(data.data, expected)
+        np.testing.assert_array_equal(data.mask, (counts == 0) |
+                                      (expected > 7))
+        self.assertEqual(calibrate.call_count, 1)
+
+        # non integer counts are calibrated pixelwise
+        data = Dataset(counts + 0.5, mask=np.zeros(counts.shape, dtype=bool))
+        hf.calibrate_counts(data, calibrate, key)
+        self.assertEqual(calibrate.call_count, 2)
+        self.assertIs(calibrate.call_args[0][0], data)
+        np.testing.assert_allclose(data.data, np.sqrt(counts + 0.5) * 2)
+
+        # so are counts out of the table
+        data = Dataset(counts * 10000, mask=np.zeros(counts.shape, dtype=bool))
+        hf.calibrate_counts(data, calibrate, key)
+        self.assertEqual(calibrate.call_count, 3)
+        hf._COUNT_LUTS.pop(key)
+
 
 def suite():
     """The test suite for test_satin_helpers.
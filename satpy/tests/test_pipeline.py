@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 PyTroll developers
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Unit tests for pipeline.py.
+"""
+
+import os
+import sys
+
+if sys.version_info < (2, 7):
+    import unittest2 as unittest
+else:
+    import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+# clear the config dir environment variable so it doesn't interfere
+os.environ.pop("PPP_CONFIG_DIR", None)
+
+
+class TestPipeline(unittest.TestCase):
+
+    """Test running a pipeline on several time slots."""
+
+    @staticmethod
+    def _fake_readers(cri):
+        from satpy.tests.utils import create_fake_reader
+        reader = create_fake_reader('fake_reader', 'fake_sensor')
+        reader.select_files_from_pathnames.side_effect = list
+
+        def _create_reader_instances(filenames=None, **kwargs):
+            if filenames:
+                return {'fake_reader': reader}
+            return {}
+        cri.side_effect = _create_reader_instances
+        return reader
+
+    @mock.patch('satpy.composites.CompositorLoader.load_compositors')
+    @mock.patch('satpy.scene.Scene.create_reader_instances')
+    def test_slots(self, cri, cl):
+        """Test that the setup is done for the first slot only."""
+        from satpy.node import DependencyTree
+        from satpy.pipeline import Pipeline
+        from satpy.scene import Scene
+        from satpy.tests.utils import test_composites
+        reader = self._fake_readers(cri)
+        cl.return_value = test_composites('fake_sensor')
+
+        pipeline = Pipeline('fake_reader', ['comp1', 'ds2'],
+                            writer='fake_writer',
+                            writer_kwargs={'base_dir': 'bla'})
+        find_dependencies = DependencyTree.find_dependencies
+        with mock.patch.object(Scene, 'get_writer') as get_writer, \
+                mock.patch.object(DependencyTree, 'find_dependencies',
+                                  autospec=True) as fds:
+            fds.side_effect = find_dependencies
+            for slot in range(3):
+                scenes = pipeline(['file{}'.format(slot)])
+                self.assertEqual(len(scenes), 1)
+                self.assertSetEqual(set(ds.id.name for ds in scenes[0]),
+                                    set(['comp1', 'ds2']))
+            # the first slot's files are given to the mocked readers
+            self.assertEqual(reader.create_filehandlers.call_args_list,
+                             [mock.call(['file1']), mock.call(['file2'])])
+
+        self.assertEqual(fds.call_count, 1)
+        get_writer.assert_called_once_with('fake_writer', base_dir='bla')
+        self.assertEqual(get_writer.return_value.save_datasets.call_count, 3)
+        sensor_calls = [args for args, kwargs in cl.call_args_list
+                        if args[0]]
+        self.assertEqual(len(sensor_calls), 1)
+
+    @mock.patch('satpy.composites.CompositorLoader.load_compositors')
+    @mock.patch('satpy.scene.Scene.create_reader_instances')
+    def test_areas(self, cri, cl):
+        """Test resampling the products to several areas."""
+        from satpy import Dataset
+        from satpy.pipeline import Pipeline
+        from satpy.tests.utils import test_composites
+        self._fake_readers(cri)
+        cl.return_value = test_composites('fake_sensor')
+
+        areas = [mock.MagicMock(), mock.MagicMock()]
+        pipeline = Pipeline('fake_reader', ['comp1'], areas=areas,
+                            resample_kwargs={'radius_of_influence': 1000})
+        with mock.patch.object(Dataset, 'resample', autospec=True) as res:
+            def _resample(dataset, area, **kwargs):
+                info = dataset.info.copy()
+                info['area'] = area
+                return Dataset(dataset.data.copy(), **info)
+            res.side_effect = _resample
+            for slot in range(2):
+                scenes = pipeline(['file{}'.format(slot)])
+                self.assertEqual([scn['comp1'].info['area'] for scn in scenes],
+                                 areas)
+        self.assertEqual(res.call_count, 4)
+        self.assertEqual(res.call_args[1], {'radius_of_influence': 1000})
+
+    @mock.patch('satpy.composites.CompositorLoader.load_compositors')
+    @mock.patch('satpy.scene.Scene.create_reader_instances')
+    def test_precompute(self, cri, cl):
+        """Test that the kd-trees are precomputed for all the areas."""
+        import numpy as np
+        from pyresample.geometry import SwathDefinition
+        from satpy.pipeline import Pipeline
+        from satpy.resample import KDTreeResampler
+        from satpy.tests.utils import test_composites
+        self._fake_readers(cri)
+        cl.return_value = test_composites('fake_sensor')
+
+        swath = SwathDefinition(np.zeros((5, 5)), np.zeros((5, 5)))
+        areas = [mock.MagicMock(), mock.MagicMock()]
+        pipeline = Pipeline('fake_reader', ['ds2'], areas=areas,
+                            resample_kwargs={'radius_of_influence': 1000})
+        scn = pipeline.create_scene(['file0'])
+        scn.read()
+        scn.compute()
+        scn['ds2'].info['area'] = swath
+        scn['ds2'].mask = np.ma.make_mask_none(scn['ds2'].shape)
+        with mock.patch.object(KDTreeResampler,
+                               'precompute_targets') as precompute:
+            pipeline.precompute(scn)
+            self.assertEqual(precompute.call_count, 1)
+            args, kwargs = precompute.call_args
+            self.assertEqual(args, (swath, areas))
+            self.assertEqual(sorted(kwargs), ['mask', 'radius_of_influence'])
+            self.assertEqual(kwargs['radius_of_influence'], 1000)
+            np.testing.assert_array_equal(kwargs['mask'], scn['ds2'].mask)
+
+            pipeline.resample_kwargs['resampler'] = 'ewa'
+            pipeline.precompute(scn)
+            self.assertEqual(precompute.call_count, 1)
+
+    @mock.patch('satpy.composites.CompositorLoader.load_compositors')
+    @mock.patch('satpy.scene.Scene.create_reader_instances')
+    def test_unknown_products(self, cri, cl):
+        """Test that unknown products are rejected on the first slot."""
+        from satpy.pipeline import Pipeline
+        from satpy.tests.utils import test_composites
+        self._fake_readers(cri)
+        cl.return_value = test_composites('fake_sensor')
+        pipeline = Pipeline('fake_reader', ['comp1', 'nope'])
+        self.assertRaises(KeyError, pipeline, ['file0'])
+
+
+def suite():
+    """The test suite for test_pipeline.
+    """
+    loader = unittest.TestLoader()
+    mysuite = unittest.TestSuite()
+    mysuite.addTest(loader.loadTestsFromTestCase(TestPipeline))
+
+    return mysuite
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -83,11 +83,589 @@ class TestCache(unittest.TestCase):
                     self.assertEqual(list(resampler.caches.keys()), ['a', 'c', 'd'])
 
 
+class TestPrecision(unittest.TestCase):
+    """Test the precision of the resampled data."""
+
+    def test_resample_precision(self):
+        """Test that float data is resampled in the configured precision."""
+        import numpy as np
+        import satpy.resample
+        resampler = satpy.resample.BaseResampler(mock.MagicMock(),
+                                                 mock.MagicMock())
+        data = np.ma.masked_array(np.arange(4.).reshape((2, 2)),
+                                  mask=[[True, False], [False, False]])
+        with mock.patch.object(resampler, 'precompute'), \
+                mock.patch.object(resampler, 'compute',
+                                  return_value=data):
+            res = resampler.resample(data)
+            self.assertEqual(res.dtype, np.float32)
+            np.testing.assert_array_equal(res.mask, data.mask)
+
+            with mock.patch('satpy.config.PRECISION', 'float64'):
+                res = resampler.resample(data)
+                self.assertIs(res, data)
+
+            resampler.compute.return_value = data.astype(np.uint8)
+            res = resampler.resample(data)
+            self.assertEqual(res.dtype, np.uint8)
+
+    def test_check_precision(self):
+        """Test that only floating point precisions are accepted."""
+        from satpy.config import check_precision
+        self.assertEqual(check_precision('float64'), 'float64')
+        self.assertRaises(ValueError, check_precision, 'int16')
+        self.assertRaises(ValueError, check_precision, 'complex64')
+        self.assertRaises(ValueError, check_precision, 'single-ish')
+
+
+class TestGridResampler(unittest.TestCase):
+    """Test resampling gridded data without kd-tree."""
+
+    def setUp(self):
+        from pyresample.geometry import AreaDefinition
+        self.proj_dict = {'proj': 'stere', 'lat_0': 60., 'lon_0': 10.,
+                          'ellps': 'WGS84', 'units': 'm'}
+        # 10 km pixels
+        self.source = AreaDefinition('src', 'src', 'src', self.proj_dict,
+                                     40, 30, (-200000., -150000.,
+                                              200000., 150000.))
+
+    @staticmethod
+    def _linear(x__, y__):
+        return 3. + 2e-4 * x__ - 5e-5 * y__
+
+    def _source_data(self):
+        x__, y__ = self.source.get_proj_coords()
+        return self._linear(x__, y__)
+
+    def test_same_projection(self):
+        """Test sampling the source grid at its own pixel centers."""
+        import numpy as np
+        from pyresample.geometry import AreaDefinition
+        import satpy.resample
+        target = AreaDefinition('dst', 'dst', 'dst', self.proj_dict,
+                                10, 8, (-50000., -40000., 50000., 40000.))
+        data = np.ma.masked_array(self._source_data(), mask=False)
+        data[12, 17] = np.ma.masked
+        resampler = satpy.resample.GridResampler(self.source, target)
+        with mock.patch('satpy.resample.GRID_BLOCK_ROWS', 3):
+            res = resampler.resample(data)
+            np.testing.assert_allclose(res, data[11:19, 15:25])
+            self.assertTrue(res.mask[1, 2])
+            self.assertEqual(res.mask.sum(), 1)
+
+            res = resampler.resample(data, mode='bilinear')
+            np.testing.assert_allclose(res, data[11:19, 15:25], rtol=1e-6)
+            np.testing.assert_array_equal(res.mask, data.mask[11:19, 15:25])
+
+    def test_bilinear_reprojection(self):
+        """Test reprojecting to another projection."""
+        import numpy as np
+        from pyproj import Proj
+        from pyresample.geometry import AreaDefinition
+        import satpy.resample
+        # larger than the source, to have pixels outside
+        target = AreaDefinition('dst', 'dst', 'dst',
+                                {'proj': 'latlong', 'ellps': 'WGS84'},
+                                30, 20, (2., 57., 18., 63.))
+        resampler = satpy.resample.GridResampler(self.source, target)
+        with mock.patch('satpy.resample.GRID_BLOCK_ROWS', 7):
+            res = resampler.resample(self._source_data(), mode='bilinear')
+
+        lons, lats = target.get_lonlats()
+        x__, y__ = Proj(self.proj_dict)(lons, lats)
+        ll_x, ll_y, ur_x, ur_y = self.source.area_extent
+        inside = ((x__ > ll_x + 5000) & (x__ < ur_x - 5000) &
+                  (y__ > ll_y + 5000) & (y__ < ur_y - 5000))
+        outside = ((x__ < ll_x) | (x__ > ur_x) |
+                   (y__ < ll_y) | (y__ > ur_y))
+        self.assertTrue(inside.any() and outside.any())
+        np.testing.assert_allclose(res[inside],
+                                   self._linear(x__, y__)[inside], rtol=1e-5)
+        self.assertTrue(res.mask[outside].all())
+        self.assertFalse(res.mask[inside].any())
+
+        # nearest neighbour gives the source pixel values
+        res = resampler.resample(self._source_data(), fill_value=-1)
+        self.assertNotIsInstance(res, np.ma.MaskedArray)
+        self.assertTrue(np.isin(res[inside], self._source_data()).all())
+        self.assertTrue((res[outside] == -1).all())
+
+    def test_multiple_bands(self):
+        """Test resampling a 3d array."""
+        import numpy as np
+        import satpy.resample
+        data = np.dstack((self._source_data(), 2 * self._source_data()))
+        mask = np.zeros(data.shape, dtype=bool)
+        mask[5, 5, 1] = True
+        data = np.ma.masked_array(data, mask=mask)
+        resampler = satpy.resample.GridResampler(self.source, self.source)
+        res = resampler.resample(data, mode='bilinear')
+        self.assertEqual(res.shape, (30, 40, 2))
+        np.testing.assert_allclose(res, data, rtol=1e-6)
+        self.assertTrue(res.mask[5, 5, 1])
+        self.assertFalse(res.mask[5, 5, 0])
+
+    def test_swath_fallback(self):
+        """Test that swaths are resampled with the kd-tree resampler."""
+        import satpy.resample
+        from pyresample.geometry import SwathDefinition
+        self.assertIs(satpy.resample.RESAMPLERS['grid'],
+                      satpy.resample.GridResampler)
+        source = mock.MagicMock(spec=SwathDefinition)
+        resampler = satpy.resample.GridResampler(source, self.source)
+        self.assertIsInstance(resampler.fallback,
+                              satpy.resample.KDTreeResampler)
+        with mock.patch.object(resampler.fallback, 'precompute') as pre, \
+                mock.patch.object(resampler.fallback, 'compute') as comp:
+            resampler.resample('data', radius_of_influence=5000)
+            pre.assert_called_once_with(cache_dir=False,
+                                        radius_of_influence=5000)
+            comp.assert_called_once_with('data', fill_value=None,
+                                         cache_id=pre.return_value,
+                                         radius_of_influence=5000)
+
+
+class TestNativeResampler(unittest.TestCase):
+    """Test resampling between aligned grids."""
+
+    def setUp(self):
+        from pyresample.geometry import AreaDefinition
+        self.proj_dict = {'proj': 'geos', 'lon_0': 0., 'h': 35785831.,
+                          'a': 6378169., 'b': 6356583.8, 'units': 'm'}
+        # 3 km pixels
+        self.source = AreaDefinition('src', 'src', 'src', self.proj_dict,
+                                     8, 6, (-12000., -9000., 12000., 9000.))
+
+    def _area(self, width, height, area_extent, proj_dict=None):
+        from pyresample.geometry import AreaDefinition
+        return AreaDefinition('dst', 'dst', 'dst',
+                              proj_dict or self.proj_dict,
+                              width, height, area_extent)
+
+    def test_replicate(self):
+        """Test resampling to a finer grid."""
+        import numpy as np
+        import satpy.resample
+        data = np.ma.masked_array(np.arange(48.).reshape((6, 8)), mask=False)
+        data[0, 0] = np.ma.masked
+        # 1 km pixels, starting in the middle of source pixels and going
+        # past the bottom of the source
+        target = self._area(6, 9, (-8000., -11000., -2000., -2000.))
+        resampler = satpy.resample.NativeResampler(self.source, target)
+        self.assertEqual(resampler.plan, ((11, 3, 1), (4, 3, 1)))
+        res = resampler.resample(data)
+        self.assertEqual(res.shape, (9, 6))
+        expected = np.repeat(np.repeat(data.data, 3, axis=0), 3, axis=1)
+        np.testing.assert_array_equal(res[:7], expected[11:18, 4:10])
+        self.assertTrue(res.mask[7:].all())
+        self.assertFalse(res.mask[:7].any())
+
+        # the input isn't shared with the result
+        target = self._area(8, 6, self.source.area_extent)
+        res = satpy.resample.NativeResampler(self.source, target).compute(data)
+        res[1, 1] = -1
+        self.assertEqual(data[1, 1], 9)
+
+    def test_aggregate(self):
+        """Test averaging to a coarser grid."""
+        import numpy as np
+        import satpy.resample
+        data = np.ma.masked_array(np.arange(48.).reshape((6, 8)), mask=False)
+        data[0, 0] = np.ma.masked
+        data = np.ma.dstack((data, 2 * data))
+        # 6 km pixels
+        target = self._area(4, 3, self.source.area_extent)
+        resampler = satpy.resample.NativeResampler(self.source, target)
+        res = resampler.resample(data)
+        self.assertEqual(res.shape, (3, 4, 2))
+        expected = data.data.reshape((3, 2, 4, 2, 2)).mean(axis=(1, 3))
+        expected[0, 0] = [(1 + 8 + 9) / 3., (2 + 16 + 18) / 3.]
+        np.testing.assert_allclose(res, expected)
+        self.assertFalse(res.mask.any())
+
+        # only masked pixels
+        data = np.ma.masked_array(np.ones((6, 8)), mask=False)
+        data[:2, :2] = np.ma.masked
+        res = resampler.resample(data, fill_value=-1)
+        self.assertEqual(res[0, 0], -1)
+        self.assertTrue((res.ravel()[1:] == 1).all())
+
+    def test_fallback(self):
+        """Test that other areas are resampled by the grid resampler."""
+        import satpy.resample
+        self.assertIs(satpy.resample.RESAMPLERS['native'],
+                      satpy.resample.NativeResampler)
+        for target in (self._area(4, 3, (-12000., -9000., 13000., 9000.)),
+                       self._area(8, 6, (-11000., -9000., 13000., 9000.)),
+                       self._area(8, 6, self.source.area_extent,
+                                  {'proj': 'geos', 'lon_0': 140.7,
+                                   'h': 35785831., 'a': 6378169.,
+                                   'b': 6356583.8, 'units': 'm'})):
+            resampler = satpy.resample.NativeResampler(self.source, target)
+            self.assertIsNone(resampler.plan)
+            self.assertIsInstance(resampler.fallback,
+                                  satpy.resample.GridResampler)
+
+
+class TestMultiTargetKDTree(unittest.TestCase):
+    """Test precomputing the kd-tree parameters for several areas."""
+
+    def setUp(self):
+        import numpy as np
+        from pyresample.geometry import AreaDefinition, SwathDefinition
+        lons, lats = np.meshgrid(np.linspace(5., 25., 60),
+                                 np.linspace(65., 55., 50))
+        lons += np.linspace(0, 2, 50)[:, np.newaxis]
+        self.source = SwathDefinition(lons, lats)
+        proj_dict = {'proj': 'stere', 'lat_0': 60., 'lon_0': 15.,
+                     'ellps': 'WGS84', 'units': 'm'}
+        self.targets = [
+            AreaDefinition('a1', 'a1', 'a1', proj_dict, 30, 20,
+                           (-300000., -200000., 0., 0.)),
+            AreaDefinition('a2', 'a2', 'a2', proj_dict, 25, 25,
+                           (0., 0., 250000., 250000.)),
+            # outside the swath
+            AreaDefinition('a3', 'a3', 'a3', proj_dict, 10, 10,
+                           (2000000., 2000000., 2100000., 2100000.))]
+
+    def tearDown(self):
+        import satpy.resample
+        satpy.resample.BaseResampler.caches.clear()
+
+    def test_multi_neighbour_info(self):
+        """Test that the results match the single target ones."""
+        import numpy as np
+        from pyresample import kd_tree
+        import satpy.resample
+        with mock.patch.object(kd_tree, '_create_resample_kdtree',
+                               wraps=kd_tree._create_resample_kdtree) as ckd:
+            infos = satpy.resample.get_multi_neighbour_info(
+                self.source, self.targets, 20000, segments=2)
+            self.assertEqual(ckd.call_count, 1)
+        data = np.arange(3000.).reshape((50, 60))
+        for target, info in zip(self.targets, infos):
+            expected = kd_tree.get_neighbour_info(self.source, target, 20000,
+                                                  neighbours=1)
+            res = [kd_tree.get_sample_from_neighbour_info(
+                'nn', target.shape, data, *neighbour_info, fill_value=None)
+                for neighbour_info in (info, expected)]
+            np.testing.assert_array_equal(res[0].mask, res[1].mask)
+            np.testing.assert_array_equal(res[0], res[1])
+        self.assertTrue(res[0].mask.all())
+
+    def test_multi_neighbour_info_fallback(self):
+        """Test querying the targets one by one without pyresample's internals."""
+        import numpy as np
+        from pyresample import kd_tree
+        import satpy.resample
+        # a pyresample without the private kd-tree functions
+        old_kd_tree = mock.MagicMock(spec=['EmptyResult',
+                                           'get_neighbour_info'])
+        with mock.patch('pyresample.kd_tree', old_kd_tree), \
+                mock.patch('satpy.resample.get_neighbour_info',
+                           wraps=kd_tree.get_neighbour_info) as gni:
+            infos = satpy.resample.get_multi_neighbour_info(
+                self.source, self.targets, 20000, segments=2)
+            self.assertEqual(gni.call_count, 3)
+        for target, info in zip(self.targets, infos):
+            expected = kd_tree.get_neighbour_info(self.source, target, 20000,
+                                                  neighbours=1, segments=2)
+            self.assertEqual(len(info), 4)
+            for arr, exp in zip(info, expected):
+                np.testing.assert_array_equal(arr, exp)
+
+    def test_precompute_targets(self):
+        """Test that the precomputed parameters are used when resampling."""
+        import numpy as np
+        import satpy.resample
+        data = np.ma.masked_array(np.arange(3000.).reshape((50, 60)),
+                                  mask=False)
+        data[10:20, 10:20] = np.ma.masked
+        expected = [satpy.resample.resample(self.source, data, target,
+                                            radius_of_influence=20000)
+                    for target in self.targets]
+        satpy.resample.BaseResampler.caches.clear()
+
+        kd_class = satpy.resample.KDTreeResampler
+        caches = kd_class.precompute_targets(self.source, self.targets,
+                                             mask=data.mask,
+                                             radius_of_influence=20000)
+        self.assertEqual(len(caches), 3)
+        with mock.patch('satpy.resample.get_neighbour_info') as gni, \
+                mock.patch('satpy.resample.get_multi_neighbour_info') as gmni:
+            for target, exp in zip(self.targets, expected):
+                res = satpy.resample.resample(self.source, data, target,
+                                              radius_of_influence=20000)
+                np.testing.assert_array_equal(res, exp)
+                np.testing.assert_array_equal(res.mask, exp.mask)
+            res = kd_class.precompute_targets(self.source, self.targets,
+                                              mask=data.mask,
+                                              radius_of_influence=20000)
+            self.assertEqual([id(cache) for cache in res],
+                             [id(cache) for cache in caches])
+            gni.assert_not_called()
+            gmni.assert_not_called()
+
+
+class TestBilinearResampler(unittest.TestCase):
+    """Test the bilinear resampling with a sparse weight matrix."""
+
+    def setUp(self):
+        import numpy as np
+        from pyresample.geometry import AreaDefinition, SwathDefinition
+        lons, lats = np.meshgrid(np.linspace(10., 20., 40),
+                                 np.linspace(64., 56., 30))
+        lons += np.linspace(0, 1, 30)[:, np.newaxis]
+        self.source = SwathDefinition(lons, lats)
+        self.target = AreaDefinition(
+            'dst', 'dst', 'dst', {'proj': 'stere', 'lat_0': 60.,
+                                  'lon_0': 15., 'ellps': 'WGS84',
+                                  'units': 'm'},
+            20, 16, (-200000., -160000., 200000., 160000.))
+        self.data = np.sin(lons / 3.) + np.cos(lats / 2.)
+
+    def tearDown(self):
+        import satpy.resample
+        satpy.resample.BaseResampler.caches.clear()
+
+    def test_weights(self):
+        """Test that the weights give the pyresample results."""
+        import numpy as np
+        from pyresample.bilinear import get_bil_info, get_sample_from_bil_info
+        import satpy.resample
+        resampler = satpy.resample.BilinearResampler(self.source, self.target)
+        res = resampler.resample(self.data, radius_of_influence=50000)
+        bil_info = get_bil_info(self.source, self.target, 50000,
+                                neighbours=32, masked=False)
+        expected = get_sample_from_bil_info(self.data.ravel(), *bil_info,
+                                            output_shape=self.target.shape)
+        np.testing.assert_array_equal(res.mask, np.isnan(expected))
+        np.testing.assert_allclose(res.compressed(),
+                                   expected[~np.isnan(expected)], rtol=1e-6)
+        self.assertEqual(resampler.cache['weight_data'].dtype, np.float32)
+
+        # all the bands at once
+        data = np.dstack((self.data, 2 * self.data))
+        res3d = resampler.resample(data, radius_of_influence=50000)
+        self.assertEqual(res3d.shape, (16, 20, 2))
+        np.testing.assert_allclose(res3d[:, :, 0], res, rtol=1e-6)
+        np.testing.assert_allclose(res3d[:, :, 1], 2 * res, rtol=1e-6)
+
+    def test_cache_dir(self):
+        """Test caching the weights as memory-mappable arrays."""
+        import os
+        import shutil
+        from tempfile import mkdtemp
+        import numpy as np
+        import satpy.resample
+        cache_dir = mkdtemp()
+        try:
+            resampler = satpy.resample.BilinearResampler(self.source,
+                                                         self.target)
+            expected = resampler.resample(self.data, cache_dir=cache_dir,
+                                          radius_of_influence=50000)
+            cache_name, = os.listdir(cache_dir)
+            self.assertTrue(cache_name.endswith('.npyd'))
+            self.assertEqual(
+                sorted(os.listdir(os.path.join(cache_dir, cache_name))),
+                ['weight_data.npy', 'weight_indices.npy',
+                 'weight_indptr.npy', 'weight_sum.npy'])
+
+            satpy.resample.BaseResampler.caches.clear()
+            resampler = satpy.resample.BilinearResampler(self.source,
+                                                         self.target)
+            with mock.patch('satpy.resample.get_bil_info') as gbi:
+                res = resampler.resample(self.data, cache_dir=cache_dir,
+                                         radius_of_influence=50000)
+                gbi.assert_not_called()
+            self.assertIsInstance(resampler.cache['weight_data'], np.memmap)
+            np.testing.assert_array_equal(res.mask, expected.mask)
+            np.testing.assert_array_equal(res, expected)
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_masked_data(self):
+        """Test that masked pixels are left out of the interpolation."""
+        import numpy as np
+        import satpy.resample
+        resampler = satpy.resample.BilinearResampler(self.source, self.target)
+        resampler.resample(self.data, mask_area=False,
+                           radius_of_influence=50000)
+
+        data = np.ma.masked_array(np.ones((30, 40)), mask=False)
+        data[:, 20:] = np.ma.masked
+        data.data[:, 20:] = 100
+        data = np.ma.dstack((data, data))
+        data.mask[:, :, 1] = False
+        res = resampler.compute(data)
+        self.assertTrue(res[:, :, 0].mask.any())
+        # unmasked pixels only get the value of valid pixels
+        np.testing.assert_allclose(res[:, :, 0].compressed(), 1)
+        self.assertFalse(res[~res.mask[:, :, 1], 1].mask.any())
+        self.assertTrue((res[:, :, 1].max() > 1))
+
+
+class TestEWAResampler(unittest.TestCase):
+    """Test the EWA resampling of swaths."""
+
+    def setUp(self):
+        import numpy as np
+        from pyresample.geometry import AreaDefinition, SwathDefinition
+        lines, pixels = np.mgrid[0:160, 0:100]
+        # scans of 16 lines with some overlap
+        lons = 5. + 0.2 * pixels + 0.01 * lines + 0.05 * (lines % 16)
+        lats = 66. - 0.08 * lines + 0.004 * pixels
+        self.source = SwathDefinition(lons, lats)
+        self.target = AreaDefinition(
+            'dst', 'dst', 'dst', {'proj': 'stere', 'lat_0': 60.,
+                                  'lon_0': 15., 'ellps': 'WGS84',
+                                  'units': 'm'},
+            150, 120, (-600000., -600000., 600000., 600000.))
+        rand = np.random.RandomState(0)
+        self.data = np.ma.masked_array(rand.rand(160, 100), mask=False)
+        self.data[40:50, 30:60] = np.ma.masked
+
+    def tearDown(self):
+        import satpy.resample
+        satpy.resample.BaseResampler.caches.clear()
+
+    def _resample(self, data, **kwargs):
+        import satpy.resample
+        satpy.resample.BaseResampler.caches.clear()
+        resampler = satpy.resample.EWAResampler(self.source, self.target)
+        res = resampler.resample(data.copy(), mask_area=False,
+                                 rows_per_scan=16, **kwargs)
+        return res, resampler.cache
+
+    def test_resample(self):
+        """Test resampling a scan based swath in one pass."""
+        import numpy as np
+        from pyresample.ewa import fornav
+        with mock.patch('satpy.resample.fornav', wraps=fornav) as fnv:
+            res, cache = self._resample(self.data, weight_delta_max=5.)
+            self.assertEqual(fnv.call_count, 1)
+            args, kwargs = fnv.call_args
+            self.assertEqual(kwargs['rows_per_scan'], 16)
+            self.assertEqual(kwargs['weight_delta_max'], 5.)
+        self.assertEqual(res.shape, self.target.shape)
+        self.assertTrue(res.mask.any() and not res.mask.all())
+        self.assertEqual(cache['rows'].shape, self.data.shape)
+
+        # several bands
+        data = np.ma.dstack((self.data, 2 * self.data))
+        res2, _ = self._resample(data, weight_delta_max=5.)
+        np.testing.assert_array_equal(res2[:, :, 0], res)
+        np.testing.assert_allclose(res2[:, :, 1], 2 * res, rtol=1e-12)
+
+
+class TestAreaRegistry(unittest.TestCase):
+    """Test the registry of parsed area definitions."""
+
+    AREA = """REGION: {name} {{
+        NAME:          {name}
+        PCS_ID:        stere
+        PCS_DEF:       proj=stere,lat_0=60,lon_0=10,ellps=WGS84
+        XSIZE:         {size}
+        YSIZE:         {size}
+        AREA_EXTENT:   (-50000, -50000, 50000, 50000)
+}};
+"""
+
+    def setUp(self):
+        import os
+        from tempfile import mkstemp
+        fdes, self.filename = mkstemp(suffix='.def')
+        os.close(fdes)
+        self._write_areas(10)
+
+    def tearDown(self):
+        import os
+        os.remove(self.filename)
+
+    def _write_areas(self, size):
+        with open(self.filename, 'w') as area_file:
+            area_file.write(self.AREA.format(name='one', size=size))
+            area_file.write(self.AREA.format(name='two', size=2 * size))
+
+    def test_get_area_def(self):
+        """Test parsing the area file once, until it changes."""
+        from pyresample.utils import AreaNotFound
+        import pyresample.utils
+        from satpy.resample import AreaRegistry
+        registry = AreaRegistry()
+        with mock.patch('pyresample.utils.parse_area_file',
+                        wraps=pyresample.utils.parse_area_file) as paf:
+            area = registry.get_area_def('one', self.filename)
+            self.assertEqual(area.shape, (10, 10))
+            self.assertIs(registry.get_area_def('one', self.filename), area)
+            self.assertEqual(registry.get_area_def('two', self.filename)
+                             .area_id, 'two')
+            self.assertRaises(AreaNotFound, registry.get_area_def, 'three',
+                              self.filename)
+            self.assertEqual(paf.call_count, 1)
+
+            self._write_areas(100)
+            self.assertEqual(registry.get_area_def('one', self.filename)
+                             .shape, (100, 100))
+            self.assertEqual(paf.call_count, 2)
+
+    def test_configured_area_file(self):
+        """Test getting the areas of satpy's area file."""
+        from satpy.resample import get_area_def, get_config
+        with mock.patch('satpy.resample.get_config',
+                        wraps=get_config) as get_config:
+            area = get_area_def('euro4')
+            self.assertEqual(area.area_id, 'euro4')
+            self.assertIs(get_area_def('euro4'), area)
+            # the configuration is read once
+            self.assertLessEqual(get_config.call_count, 1)
+
+    def test_coords(self):
+        """Test caching the coordinates of the areas."""
+        import numpy as np
+        from satpy.resample import AreaRegistry
+        registry = AreaRegistry()
+        area = registry.get_area_def('one', self.filename)
+        lons, lats = registry.get_lonlats(area)
+        np.testing.assert_allclose((lons, lats), area.get_lonlats())
+        self.assertFalse(lons.flags.writeable)
+        self.assertIs(registry.get_lonlats(area)[0], lons)
+        x__, y__ = registry.get_proj_coords(area)
+        np.testing.assert_allclose((x__, y__), area.get_proj_coords())
+        self.assertEqual(registry.coords_size, 4 * lons.nbytes)
+
+        # the least recently used coordinates are dropped first
+        other = registry.get_area_def('two', self.filename)
+        registry.get_lonlats(area)
+        with mock.patch('satpy.resample.AREA_CACHE_BYTES', 8 * lons.nbytes):
+            registry.get_lonlats(other)
+            self.assertEqual(list(registry.coords.keys()),
+                             [(other.kdtree_hash, 'lonlats')])
+            self.assertIsNot(registry.get_lonlats(area)[0], lons)
+            self.assertEqual(list(registry.coords.keys()),
+                             [(area.kdtree_hash, 'lonlats')])
+            self.assertEqual(registry.coords_size, 2 * lons.nbytes)
+
+        # swaths aren't kept
+        swath = mock.MagicMock()
+        swath.get_lonlats.return_value = lons, lats
+        self.assertEqual(registry.get_lonlats(swath), (lons, lats))
+        self.assertEqual(len(registry.coords), 1)
+
+
 def suite():
     """The test suite for test_scene.
     """
     loader = unittest.TestLoader()
     mysuite = unittest.TestSuite()
     mysuite.addTest(loader.loadTestsFromTestCase(TestCache))
+    mysuite.addTest(loader.loadTestsFromTestCase(TestPrecision))
+    mysuite.addTest(loader.loadTestsFromTestCase(TestGridResampler))
+    mysuite.addTest(loader.loadTestsFromTestCase(TestNativeResampler))
+    mysuite.addTest(loader.loadTestsFromTestCase(TestMultiTargetKDTree))
+    mysuite.addTest(loader.loadTestsFromTestCase(TestBilinearResampler))
+    mysuite.addTest(loader.loadTestsFromTestCase(TestEWAResampler))
+    mysuite.addTest(loader.loadTestsFromTestCase(TestAreaRegistry))
 
     return mysuite
\ No newline at end of file
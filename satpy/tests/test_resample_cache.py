@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 PyTroll developers
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Unit tests for resample_cache.py.
+"""
+
+import os
+import shutil
+import sys
+from tempfile import mkdtemp
+
+import numpy as np
+
+if sys.version_info < (2, 7):
+    import unittest2 as unittest
+else:
+    import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+class TestWarmCaches(unittest.TestCase):
+
+    """Test precomputing the resampling caches."""
+
+    def setUp(self):
+        from pyresample.geometry import AreaDefinition
+        from satpy.resample import BaseResampler
+        proj_dict = {'proj': 'stere', 'lat_0': 60., 'lon_0': 10.,
+                     'ellps': 'WGS84', 'units': 'm'}
+        self.source = AreaDefinition('src', 'src', 'src', proj_dict,
+                                     40, 30, (-200000., -150000.,
+                                              200000., 150000.))
+        self.targets = [
+            AreaDefinition('dst1', 'dst1', 'dst1', proj_dict, 10, 8,
+                           (-50000., -40000., 50000., 40000.)),
+            AreaDefinition('dst2', 'dst2', 'dst2',
+                           {'proj': 'latlong', 'ellps': 'WGS84'}, 12, 6,
+                           (8., 59., 12., 61.))]
+        self.cache_dir = mkdtemp()
+        self.caches = BaseResampler.caches.copy()
+        BaseResampler.caches.clear()
+
+    def tearDown(self):
+        from satpy.resample import BaseResampler
+        shutil.rmtree(self.cache_dir)
+        BaseResampler.caches.clear()
+        BaseResampler.caches.update(self.caches)
+
+    def test_warm_caches(self):
+        """Test creating the caches once and finding them afterwards."""
+        from satpy.resample import BaseResampler, GridResampler
+        from satpy.resample_cache import warm_caches
+        reports = warm_caches([self.source], self.targets, self.cache_dir,
+                              resamplers=['kd_tree', 'grid'],
+                              radius_of_influence=20000)
+        self.assertEqual(len(reports), 4)
+        self.assertEqual([(report['target'], report['resampler'])
+                          for report in reports],
+                         [('dst1', 'kd_tree'), ('dst1', 'grid'),
+                          ('dst2', 'kd_tree'), ('dst2', 'grid')])
+        for report in reports:
+            self.assertEqual(report['status'], 'created')
+            self.assertEqual(report['source'], 'src')
+            self.assertTrue(os.path.exists(report['filename']))
+            self.assertEqual(report['size'],
+                             os.path.getsize(report['filename']))
+        self.assertEqual(len(os.listdir(self.cache_dir)), 4)
+
+        BaseResampler.caches.clear()
+        reports = warm_caches([self.source], self.targets, self.cache_dir,
+                              resamplers=['kd_tree', 'grid'],
+                              radius_of_influence=20000)
+        self.assertEqual([report['status'] for report in reports],
+                         ['valid'] * 4)
+
+        # another radius of influence needs other kd-tree caches
+        reports = warm_caches([self.source], self.targets, self.cache_dir,
+                              check_only=True, radius_of_influence=30000)
+        self.assertEqual([report['status'] for report in reports],
+                         ['missing'] * 2)
+
+        # the resampling uses the caches from disk
+        BaseResampler.caches.clear()
+        data = np.ma.masked_array(np.ones(self.source.shape), mask=False)
+        resampler = GridResampler(self.source, self.targets[0])
+        with mock.patch.object(resampler, 'get_source_coords') as gsc:
+            resampler.resample(data, cache_dir=self.cache_dir)
+            gsc.assert_not_called()
+
+    def test_invalid_caches(self):
+        """Test detecting and replacing invalid caches."""
+        from pyresample.geometry import AreaDefinition
+        from satpy.resample_cache import warm_caches
+        target = self.targets[0]
+        report, = warm_caches([self.source], [target], self.cache_dir,
+                              resamplers=['grid'])
+        filename = report['filename']
+        with open(filename, 'wb') as cache_file:
+            cache_file.write(b'garbage')
+        report, = warm_caches([self.source], [target], self.cache_dir,
+                              resamplers=['grid'], check_only=True)
+        self.assertEqual(report['status'], 'invalid')
+
+        report, = warm_caches([self.source], [target], self.cache_dir,
+                              resamplers=['grid'])
+        self.assertEqual(report['status'], 'recreated')
+        self.assertEqual(report['filename'], filename)
+        with np.load(filename) as cache:
+            self.assertEqual(cache['rows'].size, target.size)
+
+        # a cache of the wrong size
+        np.savez(filename, rows=np.zeros(3), cols=np.zeros(3))
+        report, = warm_caches([self.source], [target], self.cache_dir,
+                              resamplers=['grid'], check_only=True)
+        self.assertEqual(report['status'], 'invalid')
+
+        # the native resampler doesn't need any cache for aligned areas
+        target = AreaDefinition('dst', 'dst', 'dst', self.source.proj_dict,
+                                20, 15, self.source.area_extent)
+        report, = warm_caches([self.source], [target], self.cache_dir,
+                              resamplers=['native'])
+        self.assertEqual(report['status'], 'not cached')
+        self.assertIsNone(report['filename'])
+
+    def test_cache_dirs(self):
+        """Test checking and replacing the bilinear cache directories."""
+        from satpy.resample_cache import find_unused_caches, warm_caches
+        report, = warm_caches([self.source], self.targets[:1],
+                              self.cache_dir, resamplers=['bilinear'])
+        self.assertEqual(report['status'], 'created')
+        filename = report['filename']
+        self.assertTrue(os.path.isdir(filename))
+        self.assertEqual(report['size'], sum(
+            os.path.getsize(os.path.join(filename, name))
+            for name in os.listdir(filename)))
+        self.assertEqual(find_unused_caches(self.cache_dir, []), [filename])
+
+        report, = warm_caches([self.source], self.targets[:1],
+                              self.cache_dir, resamplers=['bilinear'],
+                              check_only=True)
+        self.assertEqual(report['status'], 'valid')
+
+        os.remove(os.path.join(filename, 'weight_sum.npy'))
+        report, = warm_caches([self.source], self.targets[:1],
+                              self.cache_dir, resamplers=['bilinear'],
+                              check_only=True)
+        self.assertEqual(report['status'], 'invalid')
+        report, = warm_caches([self.source], self.targets[:1],
+                              self.cache_dir, resamplers=['bilinear'])
+        self.assertEqual(report['status'], 'recreated')
+        self.assertTrue(os.path.exists(os.path.join(filename,
+                                                    'weight_sum.npy')))
+
+    def test_find_unused_caches(self):
+        """Test finding the cache files not used by any area."""
+        from satpy.resample_cache import find_unused_caches, warm_caches
+        reports = warm_caches([self.source], self.targets[:1],
+                              self.cache_dir, resamplers=['grid'])
+        unused = os.path.join(self.cache_dir, 'old.npz')
+        np.savez(unused, rows=np.zeros(3))
+        self.assertEqual(find_unused_caches(self.cache_dir, reports),
+                         [unused])
+
+    @mock.patch('satpy.resample_cache.get_source_areas')
+    @mock.patch('satpy.resample_cache.get_area_def')
+    def test_main(self, get_area_def, get_source_areas):
+        """Test warming the caches from the command line."""
+        from satpy.resample_cache import main
+        get_source_areas.return_value = [self.source]
+        get_area_def.side_effect = dict((area.area_id, area)
+                                        for area in self.targets).get
+        argv = ['--reader', 'fake_reader', '--files', 'file1', 'file2',
+                '--areas', 'dst1', 'dst2', '--resamplers', 'grid',
+                '--cache-dir', self.cache_dir]
+        with mock.patch('satpy.resample_cache.print', create=True) as prt:
+            self.assertEqual(main(argv + ['--check']), 1)
+            self.assertEqual(main(argv), 0)
+            self.assertEqual(main(argv + ['--check']), 0)
+        get_source_areas.assert_called_with(['file1', 'file2'],
+                                            reader='fake_reader',
+                                            datasets=None)
+        statuses = [args[0].split()[0] for args, kwargs
+                    in prt.call_args_list]
+        self.assertEqual(statuses, ['missing'] * 2 + ['created'] * 2 +
+                         ['valid'] * 2)
+
+
+def suite():
+    """The test suite for test_resample_cache.
+    """
+    loader = unittest.TestLoader()
+    mysuite = unittest.TestSuite()
+    mysuite.addTest(loader.loadTestsFromTestCase(TestWarmCaches))
+
+    return mysuite
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1060,6 +1060,177 @@ class TestSceneResample(unittest.TestCase):
             set(loaded_ids), set([DatasetID(name='ds1'), DatasetID(name='new_ds')]))
 
 
+class TestSceneAddFiles(unittest.TestCase):
+    """Test adding segment files to a loaded scene."""
+
+    @staticmethod
+    def _segment_reader():
+        """Create a fake reader of 4 segments of 2 rows."""
+        import numpy as np
+        from pyresample.geometry import AreaDefinition, StackedAreaDefinition
+        from satpy import Dataset, DatasetDict, DatasetID
+        from satpy.tests.utils import create_fake_reader
+
+        reader = create_fake_reader('fake_reader', 'fake_sensor',
+                                    datasets=['ds1'])
+        reader.ids = {DatasetID(name='ds1'): {}}
+        reader.filter_parameters = {}
+        reader.file_handlers = ['seg2', 'seg3']
+        reader.select_files_from_pathnames.side_effect = list
+
+        def create_filehandlers(filenames):
+            reader.file_handlers = sorted(reader.file_handlers + filenames)
+            return {'ftype': filenames}
+        reader.create_filehandlers.side_effect = create_filehandlers
+
+        def get_segment_runs(dsid, file_handlers):
+            runs = []
+            for fhd in reader.file_handlers:
+                is_new = fhd in file_handlers['ftype']
+                if runs and runs[-1][0] == is_new:
+                    runs[-1][1].append(fhd)
+                else:
+                    runs.append((is_new, [fhd]))
+            return runs
+        reader.get_segment_runs.side_effect = get_segment_runs
+
+        def load(dataset_keys, file_handlers=None):
+            segments = sorted(file_handlers or reader.file_handlers)
+            nums = [int(segment[3:]) for segment in segments]
+            data = np.repeat(np.array(nums, dtype=np.float32), 6)
+            areas = [AreaDefinition('seg', 'seg', 'seg', {'proj': 'eqc'},
+                                    3, 2, (0, 8 - 2 * num, 3, 10 - 2 * num))
+                     for num in nums]
+            area = StackedAreaDefinition(*areas).squeeze()
+            return DatasetDict({DatasetID(name='ds1'): Dataset(
+                data.reshape((-1, 3)), name='ds1', area=area)})
+        reader.load.side_effect = load
+        return reader
+
+    @staticmethod
+    def _double_compositor():
+        """Create a compositor doubling ds1."""
+        from satpy import Dataset, DatasetDict, DatasetID
+
+        comp_id = DatasetID(name='comp1', modifiers=())
+
+        def _double(datasets, optional_datasets=None, **info):
+            return Dataset(datasets[0] * 2, area=datasets[0].info['area'],
+                           **comp_id.to_dict())
+        comp = mock.MagicMock(side_effect=_double)
+        comp.id = comp_id
+        comp.info = {'name': 'comp1', 'prerequisites': ('ds1', ),
+                     'optional_prerequisites': ()}
+        return {'fake_sensor': DatasetDict({comp.id: comp})}, {}
+
+    @mock.patch('satpy.composites.CompositorLoader.load_compositors')
+    @mock.patch('satpy.scene.Scene.create_reader_instances')
+    def test_add_files(self, cri, cl):
+        """Test reading only the new segments and composite rows."""
+        import numpy as np
+        import satpy.scene
+        from satpy import DatasetID
+        reader = self._segment_reader()
+        cri.return_value = {'fake_reader': reader}
+        cl.return_value = self._double_compositor()
+        scene = satpy.scene.Scene(filenames='bla', reader='fake_reader')
+        scene.load(['ds1', 'comp1'])
+        self.assertEqual(scene['comp1'].shape, (4, 3))
+
+        res = scene.add_files(['seg1', 'seg4'])
+        self.assertEqual(res, {DatasetID(name='ds1'): [slice(0, 2),
+                                                       slice(6, 8)],
+                               DatasetID(name='comp1', modifiers=()):
+                               [slice(0, 2), slice(6, 8)]})
+        expected = np.repeat(np.arange(1, 5, dtype=np.float32), 6)
+        np.testing.assert_array_equal(scene['ds1'], expected.reshape((8, 3)))
+        np.testing.assert_array_equal(scene['comp1'],
+                                      2 * expected.reshape((8, 3)))
+        area = scene['comp1'].info['area']
+        self.assertEqual(area.y_size, 8)
+        self.assertEqual(tuple(area.area_extent), (0, 0, 3, 8))
+        # only the new segments are read
+        for args, kwargs in reader.load.call_args_list[1:]:
+            self.assertIn(kwargs['file_handlers'],
+                          [set(['seg1']), set(['seg4'])])
+
+    @mock.patch('satpy.composites.CompositorLoader.load_compositors')
+    @mock.patch('satpy.scene.Scene.create_reader_instances')
+    def test_add_files_in_place(self, cri, cl):
+        """Test writing the rows of new segments in the existing arrays."""
+        import numpy as np
+        import satpy.scene
+        reader = self._segment_reader()
+        cri.return_value = {'fake_reader': reader}
+        cl.return_value = self._double_compositor()
+        scene = satpy.scene.Scene(filenames='bla', reader='fake_reader')
+        scene.load(['ds1'])
+        scene.add_files(['seg1', 'seg4'])
+        scene.add_files(['seg5'])
+        first = scene['ds1']
+        scene.add_files(['seg6'])
+        self.assertTrue(np.may_share_memory(scene['ds1'], first))
+        expected = np.repeat(np.arange(1, 7, dtype=np.float32), 6)
+        np.testing.assert_array_equal(scene['ds1'],
+                                      expected.reshape((12, 3)))
+        self.assertFalse(scene['ds1'].mask.any())
+
+        # a dataset set by the user isn't written to
+        user_ds = scene['ds1'].copy()
+        scene['ds1'] = user_ds
+        scene.add_files(['seg7'])
+        self.assertEqual(user_ds.shape, (12, 3))
+        self.assertFalse(np.may_share_memory(scene['ds1'], first))
+
+    def test_stitch_rows(self):
+        """Test stitching segments in arrays allocated for all of them."""
+        import numpy as np
+        from satpy.scene import _stitch_rows
+        reader = self._segment_reader()
+        dataset = reader.load(['ds1'], ['seg2', 'seg3'])['ds1']
+        seg1 = reader.load(['ds1'], ['seg1'])['ds1']
+        seg4 = reader.load(['ds1'], ['seg4'])['ds1']
+        seg5 = reader.load(['ds1'], ['seg5'])['ds1']
+        seg5[0, 0] = np.ma.masked
+
+        res, slices, buffers = _stitch_rows(dataset, [(False, 2), (True, 1)],
+                                            [seg4], total_segments=5)
+        self.assertEqual(slices, [slice(4, 6)])
+        self.assertEqual(buffers[0].shape, (10, 3))
+        self.assertTrue(np.may_share_memory(res, buffers[0]))
+
+        # the rows of segment 4 are moved down for segment 1
+        res, slices, new_buffers = _stitch_rows(
+            res, [(True, 1), (False, 3), (True, 1)], [seg1, seg5], buffers,
+            total_segments=5)
+        self.assertIs(new_buffers[0], buffers[0])
+        self.assertEqual(slices, [slice(0, 2), slice(8, 10)])
+        expected = np.repeat(np.arange(1, 6, dtype=np.float32), 6)
+        np.testing.assert_array_equal(res.data, expected.reshape((10, 3)))
+        self.assertEqual(res.mask.sum(), 1)
+        self.assertTrue(res.mask[8, 0])
+        self.assertEqual(tuple(res.info['area'].area_extent), (0, -2, 3, 8))
+
+    @mock.patch('satpy.composites.CompositorLoader.load_compositors')
+    @mock.patch('satpy.scene.Scene.create_reader_instances')
+    def test_add_files_reload(self, cri, cl):
+        """Test loading the datasets again when rows can't be stitched."""
+        import satpy.scene
+        from satpy import DatasetID
+        reader = self._segment_reader()
+        reader.filter_parameters['area'] = 'euron1'
+        cri.return_value = {'fake_reader': reader}
+        cl.return_value = self._double_compositor()
+        scene = satpy.scene.Scene(filenames='bla', reader='fake_reader')
+        scene.load(['comp1'])
+
+        res = scene.add_files(['seg4'])
+        self.assertEqual(res, {DatasetID(name='comp1', modifiers=()):
+                               [slice(0, 6)]})
+        self.assertEqual(scene['comp1'].shape, (6, 3))
+        self.assertNotIn('ds1', scene)
+
+
 def suite():
     """The test suite for test_scene.
     """
@@ -1068,6 +1239,7 @@ def suite():
     mysuite.addTest(loader.loadTestsFromTestCase(TestScene))
     mysuite.addTest(loader.loadTestsFromTestCase(TestSceneLoading))
     mysuite.addTest(loader.loadTestsFromTestCase(TestSceneResample))
+    mysuite.addTest(loader.loadTestsFromTestCase(TestSceneAddFiles))
 
     return mysuite
 
@@ -226,6 +226,201 @@ sensor_name: visir/test_sensor2
                             {'test_sensor.yaml', 'enhancements/test_sensor.yaml'})
         np.testing.assert_almost_equal(img.channels[0].max(), 0.5)
 
+    def test_enhance_with_compiled_luts(self):
+        """Test enhancing an image with lookup tables"""
+        from satpy.writers import Enhancer, get_enhanced_image
+        from satpy import Dataset
+        ds = Dataset(np.arange(1, 11.).reshape((2, 5)),
+                     name='test1', units='kelvin', sensor='test_sensor', mode='L')
+        e = Enhancer(compile_luts=True)
+        img = get_enhanced_image(ds, enhancer=e)
+        self.assertEqual(img.channels[0].dtype, np.float32)
+        np.testing.assert_allclose(img.channels[0], np.arange(1, 11.).reshape((2, 5)) / 20.,
+                                   atol=1e-4)
+        self.assertEqual(len(e._compiled), 1)
+
+
+class TestConfigCaching(unittest.TestCase):
+    """Test the process-wide caching of configurations and decision trees"""
+
+    def setUp(self):
+        """Create a temporary config file"""
+        import tempfile
+        self.tmp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmp_dir, 'test_cache.yaml')
+        self._write("enhancements: {default: {operations: []}}")
+
+    def tearDown(self):
+        """Remove the temporary config file"""
+        shutil.rmtree(self.tmp_dir)
+
+    def _write(self, content):
+        with open(self.filename, 'w') as fd:
+            fd.write(content)
+
+    def test_load_yaml_config(self):
+        """Test that files are parsed again only when modified"""
+        import yaml
+        from satpy.config import load_yaml_config
+        with mock.patch('satpy.config.yaml', wraps=yaml) as yaml_mock:
+            conf = load_yaml_config(self.filename)
+            conf['enhancements'].clear()
+            conf = load_yaml_config(self.filename)
+            self.assertEqual(conf['enhancements'],
+                             {'default': {'operations': []}})
+            self.assertEqual(yaml_mock.load.call_count, 1)
+            stat = os.stat(self.filename)
+            self._write("enhancements: {}")
+            os.utime(self.filename, (stat.st_atime, stat.st_mtime + 10))
+            self.assertEqual(load_yaml_config(self.filename),
+                             {'enhancements': {}})
+            self.assertEqual(yaml_mock.load.call_count, 2)
+
+    def test_shared_enhancement_tree(self):
+        """Test that enhancers share their trees without modifying them"""
+        from satpy.writers import Enhancer
+        mkdir_p(os.path.join(self.tmp_dir, 'enhancements'))
+        with open(os.path.join(self.tmp_dir, 'enhancements',
+                               'test_sensor.yaml'), 'w') as fd:
+            fd.write("enhancements: {test: {name: test1, operations: []}}")
+        e1 = Enhancer(ppp_config_dir=self.tmp_dir,
+                      enhancement_config_file=self.filename)
+        e2 = Enhancer(ppp_config_dir=self.tmp_dir,
+                      enhancement_config_file=self.filename)
+        self.assertIs(e1.enhancement_tree, e2.enhancement_tree)
+        base_tree = e1.enhancement_tree
+        e1.add_sensor_enhancements('test_sensor')
+        self.assertIsNot(e1.enhancement_tree, base_tree)
+        self.assertNotIn('test1', base_tree.tree)
+        self.assertIn('test1', e1.enhancement_tree.tree)
+        e2.add_sensor_enhancements('test_sensor')
+        self.assertIs(e1.enhancement_tree, e2.enhancement_tree)
+
+    def test_find_match_memoization(self):
+        """Test the memoization of decision tree searches"""
+        from satpy.writers import DecisionTree
+        tree = DecisionTree({'default': {'kind': None},
+                             'one': {'name': 'one', 'kind': 1}},
+                            ('name', ))
+        self.assertEqual(tree.find_match(name='one')['kind'], 1)
+        self.assertEqual(tree.find_match(name='one', foo=2)['kind'], 1)
+        self.assertEqual(len(tree._match_cache), 1)
+        self.assertIsNone(tree.find_match(name={'one'})['kind'])
+        self.assertIsNone(tree.find_match(name=['one'])['kind'])
+        self.assertIsNone(tree.find_match(name=('one', ))['kind'])
+        self.assertEqual(len(tree._match_cache), 4)
+        # unhashable values are not memoized
+        self.assertIsNone(tree.find_match(name={'a': 1})['kind'])
+        self.assertEqual(len(tree._match_cache), 4)
+        tree.add_config_to_tree({'two': {'name': 'one', 'kind': 2}})
+        self.assertEqual(tree.find_match(name='one')['kind'], 2)
+
+
+class FakeContourWriter(object):
+    """Draw a fake coastline and border, like pycoast's writer."""
+
+    instances = 0
+
+    def __init__(self, coast_dir):
+        FakeContourWriter.instances += 1
+
+    @staticmethod
+    def add_coastlines(img, area, outline=None, **kwargs):
+        from PIL import ImageDraw
+        ImageDraw.Draw(img).line([(0, 2), (5, 2)], fill=outline)
+
+    @staticmethod
+    def add_borders(img, area, outline=None, **kwargs):
+        from PIL import ImageDraw
+        # an antialiased line, half opaque
+        ImageDraw.Draw(img).line([(3, 0), (3, 1)],
+                                 fill=tuple(outline) + (128, ))
+
+
+class TestOverlay(unittest.TestCase):
+    """Test adding the cached coastlines and borders to images"""
+
+    def setUp(self):
+        import tempfile
+        from pyresample.geometry import AreaDefinition
+        from satpy import writers
+        self.area = AreaDefinition('test', 'test', 'test',
+                                   {'proj': 'stere', 'lat_0': 60.,
+                                    'lon_0': 10., 'ellps': 'WGS84'},
+                                   6, 5, (-30000., -25000., 30000., 25000.))
+        self.cache_dir = tempfile.mkdtemp()
+        self.pycoast = mock.MagicMock(ContourWriterAGG=FakeContourWriter)
+        FakeContourWriter.instances = 0
+        writers._OVERLAY_CACHE.clear()
+
+    def tearDown(self):
+        from satpy import writers
+        shutil.rmtree(self.cache_dir)
+        writers._OVERLAY_CACHE.clear()
+
+    def _add_overlay(self, img, **kwargs):
+        from satpy.writers import add_overlay
+        with mock.patch.dict('sys.modules', {'pycoast': self.pycoast}):
+            add_overlay(img, self.area, 'coasts', color=(255, 0, 51),
+                        resolution='l', **kwargs)
+
+    def test_add_overlay(self):
+        """Test blending the overlay in the channels"""
+        from trollimage.image import Image
+        channels = [np.ma.masked_array(np.full((5, 6), 0.5), mask=False)
+                    for idx in range(3)]
+        channels[1][2, 4] = np.ma.masked
+        img = Image(channels, mode='RGB')
+        self._add_overlay(img)
+        red, green, blue = img.channels
+        np.testing.assert_allclose(red[2], 1)
+        np.testing.assert_allclose(green[2], 0)
+        np.testing.assert_allclose(blue[2], 0.2)
+        self.assertFalse(green.mask.any())
+        # the half opaque pixels
+        opacity = 128 / 255.
+        np.testing.assert_allclose(red[:2, 3], 0.5 + 0.5 * opacity)
+        np.testing.assert_allclose(green[:2, 3], 0.5 * (1 - opacity))
+        # the pixels without overlay are unchanged
+        np.testing.assert_allclose(red[3:], 0.5)
+        np.testing.assert_allclose(red[:2, :3], 0.5)
+
+        # the overlay is rendered once
+        img = Image(channels, mode='RGB')
+        self._add_overlay(img)
+        self.assertEqual(FakeContourWriter.instances, 1)
+
+    def test_modes(self):
+        """Test adding the overlay to grayscale images with alpha"""
+        from trollimage.image import Image
+        img = Image([np.full((5, 6), 0.5), np.zeros((5, 6))], mode='LA')
+        self._add_overlay(img)
+        lum, alpha = img.channels
+        np.testing.assert_allclose(lum[2], 1)
+        np.testing.assert_allclose(alpha[2], 1)
+        np.testing.assert_allclose(alpha[:2, 3], 128 / 255.)
+        np.testing.assert_allclose(alpha[3:], 0)
+
+    def test_disk_cache(self):
+        """Test reusing the overlays saved on disk"""
+        from trollimage.image import Image
+        from satpy import writers
+        img = Image([np.full((5, 6), 0.5)] * 3, mode='RGB')
+        self._add_overlay(img, cache_dir=self.cache_dir)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        expected = [chn.copy() for chn in img.channels]
+
+        writers._OVERLAY_CACHE.clear()
+        img = Image([np.full((5, 6), 0.5)] * 3, mode='RGB')
+        self._add_overlay(img, cache_dir=self.cache_dir)
+        self.assertEqual(FakeContourWriter.instances, 1)
+        np.testing.assert_allclose(img.channels, expected)
+
+        # the memory cache is bounded
+        with mock.patch('satpy.writers.OVERLAY_CACHE_BYTES', 10):
+            self._add_overlay(img, width=2)
+        self.assertEqual(len(writers._OVERLAY_CACHE), 0)
+
 
 def suite():
     """The test suite for test_projector.
@@ -235,5 +430,7 @@ def suite():
     my_suite.addTest(loader.loadTestsFromTestCase(TestWritersModule))
     my_suite.addTest(loader.loadTestsFromTestCase(TestEnhancer))
     my_suite.addTest(loader.loadTestsFromTestCase(TestEnhancerUserConfigs))
+    my_suite.addTest(loader.loadTestsFromTestCase(TestConfigCaching))
+    my_suite.addTest(loader.loadTestsFromTestCase(TestOverlay))
 
     return my_suite
@@ -235,6 +235,38 @@ class TestFileFileYAMLReader(unittest.TestCase):
             res = self.reader.check_file_covers_area(file_handler, True)
             self.assertTrue(res)
 
+    @patch.object(yr.FileYAMLReader, 'footprint_covers_area')
+    def test_footprint_index(self, fca):
+        """Test the filtering of files with a footprint index."""
+        import shutil
+        from satpy.readers.footprints import FootprintIndex
+        tmpdir = mkdtemp()
+        try:
+            index_file = os.path.join(tmpdir, 'footprints.json')
+            index = FootprintIndex(index_file)
+            self.assertIsNone(index.get('a.nc'))
+            index.add('a.nc', [0., 1., 1.], [10., 10., 11.])
+            index.save()
+
+            # the footprints are read back from disk
+            index = FootprintIndex(index_file)
+            lons, lats = index.get('/somewhere/else/a.nc')
+            np.testing.assert_array_equal(lons, [0., 1., 1.])
+            np.testing.assert_array_equal(lats, [10., 10., 11.])
+
+            self.reader.footprint_index = index
+            self.assertTrue(self.reader.footprint_matches('a.nc'))
+            self.reader.filter_parameters['area'] = 'euron1'
+            fca.return_value = False
+            self.assertFalse(self.reader.footprint_matches('a.nc'))
+            footprint, area = fca.call_args[0]
+            np.testing.assert_array_equal(footprint, (lons, lats))
+            self.assertEqual(area, 'euron1')
+            # unknown footprints match
+            self.assertTrue(self.reader.footprint_matches('b.nc'))
+        finally:
+            shutil.rmtree(tmpdir)
+
     def test_start_end_time(self):
         """Check start and end time behaviours."""
         self.reader.file_handlers = {}
@@ -655,6 +687,78 @@ class TestFileFileYAMLReader(unittest.TestCase):
                          calibration=None, modifiers=())
         self.assertEqual(self.reader._get_file_handlers(lons), None)
 
+    def test_create_filehandlers_incrementally(self):
+        """Test adding segment files to the reader."""
+        ds_id1 = DatasetID(name='ch01', wavelength=(0.5, 0.6, 0.7),
+                           resolution=None, polarization=None,
+                           calibration='reflectance', modifiers=())
+        segments = {}
+        for num in range(4):
+            segments['a{}.bla'.format(num)] = FakeFH(datetime(2000, 1, 1, num),
+                                                     None)
+            segments['a{}.bla'.format(num)].filename = 'a{}.bla'.format(num)
+
+        def new_filehandlers(filetype_info, filenames):
+            return [segments[filename] for filename in sorted(filenames)]
+
+        with patch.object(self.reader, 'new_filehandlers_for_filetype',
+                          side_effect=new_filehandlers):
+            res = self.reader.create_filehandlers(['a0.bla', 'a3.bla'])
+            self.assertEqual(res, {'ftype1': [segments['a0.bla'],
+                                              segments['a3.bla']]})
+            res = self.reader.create_filehandlers(['a3.bla', 'a1.bla'])
+            self.assertEqual(res, {'ftype1': [segments['a1.bla']]})
+
+        self.assertEqual(self.reader.file_handlers['ftype1'],
+                         [segments['a0.bla'], segments['a1.bla'],
+                          segments['a3.bla']])
+        self.assertEqual(self.reader.info['filenames'],
+                         ['a0.bla', 'a3.bla', 'a1.bla'])
+        self.assertEqual(self.reader.get_segment_runs(ds_id1, res),
+                         [(False, [segments['a0.bla']]),
+                          (True, [segments['a1.bla']]),
+                          (False, [segments['a3.bla']])])
+        self.assertIsNone(self.reader.get_segment_runs(DatasetID('ch03'),
+                                                       res))
+        self.assertEqual(
+            self.reader._get_file_handlers(ds_id1, set([segments['a3.bla']])),
+            [segments['a3.bla']])
+
+    def test_create_filehandlers_before_requirements(self):
+        """Test adding segment files before the file they require."""
+        class FakeSegmentFH(FakeFH):
+
+            def __init__(self, filename, filename_info, filetype_info,
+                         *req_fh):
+                super(FakeSegmentFH, self).__init__(datetime(2000, 1, 1, 1),
+                                                    None)
+                self.filename = filename
+                self.filename_info = filename_info
+                self.metadata = filename_info.copy()
+                self.req_fh = req_fh
+
+        file_types = self.reader.config['file_types']
+        file_types['ftype1']['requires'] = ['epi']
+        file_types['ftype1']['file_reader'] = FakeSegmentFH
+        file_types['epi'] = {'name': 'epi', 'file_patterns': ['epi.bla'],
+                             'file_reader': FakeSegmentFH}
+
+        res = self.reader.create_filehandlers(['a001.bla', 'a002.bla'])
+        self.assertEqual(res, {})
+        self.assertEqual(self.reader.info['filenames'], [])
+
+        res = self.reader.create_filehandlers(['a002.bla', 'epi.bla'])
+        self.assertEqual(sorted(res), ['epi', 'ftype1'])
+        self.assertEqual([fhd.filename for fhd in res['ftype1']],
+                         ['a002.bla'])
+        res = self.reader.create_filehandlers(['a001.bla', 'a002.bla'])
+        self.assertEqual([fhd.filename for fhd in res['ftype1']],
+                         ['a001.bla'])
+        self.assertEqual(res['ftype1'][0].req_fh,
+                         tuple(self.reader.file_handlers['epi']))
+        self.assertEqual(sorted(self.reader.info['filenames']),
+                         ['a001.bla', 'a002.bla', 'epi.bla'])
+
     def test_get_shape_slices(self):
         """Test getting the dataset shape and slices."""
         all_shapes = [[2, 5], [3, 5], [4, 5]]
@@ -681,6 +785,65 @@ class TestFileFileYAMLReader(unittest.TestCase):
         self.assertEquals(xsl, slice(0, 8))
         self.assertEquals(ysl, slice(0, 6))
 
+    @patch('satpy.readers.yaml_reader.get_sub_swath')
+    @patch('satpy.readers.yaml_reader.get_swath_slices')
+    def test_get_swath_slices(self, gss, gsw):
+        """Test slicing swaths over the filter area."""
+        from pyresample.geometry import SwathDefinition
+        swath = MagicMock(spec=SwathDefinition)
+        gss.return_value = slice(0, 5), slice(16, 48)
+
+        slice_kwargs, area = self.reader._get_slices(swath)
+        self.assertEqual(slice_kwargs, {})
+        self.assertIs(area, swath)
+
+        self.reader.filter_parameters['area'] = 'area'
+        self.reader.filter_parameters['swath_slicing'] = {'stride': 8}
+        slice_kwargs, area = self.reader._get_slices(swath, 16)
+        gss.assert_called_once_with(swath, 'area', rows_per_scan=16,
+                                    stride=8)
+        gsw.assert_called_once_with(swath, slice(0, 5), slice(16, 48))
+        self.assertIs(area, gsw.return_value)
+        self.assertEqual(slice_kwargs, {'xslice': slice(0, 5),
+                                        'yslice': slice(16, 48)})
+
+        # no overlap, nothing is loaded
+        gss.side_effect = ValueError
+        slice_kwargs, area = self.reader._get_slices(swath, 16)
+        self.assertIsNone(slice_kwargs)
+        self.assertIsNone(area)
+        fh = MagicMock()
+        self.reader.ids = {DatasetID(name='ch1'): {'file_type': 'ftype1'}}
+        self.reader.file_handlers = {'ftype1': [fh]}
+        with patch.object(self.reader, '_load_dataset_area',
+                          return_value=swath), \
+                patch.object(self.reader, '_load_dataset_data') as ldd:
+            self.assertIsNone(self.reader._load_dataset_with_area(
+                DatasetID(name='ch1'), []))
+            ldd.assert_not_called()
+
+    def test_load_dataset_precision(self):
+        """Check that data is loaded in float32 and geolocation as is."""
+        from satpy.dataset import Dataset
+        fh = MagicMock()
+        fh.get_shape.side_effect = NotImplementedError
+        data_id = DatasetID(name='ch1')
+        lon_id = DatasetID(name='lon')
+        self.reader.ids = {data_id: {'standard_name': 'toa_bt'},
+                           lon_id: {'standard_name': 'longitude'}}
+        with patch.object(self.reader, '_load_entire_dataset') as led:
+            led.side_effect = lambda *args: Dataset(np.ones((2, 2)),
+                                                    name='test')
+            res = self.reader._load_dataset_data([fh], data_id)
+            self.assertEqual(res.dtype, np.float32)
+            self.assertEqual(res.info['name'], 'test')
+            res = self.reader._load_dataset_data([fh], lon_id)
+            self.assertEqual(res.dtype, np.float64)
+
+            with patch('satpy.config.PRECISION', 'float64'):
+                res = self.reader._load_dataset_data([fh], data_id)
+                self.assertEqual(res.dtype, np.float64)
+
     @patch('satpy.readers.yaml_reader.np.ma.vstack', spec=np.ma.vstack)
     @patch('satpy.readers.yaml_reader.Dataset')
     def test_load_entire_dataset(self, Dataset, vstack):
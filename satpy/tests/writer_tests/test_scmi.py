@@ -124,6 +124,59 @@ class TestSCMIWriter(unittest.TestCase):
         self.assertTrue(os.path.isfile(fn))
         self.assertIn('T009', fn)
 
+    def test_parallel_numbered_tiles(self):
+        """Test writing numbered tiles with several processes"""
+        from satpy.writers.scmi import SCMIWriter
+        from satpy import Dataset
+        from pyresample.geometry import AreaDefinition
+        from pyresample.utils import proj4_str_to_dict
+        from netCDF4 import Dataset as NCDataset
+        area_def = AreaDefinition(
+            'test',
+            'test',
+            'test',
+            proj_dict=proj4_str_to_dict('+proj=lcc +datum=WGS84 +ellps=WGS84 +lon_0=-95. +lat_0=25 +lat_1=25 +units=m +no_defs'),
+            x_size=100,
+            y_size=200,
+            area_extent=(-1000., -1500., 1000., 1500.),
+        )
+        now = datetime.utcnow()
+        data = np.ma.masked_array(
+            np.linspace(0., 1., 20000, dtype=np.float32).reshape((200, 100)))
+        # first tile row without valid data
+        data[:67] = np.ma.masked
+        ds = Dataset(
+            data,
+            name='test_ds',
+            platform='PLAT',
+            sensor='SENSOR',
+            units='1',
+            area=area_def,
+            start_time=now,
+            end_time=now + timedelta(minutes=20),
+        )
+        results = []
+        for num_workers in (1, 2):
+            base_dir = os.path.join(self.base_dir, str(num_workers))
+            os.mkdir(base_dir)
+            w = SCMIWriter(base_dir=base_dir, num_workers=num_workers)
+            fn = w.save_dataset(ds,
+                                sector_id='TEST',
+                                source_name="TESTS",
+                                tile_count=(3, 3))
+            self.assertIn('T009', fn)
+            tiles = {}
+            for tile_fn in sorted(os.listdir(base_dir)):
+                nc = NCDataset(os.path.join(base_dir, tile_fn))
+                tiles[tile_fn] = nc.variables['data'][:]
+                nc.close()
+            results.append(tiles)
+        self.assertEqual(len(results[0]), 6)
+        self.assertEqual(sorted(results[0]), sorted(results[1]))
+        for tile_fn, tile in results[0].items():
+            np.testing.assert_array_equal(tile, results[1][tile_fn])
+            np.testing.assert_array_equal(tile.mask, results[1][tile_fn].mask)
+
     def test_basic_lettered_tiles(self):
         """Test creating a lettered grid"""
         from satpy.writers.scmi import SCMIWriter
@@ -25,14 +25,24 @@
 For now, this includes enhancement configuration utilities.
 """
 
+import hashlib
+import json
 import logging
 import os
 
+from copy import deepcopy
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ordereddict import OrderedDict
+
 import numpy as np
+import six
 import yaml
 
 from satpy.config import (config_search_paths, get_environ_config_dir,
-                          recursive_dict_update)
+                          load_yaml_config, recursive_dict_update)
 from satpy.plugin_base import Plugin
 from trollimage.image import Image
 from trollsift import parser
@@ -57,10 +67,127 @@ def _determine_mode(dataset):
                            (dataset.id,))
 
 
-def add_overlay(orig, area, coast_dir, color=(0, 0, 0), width=0.5, resolution=None, level_coast=1, level_borders=1):
+# memory allowed for the rendered overlays, in bytes
+OVERLAY_CACHE_BYTES = 256 * 1024 ** 2
+
+# overlay hash -> (rows, cols, colors)
+_OVERLAY_CACHE = OrderedDict()
+
+
+def _get_overlay_resolution(area):
+    """Choose the resolution of the coastlines for *area*."""
+    x_resolution = ((area.area_extent[2] -
+                     area.area_extent[0]) /
+                    area.x_size)
+    y_resolution = ((area.area_extent[3] -
+                     area.area_extent[1]) /
+                    area.y_size)
+    res = min(x_resolution, y_resolution)
+
+    if res > 25000:
+        resolution = "c"
+    elif res > 5000:
+        resolution = "l"
+    elif res > 1000:
+        resolution = "i"
+    elif res > 200:
+        resolution = "h"
+    else:
+        resolution = "f"
+
+    LOG.debug("Automagically choose resolution " + resolution)
+    return resolution
+
+
+def _render_overlay(area, coast_dir, color, width, resolution, level_coast,
+                    level_borders):
+    """Draw the coastlines and borders of *area* on a transparent layer.
+
+    Returns:
+        The rows and columns of the pixels drawn on, and their RGBA colors
+        as an array of shape (pixels, 4).
+    """
+    from PIL import Image as PILImage
+    from pycoast import ContourWriterAGG
+
+    # the lines are blended with transparent pixels of their own color, so
+    # the antialiased edges only get a partial opacity
+    img = PILImage.new('RGBA', (area.x_size, area.y_size),
+                       tuple(color) + (0, ))
+    cw_ = ContourWriterAGG(coast_dir)
+    cw_.add_coastlines(img, area, outline=color,
+                       resolution=resolution, width=width, level=level_coast)
+    cw_.add_borders(img, area, outline=color,
+                    resolution=resolution, width=width, level=level_borders)
+
+    arr = np.array(img)
+    rows, cols = np.nonzero(arr[:, :, 3])
+    return (rows.astype(np.int32), cols.astype(np.int32),
+            arr[rows, cols])
+
+
+def get_overlay(area, coast_dir, color=(0, 0, 0), width=0.5,
+                resolution=None, level_coast=1, level_borders=1,
+                cache_dir=None):
+    """Get the coastlines and borders of *area*, rendered once.
+
+    The rendered overlays are kept in memory, the least recently used ones
+    being dropped beyond `OVERLAY_CACHE_BYTES`, and in *cache_dir* if given.
+    The arguments are the ones of `add_overlay`.
+
+    Returns:
+        The rows and columns of the pixels of the overlay, and their RGBA
+        colors as an array of shape (pixels, 4).
+    """
+    from PIL import ImageColor
+    from satpy.resample import BaseResampler, get_area_def
+
+    if isinstance(area, six.string_types):
+        area = get_area_def(area)
+    if resolution is None:
+        resolution = _get_overlay_resolution(area)
+    if isinstance(color, six.string_types):
+        color = ImageColor.getrgb(color)
+    color = tuple(int(col) for col in color)
+
+    params = [os.path.abspath(coast_dir), color, width, resolution,
+              level_coast, level_borders]
+    overlay_hash = hashlib.sha1("".join((
+        BaseResampler.hash_area(area),
+        json.dumps(params))).encode('utf-8')).hexdigest()
+
+    try:
+        overlay = _OVERLAY_CACHE.pop(overlay_hash)
+    except KeyError:
+        overlay = None
+    filename = None
+    if cache_dir:
+        filename = os.path.join(cache_dir, "overlay_" + overlay_hash + ".npz")
+    if overlay is None and filename is not None and os.path.exists(filename):
+        LOG.debug("Loading overlay from %s", filename)
+        with np.load(filename) as cache:
+            overlay = cache['rows'], cache['cols'], cache['colors']
+    if overlay is None:
+        LOG.info("Add coastlines and political borders to image.")
+        overlay = _render_overlay(area, coast_dir, color, width, resolution,
+                                  level_coast, level_borders)
+    if filename is not None and not os.path.exists(filename):
+        LOG.info("Saving overlay to %s", filename)
+        rows, cols, colors = overlay
+        np.savez(filename, rows=rows, cols=cols, colors=colors)
+
+    _OVERLAY_CACHE[overlay_hash] = overlay
+    while sum(arr.nbytes for cached in _OVERLAY_CACHE.values()
+              for arr in cached) > OVERLAY_CACHE_BYTES:
+        _OVERLAY_CACHE.popitem(False)
+    return overlay
+
+
+def add_overlay(orig, area, coast_dir, color=(0, 0, 0), width=0.5,
+                resolution=None, level_coast=1, level_borders=1,
+                cache_dir=None):
     """Add coastline and political borders to image, using *color* (tuple
     of integers between 0 and 255).
-    Warning: Loses the masks !
     *resolution* is chosen automatically if None (default), otherwise it should be one of:
     +-----+-------------------------+---------+
     | 'f' | Full resolution         | 0.04 km |
@@ -69,62 +196,44 @@ def add_overlay(orig, area, coast_dir, color=(0, 0, 0), width=0.5, resolution=No
     | 'l' | Low resolution          | 5.0 km  |
     | 'c' | Crude resolution        | 25  km  |
     +-----+-------------------------+---------+
-    """
-    img = orig.pil_image()
 
+    The overlay of an area is only drawn once, and kept in memory and in
+    *cache_dir* if given (see `get_overlay`). It is then blended into the
+    channels of the image: images in 'L' mode get the red component of
+    *color*, and the masked pixels under the overlay get the fill value
+    of the image (or 0) before being unmasked.
+    """
     if area is None:
         raise ValueError("Area of image is None, can't add overlay.")
 
-    from pycoast import ContourWriterAGG
-    from satpy.resample import get_area_def
-    if isinstance(area, str):
-        area = get_area_def(area)
-    LOG.info("Add coastlines and political borders to image.")
-
-    if resolution is None:
+    rows, cols, colors = get_overlay(area, coast_dir, color=color,
+                                     width=width, resolution=resolution,
+                                     level_coast=level_coast,
+                                     level_borders=level_borders,
+                                     cache_dir=cache_dir)
 
-        x_resolution = ((area.area_extent[2] -
-                         area.area_extent[0]) /
-                        area.x_size)
-        y_resolution = ((area.area_extent[3] -
-                         area.area_extent[1]) /
-                        area.y_size)
-        res = min(x_resolution, y_resolution)
-
-        if res > 25000:
-            resolution = "c"
-        elif res > 5000:
-            resolution = "l"
-        elif res > 1000:
-            resolution = "i"
-        elif res > 200:
-            resolution = "h"
-        else:
-            resolution = "f"
+    if orig.mode not in ('L', 'LA', 'RGB', 'RGBA'):
+        orig.convert('RGBA' if orig.mode.endswith('A') else 'RGB')
 
-        LOG.debug("Automagically choose resolution " + resolution)
-
-    if img.mode.endswith('A'):
-        img = img.convert('RGBA')
-    else:
-        img = img.convert('RGB')
-
-    cw_ = ContourWriterAGG(coast_dir)
-    cw_.add_coastlines(img, area, outline=color,
-                       resolution=resolution, width=width, level=level_coast)
-    cw_.add_borders(img, area, outline=color,
-                    resolution=resolution, width=width, level=level_borders)
-
-    arr = np.array(img)
-
-    if orig.mode == 'L':
-        orig.channels[0] = np.ma.array(arr[:, :, 0] / 255.0)
-    elif orig.mode == 'LA':
-        orig.channels[0] = np.ma.array(arr[:, :, 0] / 255.0)
-        orig.channels[1] = np.ma.array(arr[:, :, -1] / 255.0)
+    opacity = colors[:, 3] / 255.0
+    if orig.mode.startswith('L'):
+        values = [colors[:, 0] / 255.0]
     else:
-        for idx in range(len(orig.channels)):
-            orig.channels[idx] = np.ma.array(arr[:, :, idx] / 255.0)
+        values = [colors[:, idx] / 255.0 for idx in range(3)]
+    if orig.mode.endswith('A'):
+        # the overlay is opaque
+        values.append(np.ones(len(opacity)))
+
+    for idx, value in enumerate(values):
+        chn = orig.channels[idx]
+        if not np.issubdtype(chn.dtype, np.floating):
+            chn = orig.channels[idx] = chn.astype(np.float64)
+        fill = 0
+        if orig.fill_value is not None and idx < len(orig.fill_value):
+            fill = orig.fill_value[idx]
+        under = np.where(np.ma.getmaskarray(chn)[rows, cols], fill,
+                         np.ma.getdata(chn)[rows, cols].clip(0, 1))
+        chn[rows, cols] = under * (1 - opacity) + value * opacity
 
 
 def add_text(orig, dc, img, text=None):
@@ -351,15 +460,20 @@ class ImageWriter(Writer):
                  file_pattern=None,
                  enhancement_config=None,
                  base_dir=None,
+                 compile_enhancements=None,
                  **kwargs):
         Writer.__init__(self, name, fill_value, file_pattern, base_dir,
                         **kwargs)
         enhancement_config = self.info.get(
             "enhancement_config",
             None) if enhancement_config is None else enhancement_config
+        compile_enhancements = self.info.get(
+            "compile_enhancements",
+            False) if compile_enhancements is None else compile_enhancements
 
         self.enhancer = Enhancer(ppp_config_dir=self.ppp_config_dir,
-                                 enhancement_config_file=enhancement_config)
+                                 enhancement_config_file=enhancement_config,
+                                 compile_luts=bool(compile_enhancements))
 
     def save_dataset(self, dataset, filename=None, fill_value=None, overlay=None, decorate=None, **kwargs):
         """Saves the *dataset* to a given *filename*.
@@ -380,6 +494,7 @@ class DecisionTree(object):
     def __init__(self, decision_dicts, attrs, **kwargs):
         self.attrs = attrs
         self.tree = {}
+        self._match_cache = {}
         if not isinstance(decision_dicts, (list, tuple)):
             decision_dicts = [decision_dicts]
         self.add_config_to_tree(*decision_dicts)
@@ -390,7 +505,14 @@ class DecisionTree(object):
             conf = recursive_dict_update(conf, decision_dict)
         self._build_tree(conf)
 
+    def copy(self):
+        """Copy the tree so that the copy can be extended independently."""
+        res = deepcopy(self)
+        res._match_cache = {}
+        return res
+
     def _build_tree(self, conf):
+        self._match_cache = {}
         for section_name, attrs in conf.items():
             # Set a path in the tree for each section in the configuration
             # files
@@ -431,12 +553,37 @@ class DecisionTree(object):
                                      kwargs)
         return match
 
+    def _match_key(self, kwargs):
+        """Get the memoization key of a search, None if it can't be hashed.
+        """
+        key = []
+        for attr in self.attrs:
+            value = kwargs.get(attr)
+            if isinstance(value, (set, frozenset)):
+                value = type(value), frozenset(value)
+            elif isinstance(value, list):
+                value = list, tuple(value)
+            key.append(value)
+        key = tuple(key)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
     def find_match(self, **kwargs):
+        key = self._match_key(kwargs)
         try:
-            match = self._find_match(self.tree, self.attrs, kwargs)
-        except (KeyError, IndexError, ValueError):
-            LOG.debug("Match exception:", exc_info=True)
-            LOG.error("Error when finding matching decision section")
+            match = self._match_cache[key]
+        except KeyError:
+            match = None
+            try:
+                match = self._find_match(self.tree, self.attrs, kwargs)
+            except (KeyError, IndexError, ValueError):
+                LOG.debug("Match exception:", exc_info=True)
+                LOG.error("Error when finding matching decision section")
+            if key is not None:
+                self._match_cache[key] = match
 
         if match is None:
             # only possible if no default section was provided
@@ -460,12 +607,12 @@ class EnhancementDecisionTree(DecisionTree):
         conf = {}
         for config_file in decision_dict:
             if os.path.isfile(config_file):
-                with open(config_file) as fd:
-                    enhancement_section = yaml.load(fd).get(self.prefix, {})
-                    if not enhancement_section:
-                        LOG.debug("Config '{}' has no '{}' section or it is empty".format(config_file, self.prefix))
-                        continue
-                    conf = recursive_dict_update(conf, enhancement_section)
+                enhancement_section = load_yaml_config(
+                    config_file).get(self.prefix, {})
+                if not enhancement_section:
+                    LOG.debug("Config '{}' has no '{}' section or it is empty".format(config_file, self.prefix))
+                    continue
+                conf = recursive_dict_update(conf, enhancement_section)
             elif isinstance(config_file, dict):
                 conf = recursive_dict_update(conf, config_file)
             else:
@@ -486,19 +633,63 @@ class EnhancementDecisionTree(DecisionTree):
                            (kwargs.get("uid", None), ))
 
 
+# batches of config files -> EnhancementDecisionTree, see `Enhancer`
+_ENHANCEMENT_TREES = {}
+
+
+def _config_batch_key(config_files):
+    """Get the cache key of *config_files*, None if they aren't all files."""
+    key = []
+    for config_file in config_files:
+        if (not isinstance(config_file, six.string_types) or
+                not os.path.isfile(config_file)):
+            return None
+        stat = os.stat(config_file)
+        key.append((os.path.abspath(config_file), stat.st_mtime,
+                    stat.st_size))
+    return tuple(key)
+
+
+def _get_enhancement_tree(batches):
+    """Get the decision tree built from successive *batches* of config files.
+
+    Trees are shared by all the `Enhancer` instances of the process, so they
+    must not be modified.
+    """
+    try:
+        return _ENHANCEMENT_TREES[batches]
+    except KeyError:
+        pass
+    config_files = [config_file for config_file, _, _ in batches[-1]]
+    if len(batches) == 1:
+        tree = EnhancementDecisionTree(*config_files)
+    else:
+        tree = _get_enhancement_tree(batches[:-1]).copy()
+        tree.add_config_to_tree(*config_files)
+    _ENHANCEMENT_TREES[batches] = tree
+    return tree
+
+
 class Enhancer(object):
 
     """Helper class to get enhancement information for images."""
 
-    def __init__(self, ppp_config_dir=None, enhancement_config_file=None):
+    def __init__(self, ppp_config_dir=None, enhancement_config_file=None,
+                 compile_luts=False):
         """Initialize an Enhancer instance.
 
         Args:
             ppp_config_dir: Points to the base configuration directory
             enhancement_config_file: The enhancement configuration to
                 apply, False to leave as is.
+            compile_luts: Fuse pointwise enhancement chains into lookup
+                tables when possible (see
+                :func:`satpy.enhancements.compile_operations`). Meant for
+                images that are saved with 8-bit integer data.
         """
         self.ppp_config_dir = ppp_config_dir or get_environ_config_dir()
+        self.compile_luts = compile_luts
+        self._compiled = {}
         self.enhancement_config_file = enhancement_config_file
         # Set enhancement_config_file to False for no enhancements
         if self.enhancement_config_file is None:
@@ -511,12 +702,21 @@ class Enhancer(object):
         if not self.enhancement_config_file:
             # They don't want any automatic enhancements
             self.enhancement_tree = None
+            self._tree_batches = None
         else:
             if not isinstance(self.enhancement_config_file, (list, tuple)):
                 self.enhancement_config_file = [self.enhancement_config_file]
 
-            self.enhancement_tree = EnhancementDecisionTree(
-                *self.enhancement_config_file)
+            # file based trees are cached, keep track of how ours was built
+            key = _config_batch_key(self.enhancement_config_file)
+            if key is None:
+                self._tree_batches = None
+                self.enhancement_tree = EnhancementDecisionTree(
+                    *self.enhancement_config_file)
+            else:
+                self._tree_batches = (key, )
+                self.enhancement_tree = _get_enhancement_tree(
+                    self._tree_batches)
 
         self.sensor_enhancement_configs = []
 
@@ -541,14 +741,44 @@ class Enhancer(object):
                 self.sensor_enhancement_configs.append(config_file)
                 new_configs.append(config_file)
 
-        if new_configs:
+        if not new_configs:
+            return
+        key = _config_batch_key(new_configs)
+        if self._tree_batches is not None and key is not None:
+            self._tree_batches += (key, )
+            self.enhancement_tree = _get_enhancement_tree(self._tree_batches)
+        else:
+            if self._tree_batches is not None:
+                # don't modify the shared tree
+                self.enhancement_tree = self.enhancement_tree.copy()
+                self._tree_batches = None
             self.enhancement_tree.add_config_to_tree(*new_configs)
 
+    def _get_compiled(self, enh_kwargs, mode):
+        """Get the compiled version of the *enh_kwargs* operations, or None.
+        """
+        key = (id(enh_kwargs), mode)
+        try:
+            # keep the section around so that its id can't be reused
+            return self._compiled[key][1]
+        except KeyError:
+            from satpy.enhancements import compile_operations
+            compiled = compile_operations(enh_kwargs['operations'], mode)
+            self._compiled[key] = (enh_kwargs, compiled)
+            return compiled
+
     def apply(self, img, **info):
         enh_kwargs = self.enhancement_tree.find_match(**info)
 
         LOG.debug("Enhancement configuration options: %s" %
                   (str(enh_kwargs['operations']), ))
+        if self.compile_luts:
+            compiled = self._get_compiled(enh_kwargs, img.mode)
+            if compiled is not None:
+                LOG.debug("Applying the enhancements as lookup tables")
+                compiled(img)
+                return
+
         for operation in enh_kwargs['operations']:
             fun = operation['method']
             args = operation.get('args', [])
@@ -66,6 +66,9 @@ class GeoTIFFWriter(ImageWriter):
         self.floating_point = bool(self.info.get(
             "floating_point", None) if floating_point is None else
             floating_point)
+        if self.floating_point:
+            # lookup tables are only exact enough for integer outputs
+            self.enhancer.compile_luts = False
         self.tags = self.info.get("tags",
                                   None) if tags is None else tags
         if self.tags is None:
@@ -67,6 +67,7 @@ import os
 import logging
 import string
 import sys
+from collections import deque
 from datetime import datetime, timedelta
 from netCDF4 import Dataset
 
@@ -248,10 +249,14 @@ class NumberedTileGenerator(object):
                 yield tile_info
 
     def __call__(self, data, fill_value=np.nan):
+        """Generate the tiles of *data*.
+
+        A new tile array (of the same type as *data*) is created for each
+        tile, so that tiles can be processed while the next ones are
+        generated. Tiles with only masked data are skipped before copying.
+        """
         ts = self.tile_shape
-        tmp_tile = np.ma.zeros(ts, dtype=np.float32)
-        tmp_tile.set_fill_value(fill_value)
-        tmp_tile[:] = np.ma.masked
+        mask = np.ma.getmaskarray(data)
 
         if self._tile_cache:
             tile_infos = self._tile_cache
@@ -259,13 +264,14 @@ class NumberedTileGenerator(object):
             tile_infos = self._generate_tile_info()
 
         for tile_info in tile_infos:
-            tmp_tile[tile_info[-2]] = data[tile_info[-1]]
-            if tmp_tile.mask.all():
+            if mask[tile_info[-1]].all():
                 LOG.info("Tile {} contains all masked data, skipping...".format(tile_info[2]))
                 continue
 
+            tmp_tile = np.ma.masked_all(ts, dtype=data.dtype)
+            tmp_tile.set_fill_value(fill_value)
+            tmp_tile[tile_info[-2]] = data[tile_info[-1]]
             yield tile_info[:-2], tmp_tile
-            tmp_tile[:] = np.ma.masked
 
 
 class LetteredTileGenerator(NumberedTileGenerator):
@@ -600,6 +606,16 @@ class NetCDFWriter(object):
         assert(hasattr(data, 'mask'))
         self.image_data[:, :] = np.require(data.filled(fill_value), dtype=np.float32)
 
+    def set_packed_image_data(self, data):
+        """Write *data* already packed to the file data type.
+
+        The data must have been scaled with this variable's `scale_factor`
+        and `add_offset` and have fill values in place of invalid pixels.
+        """
+        LOG.info('writing packed image data')
+        self.image_data.set_auto_scale(False)
+        self.image_data[:, :] = data
+
     def set_projection_attrs(self, area_id, proj4_info):
         """
         assign projection attributes per GRB standard
@@ -677,8 +693,22 @@ class NetCDFWriter(object):
         self._nc = None
 
 
+# writer used by the tile writing processes, see `SCMIWriter.save_datasets`
+_TILE_WRITER = None
+
+
+def _init_tile_worker(writer):
+    global _TILE_WRITER
+    _TILE_WRITER = writer
+
+
+def _write_tile(args, kwargs):
+    return _TILE_WRITER.create_tile_output(*args, **kwargs)
+
+
 class SCMIWriter(Writer):
-    def __init__(self, compress=False, fix_awips=False, **kwargs):
+    def __init__(self, compress=False, fix_awips=False, num_workers=1,
+                 **kwargs):
         super(SCMIWriter, self).__init__(
             self, default_config_filename="writers/scmi.yaml", **kwargs)
         self.keep_intermediate = False
@@ -687,6 +717,8 @@ class SCMIWriter(Writer):
         self.scmi_datasets = SCMIDatasetDecisionTree([self.config['datasets']])
         self.compress = compress
         self.fix_awips = fix_awips
+        # netCDF4 holds the GIL while compressing, so use processes
+        self.num_workers = num_workers
         self._fill_sector_info()
 
     def _fill_sector_info(self):
@@ -747,6 +779,25 @@ class SCMIWriter(Writer):
 
         return fills, mx, bx
 
+    @staticmethod
+    def _pack_data(data, fill, factor, offset, valid_min, valid_max,
+                   dtype=AWIPS_DATA_DTYPE):
+        """Clip and scale *data* to the file data type once for all tiles.
+
+        The packing is the same as the one netCDF4 does automatically from
+        the `scale_factor` and `add_offset` (stored as 32-bit floats) of the
+        variable. Invalid pixels are set to *fill* and masked.
+        """
+        arr = np.ma.getdata(data)
+        mask = np.ma.getmaskarray(data) | np.isnan(arr)
+        arr = np.clip(arr, valid_min, valid_max).astype(np.float32)
+        arr -= np.float32(offset)
+        arr /= np.float32(factor)
+        np.around(arr, out=arr)
+        arr[mask] = fill
+        return np.ma.masked_array(arr.astype(dtype), mask=mask,
+                                  fill_value=fill)
+
     def _fix_awips_file(self, fn):
         # hack to get files created by new NetCDF library
         # versions to be read by AWIPS buggy java version
@@ -818,9 +869,17 @@ class SCMIWriter(Writer):
                       source_name=None, filename=None,
                       tile_count=(1, 1), tile_size=None,
                       lettered_grid=False, num_subtiles=None,
-                      **kwargs):
+                      num_workers=None, **kwargs):
+        """Save *datasets* to SCMI tiles.
+
+        With more than one worker (*num_workers*, defaulting to the writer's
+        setting), tiles are written by a pool of processes while the next
+        ones are being generated, with a bounded number of tiles in flight.
+        """
         if sector_id is None:
             raise TypeError("Keyword 'sector_id' is required")
+        if num_workers is None:
+            num_workers = self.num_workers
 
         def _area_id(area_def):
             return area_def.name + str(area_def.area_extent) + str(area_def.shape)
@@ -831,71 +890,106 @@ class SCMIWriter(Writer):
             area, ds_list = area_datasets.setdefault(area_id, (x.info['area'], []))
             ds_list.append(x)
 
+        pool = None
+        if num_workers > 1:
+            from multiprocessing import Pool
+            pool = Pool(num_workers, initializer=_init_tile_worker,
+                        initargs=(self, ))
+        # (dataset name, async result) of the tiles being written
+        pending = deque()
+        max_pending = 2 * num_workers
+
         output_filenames = []
         dtype = AWIPS_DATA_DTYPE
-        fill_value = np.nan
-        for area_id, (area_def, ds_list) in area_datasets.items():
-            tile_gen = self._get_tile_generator(area_def, lettered_grid, sector_id, num_subtiles, tile_size, tile_count)
-            for dataset in ds_list:
-                pkwargs = {}
-                ds_info = dataset.info.copy()
-                LOG.info("Writing product %s to AWIPS SCMI NetCDF file", ds_info["name"])
-                if isinstance(dataset, np.ma.MaskedArray):
-                    data = dataset
-                else:
-                    data = np.ma.masked_array(data, mask=np.isnan(data), copy=False)
-
-                pkwargs['awips_info'] = self._get_awips_info(ds_info, source_name=source_name)
-                pkwargs['attr_helper'] = AttributeHelper(ds_info)
-
-                LOG.debug("Scaling %s data to fit in netcdf file...", ds_info["name"])
-                bit_depth = ds_info.setdefault("bit_depth", 16)
-                valid_min = ds_info.get('valid_min')
-                if valid_min is None:
-                    valid_min = np.nanmin(data)
-                valid_max = ds_info.get('valid_max')
-                if valid_max is None:
-                    valid_max = np.nanmax(data)
-                pkwargs['valid_min'] = valid_min
-                pkwargs['valid_max'] = valid_max
-                pkwargs['bit_depth'] = bit_depth
-
-                LOG.debug("Using product valid min {} and valid max {}".format(valid_min, valid_max))
-                fills, factor, offset = self._calc_factor_offset(
-                    data=data,
-                    bitdepth=bit_depth,
-                    min=valid_min,
-                    max=valid_max,
-                    dtype=dtype,
-                    flag_meanings='flag_meanings' in ds_info)
-                pkwargs['fills'] = fills
-                pkwargs['factor'] = factor
-                pkwargs['offset'] = offset
-                if 'flag_meanings' in ds_info:
-                    pkwargs['data'] = data.astype(dtype)
-                else:
-                    pkwargs['data'] = data
-
-                for (trow, tcol, tile_id, tmp_x, tmp_y), tmp_tile in tile_gen(data, fill_value=fill_value):
-                    try:
-                        fn = self.create_tile_output(
-                            dataset, sector_id,
-                            trow, tcol, tile_id, tmp_x, tmp_y, tmp_tile,
-                            tile_gen.tile_count, tile_gen.image_shape,
-                            tile_gen.mx, tile_gen.bx, tile_gen.my, tile_gen.by,
-                            filename, **pkwargs)
-                        if fn is None:
-                            if lettered_grid:
-                                LOG.warning("Data did not fit in to any lettered tile")
-                            raise RuntimeError("No SCMI tiles were created")
-                        output_filenames.append(fn)
-                    except (RuntimeError, KeyError, AttributeError):
-                        LOG.error("Could not create output for '%s'", ds_info['name'])
-                        LOG.debug("Writer exception: ", exc_info=True)
-                        raise
+        try:
+            for area_id, (area_def, ds_list) in area_datasets.items():
+                tile_gen = self._get_tile_generator(area_def, lettered_grid, sector_id, num_subtiles, tile_size, tile_count)
+                for dataset in ds_list:
+                    pkwargs = {}
+                    ds_info = dataset.info.copy()
+                    LOG.info("Writing product %s to AWIPS SCMI NetCDF file", ds_info["name"])
+                    if isinstance(dataset, np.ma.MaskedArray):
+                        data = dataset
+                    else:
+                        data = np.ma.masked_array(dataset, mask=np.isnan(dataset), copy=False)
+
+                    pkwargs['awips_info'] = self._get_awips_info(ds_info, source_name=source_name)
+                    pkwargs['attr_helper'] = AttributeHelper(ds_info)
+
+                    LOG.debug("Scaling %s data to fit in netcdf file...", ds_info["name"])
+                    bit_depth = ds_info.setdefault("bit_depth", 16)
+                    valid_min = ds_info.get('valid_min')
+                    if valid_min is None:
+                        valid_min = np.nanmin(data)
+                    valid_max = ds_info.get('valid_max')
+                    if valid_max is None:
+                        valid_max = np.nanmax(data)
+                    pkwargs['valid_min'] = valid_min
+                    pkwargs['valid_max'] = valid_max
+                    pkwargs['bit_depth'] = bit_depth
+
+                    LOG.debug("Using product valid min {} and valid max {}".format(valid_min, valid_max))
+                    fills, factor, offset = self._calc_factor_offset(
+                        data=data,
+                        bitdepth=bit_depth,
+                        min=valid_min,
+                        max=valid_max,
+                        dtype=dtype,
+                        flag_meanings='flag_meanings' in ds_info)
+                    pkwargs['fills'] = fills
+                    pkwargs['factor'] = factor
+                    pkwargs['offset'] = offset
+                    # scale once for all the tiles of this dataset
+                    data = self._pack_data(data, fills[0], factor, offset,
+                                           valid_min, valid_max, dtype=dtype)
+
+                    for (trow, tcol, tile_id, tmp_x, tmp_y), tmp_tile in tile_gen(data, fill_value=fills[0]):
+                        args = (ds_info, sector_id,
+                                trow, tcol, tile_id, tmp_x, tmp_y, tmp_tile,
+                                tile_gen.tile_count, tile_gen.image_shape,
+                                tile_gen.mx, tile_gen.bx, tile_gen.my, tile_gen.by,
+                                filename)
+                        if pool is None:
+                            fn = self._check_tile_output(
+                                ds_info['name'], lettered_grid,
+                                self.create_tile_output, *args, **pkwargs)
+                            output_filenames.append(fn)
+                            continue
+
+                        if len(pending) >= max_pending:
+                            output_filenames.append(
+                                self._check_tile_output(*pending.popleft()))
+                        pending.append((ds_info['name'], lettered_grid,
+                                        pool.apply_async(_write_tile, (args, pkwargs)).get))
+
+            while pending:
+                output_filenames.append(
+                    self._check_tile_output(*pending.popleft()))
+        finally:
+            if pool is not None:
+                pool.close()
+                if pending:
+                    # something went wrong, don't wait for the other tiles
+                    pool.terminate()
+                pool.join()
 
         return output_filenames[-1] if output_filenames else None
 
+    @staticmethod
+    def _check_tile_output(name, lettered_grid, func, *args, **kwargs):
+        """Get the filename of a tile from *func* and handle failures."""
+        try:
+            fn = func(*args, **kwargs)
+            if fn is None:
+                if lettered_grid:
+                    LOG.warning("Data did not fit in to any lettered tile")
+                raise RuntimeError("No SCMI tiles were created")
+            return fn
+        except (RuntimeError, KeyError, AttributeError):
+            LOG.error("Could not create output for '%s'", name)
+            LOG.debug("Writer exception: ", exc_info=True)
+            raise
+
     def create_tile_output(self, dataset, sector_id,
                            trow, tcol, tile_id, tmp_x, tmp_y, tmp_tile,
                            tile_count, image_shape,
@@ -903,8 +997,12 @@ class SCMIWriter(Writer):
                            filename,
                            awips_info, attr_helper,
                            fills, factor, offset, valid_min, valid_max, bit_depth, **kwargs):
-        # Create the netcdf file
-        ds_info = dataset.info
+        """Create the netcdf file of one tile.
+
+        *dataset* is the dataset or its metadata dictionary and *tmp_tile*
+        the tile data already packed by `_pack_data`.
+        """
+        ds_info = getattr(dataset, 'info', dataset)
         area_def = ds_info['area']
         created_files = []
         try:
@@ -948,8 +1046,7 @@ class SCMIWriter(Writer):
             LOG.debug("Creating projection attributes...")
             nc.set_projection_attrs(area_def.area_id, area_def.proj_dict)
             LOG.debug("Writing image data...")
-            np.clip(tmp_tile, valid_min, valid_max, out=tmp_tile)
-            nc.set_image_data(tmp_tile, fills[0])
+            nc.set_packed_image_data(tmp_tile.filled(fills[0]))
             LOG.debug("Writing X/Y navigation data...")
             nc.set_fgf(tmp_x, mx, bx,
                        tmp_y, my, by, units='meters')
@@ -100,6 +100,10 @@ setup(name=NAME,
                               os.path.join('etc', 'enhancements', '*.yaml'),
                               ]},
       zip_safe=False,
+      entry_points={
+          'console_scripts': [
+              'satpy_warm_caches = satpy.resample_cache:main',
+          ]},
       install_requires=requires,
       tests_require=test_requires,
       extras_require={
@@ -0,0 +1,157 @@
+# Copyright (c) 2018
+#
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Compare the pixelwise calibration of the geostationary readers with their
+count lookup table calibration on synthetic full disk counts.
+
+Usage example:
+python benchmark_count_calibration.py --size 3712 --repeat 3
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from satpy.dataset import Dataset
+
+
+def hrit_msg():
+    from satpy.readers.hrit_msg import HRITMSGFileHandler
+    handler = HRITMSGFileHandler.__new__(HRITMSGFileHandler)
+    handler.platform_id = 323
+    handler.channel_name = 'IR_108'
+    handler.mda = {'spectral_channel_id': 9, 'number_of_bits_per_pixel': 10}
+    handler.prologue = {
+        'RadiometricProcessing': {'Level1_5ImageCalibration': {
+            'Cal_Slope': np.full(12, 0.2050), 'Cal_Offset': np.full(12, -10.45)}},
+        'ImageDescription': {'Level1_5ImageProduction': {
+            'PlannedChanProcessing': np.full(13, 2)}}}
+    return (lambda data: handler.calibrate(data, 'brightness_temperature'),
+            lambda data: handler._calibrate(data, 'brightness_temperature'),
+            2 ** 10)
+
+
+def native_msg():
+    from satpy.readers.native_msg import NativeMSGFileHandler, CHANNEL_LIST
+    handler = NativeMSGFileHandler.__new__(NativeMSGFileHandler)
+    handler.platform_id = 323
+    handler.channel_order_list = CHANNEL_LIST
+    handler.header = {'15_DATA_HEADER': {
+        'RadiometricProcessing': {'Level15ImageCalibration': {
+            'CalSlope': np.full((1, 12), 0.2050),
+            'CalOffset': np.full((1, 12), -10.45)}},
+        'ImageDescription': {'Level15ImageProduction': {
+            'PlannedChanProcessing': np.full((1, 12), 2)}}}}
+
+    class Key(object):
+        name = 'IR_108'
+        calibration = 'brightness_temperature'
+
+    return (lambda data: handler.calibrate(data, Key),
+            lambda data: handler._calibrate(data, Key.name, Key.calibration),
+            2 ** 10)
+
+
+def ahi_hsd():
+    from satpy.readers import ahi_hsd as ahi
+    handler = ahi.AHIHSDFileHandler.__new__(ahi.AHIHSDFileHandler)
+    block5 = np.zeros(1, dtype=ahi._CAL_INFO_TYPE)
+    block5['central_wave_length'] = 10.4
+    block5['gain_count2rad_conversion'] = -0.0037
+    block5['offset_count2rad_conversion'] = 15.2
+    cal = np.zeros(1, dtype=ahi._IRCAL_INFO_TYPE)
+    cal['c0_rad2tb_conversion'] = -0.11
+    cal['c1_rad2tb_conversion'] = 1.0
+    cal['c2_rad2tb_conversion'] = -1.4e-06
+    cal['speed_of_light'] = 299792458.0
+    cal['planck_constant'] = 6.62606957e-34
+    cal['boltzmann_constant'] = 1.3806488e-23
+    handler._header = {'block5': block5, 'calibration': cal}
+    return (lambda data: handler.calibrate(data, 'brightness_temperature'),
+            lambda data: handler._calibrate(data, 'brightness_temperature'),
+            2 ** 12)
+
+
+def hrit_goes():
+    from satpy.readers.hrit_goes import HRITGOESFileHandler
+    handler = HRITGOESFileHandler.__new__(HRITGOESFileHandler)
+    indices = np.arange(0, 1024, 8)
+    handler.mda = {'number_of_bits_per_pixel': 10,
+                   'calibration_parameters': {
+                       'indices': indices,
+                       'values': np.linspace(330, 160, indices.size,
+                                             dtype=np.float32),
+                       '_UNIT': 'KELVIN'}}
+    return (lambda data: handler.calibrate(data, 'brightness_temperature'),
+            handler._calibrate, 2 ** 10)
+
+
+def hrit_jma():
+    from satpy.readers.hrit_jma import HRITJMAFileHandler
+    handler = HRITJMAFileHandler.__new__(HRITJMAFileHandler)
+    handler.mda = {'number_of_bits_per_pixel': 16}
+    counts = np.arange(0, 4096, 16)
+    handler.calibration_table = np.stack(
+        [counts, np.linspace(330, 160, counts.size)], axis=1)
+    return (lambda data: handler.calibrate(data, 'brightness_temperature'),
+            handler._calibrate, 2 ** 12)
+
+
+READERS = [('hrit_msg', hrit_msg), ('native_msg', native_msg),
+           ('ahi_hsd', ahi_hsd), ('hrit_goes', hrit_goes),
+           ('hrit_jma', hrit_jma)]
+
+
+def run(name, handler, size, repeat):
+    calibrate, calibrate_pixels, max_count = handler()
+    counts = np.random.randint(1, max_count, (size, size)).astype(np.float32)
+    pix_time = lut_time = 0
+    for _ in range(repeat):
+        pix_res = Dataset(counts.copy(), mask=np.zeros(counts.shape, bool))
+        tic = time.time()
+        with np.errstate(all='ignore'):
+            calibrate_pixels(pix_res)
+        pix_time += time.time() - tic
+
+        lut_res = Dataset(counts.copy(), mask=np.zeros(counts.shape, bool))
+        tic = time.time()
+        calibrate(lut_res)
+        lut_time += time.time() - tic
+
+    valid = ~(pix_res.mask | lut_res.mask)
+    diff = np.abs(pix_res.data - lut_res.data)[valid]
+    print("%-10s pixelwise: %.3f s, lookup table: %.3f s, max difference: "
+          "%g" % (name, pix_time / repeat, lut_time / repeat,
+                  diff.max() if diff.size else 0))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=3712,
+                        help="Number of lines and columns of the image")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--readers', nargs='+',
+                        choices=[name for name, _ in READERS],
+                        help="Readers to benchmark (default: all)")
+    args = parser.parse_args()
+
+    for name, handler in READERS:
+        if args.readers and name not in args.readers:
+            continue
+        run(name, handler, args.size, args.repeat)
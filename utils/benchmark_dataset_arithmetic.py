@@ -0,0 +1,77 @@
+# Copyright (c) 2018
+#
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Measure the metadata overhead of Dataset arithmetic compared to plain masked
+arrays, on the kind of expressions used by the compositors (airmass like
+differences, scaling, negation and slicing).
+
+Usage example:
+python benchmark_dataset_arithmetic.py --sizes 10 500 3712 --repeat 20
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+from pyresample.geometry import AreaDefinition
+
+from satpy.dataset import Dataset
+
+
+def make_area(size):
+    proj_dict = {'proj': 'geos', 'lon_0': 0.0, 'a': 6378169.0,
+                 'b': 6356583.8, 'h': 35785831.0, 'units': 'm'}
+    return AreaDefinition('seviri', 'seviri', 'seviri', proj_dict, size,
+                          size, (-5570248.47, -5567248.07, 5567248.07,
+                                 5570248.47))
+
+
+def expression(ch1, ch2, ch3):
+    return (ch1 - ch2, ch3 - ch1, -ch2, (ch1 - ch2) * 2 + 1, ch3[1:])
+
+
+def run(size, repeat):
+    info = {'sensor': 'seviri', 'units': 'K', 'platform_name': 'Meteosat-10',
+            'wavelength': (6.85, 7.35, 7.85), 'calibration_coeffs':
+            np.arange(16.)}
+    channels = []
+    for idx, name in enumerate(['WV_062', 'WV_073', 'IR_097']):
+        # areas are equal but different objects, as from different readers
+        data = np.random.rand(size, size).astype(np.float32)
+        channels.append(Dataset(data, name=name, area=make_area(size),
+                                **info))
+    arrays = [np.ma.masked_array(chn.data) for chn in channels]
+
+    ds_time = min(timeit.repeat(lambda: expression(*channels),
+                                number=repeat, repeat=3)) / repeat
+    ma_time = min(timeit.repeat(lambda: expression(*arrays),
+                                number=repeat, repeat=3)) / repeat
+    print("%5d x %-5d dataset: %.3f ms, masked array: %.3f ms, "
+          "overhead: %.3f ms" % (size, size, ds_time * 1e3, ma_time * 1e3,
+                                 (ds_time - ma_time) * 1e3))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 500],
+                        help="Number of lines and columns of the images")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size, args.repeat)
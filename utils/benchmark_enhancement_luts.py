@@ -0,0 +1,76 @@
+# Copyright (c) 2018
+#
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Compare the sequential enhancement operations with their lookup table version
+on a synthetic full disk IR image.
+
+Usage example:
+python benchmark_enhancement_luts.py --size 3712 --repeat 3
+"""
+
+import argparse
+import time
+
+import numpy as np
+from trollimage.image import Image
+
+from satpy.enhancements import compile_operations, gamma, invert, stretch
+
+
+OPERATIONS = [{'method': stretch,
+               'kwargs': {'stretch': 'crude',
+                          'min_stretch': 183.15, 'max_stretch': 323.15}},
+              {'method': invert, 'args': [True]},
+              {'method': gamma, 'kwargs': {'gamma': 1.6}}]
+
+
+def run(data, repeat):
+    compiled = compile_operations(OPERATIONS, 'L')
+    seq_time = lut_time = 0
+    for _ in range(repeat):
+        img = Image([data], mode='L', copy=False)
+        tic = time.time()
+        for operation in OPERATIONS:
+            operation['method'](img, *operation.get('args', []),
+                                **operation.get('kwargs', {}))
+        seq_time += time.time() - tic
+        seq_res = img.channels[0]
+
+        img = Image([data], mode='L', copy=False)
+        tic = time.time()
+        compiled(img)
+        lut_time += time.time() - tic
+        lut_res = img.channels[0]
+
+    levels = np.abs(np.round(np.clip(seq_res, 0, 1) * 255) -
+                    np.round(lut_res * 255))
+    print("sequential: %.3f s, lookup table: %.3f s, max difference: %d "
+          "level(s)" % (seq_time / repeat, lut_time / repeat, levels.max()))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=3712,
+                        help="Number of lines and columns of the image")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rows = np.linspace(0, np.pi, args.size)
+    bt = 190. + 120. * np.sin(rows)[:, np.newaxis] * np.cos(rows / 3)
+    bt = np.ma.masked_outside(bt, 200., 320.).astype(np.float32)
+    run(bt, args.repeat)